@@ -0,0 +1,235 @@
+"""
+Spending anomaly detection on rolling per-category statistics.
+
+Each user has one spending_stats row per expense category holding the count,
+mean and M2 (sum of squared deviations) of their expenses dated within the
+last WINDOW_DAYS, updated with Welford's algorithm on every write. A new
+expense is compared against the statistics as they were before it: when it
+lies more than Z_THRESHOLD standard deviations above the mean, a
+notification is created. Both steps touch a single row, so a write costs
+O(1) however long the history is.
+
+backfill_spending_stats() rebuilds the same statistics from the expenses in
+the window with NumPy (per-group moments over each fetched chunk, merged
+with Chan's parallel formula). Writes only ever add to the window, so the
+rebuild is what rolls it forward: run `flask tasks backfill-spending-stats`
+daily, and after bulk loads that bypass the write path (seeding, recurring
+materialization, imports). Between rebuilds the stats may also cover up to
+a day's worth of expenses that have just aged out.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from models import db, SpendingStat, Notification, Transaction
+
+UNCATEGORIZED = 'uncategorized'
+
+# Expenses needed in a category before any of them can be flagged
+MIN_SAMPLES = 5
+
+# Standard deviations above the mean that count as unusual
+Z_THRESHOLD = 3.0
+
+# Floor on the spread as a fraction of the mean, so a category of identical
+# expenses does not flag every small change
+MIN_RELATIVE_STD = 0.25
+
+# Days of expenses the statistics cover
+WINDOW_DAYS = 180
+
+# Rows fetched per round trip by the backfill
+BACKFILL_FETCH_SIZE = 50000
+
+
+def category_key(category):
+    return (category or '').strip().lower() or UNCATEGORIZED
+
+
+def window_start(now=None):
+    return (now or datetime.utcnow()) - timedelta(days=WINDOW_DAYS)
+
+
+def in_window(created_at):
+    return created_at is None or created_at >= window_start()
+
+
+def _get_stat(user_id, category):
+    """Locked stats row for a user and category, created on first use"""
+    stat = SpendingStat.query.filter_by(user_id=user_id, category=category).with_for_update().first()
+    if stat:
+        return stat
+    try:
+        with db.session.begin_nested():
+            stat = SpendingStat(user_id=user_id, category=category, count=0, mean=0.0, m2=0.0)
+            db.session.add(stat)
+        return stat
+    except IntegrityError:
+        # Another writer created it first
+        return SpendingStat.query.filter_by(user_id=user_id, category=category).with_for_update().first()
+
+
+def is_anomaly(stat, amount):
+    """How unusual `amount` is against the stats; returns the z-score if it should be flagged"""
+    if stat.count < MIN_SAMPLES:
+        return None
+    std = max(stat.variance() ** 0.5, MIN_RELATIVE_STD * abs(stat.mean))
+    if std <= 0:
+        return None
+    z = (amount - stat.mean) / std
+    return z if z > Z_THRESHOLD else None
+
+
+def _add(stat, amount):
+    stat.count += 1
+    delta = amount - stat.mean
+    stat.mean += delta / stat.count
+    stat.m2 += delta * (amount - stat.mean)
+
+
+def _remove(stat, amount):
+    if stat.count <= 1:
+        stat.count, stat.mean, stat.m2 = 0, 0.0, 0.0
+        return
+    mean_without = (stat.count * stat.mean - amount) / (stat.count - 1)
+    stat.m2 = max(stat.m2 - (amount - mean_without) * (amount - stat.mean), 0.0)
+    stat.mean = mean_without
+    stat.count -= 1
+
+
+def record_expense(transaction, notify=True):
+    """Fold an expense into the stats, flagging it if unusual; caller commits.
+
+    An edited expense is recorded again with notify=False, so one
+    transaction never raises a second notification.
+    """
+    if transaction.type != 'expense' or not in_window(transaction.created_at):
+        return None
+    category = category_key(transaction.category)
+    stat = _get_stat(transaction.user_id, category)
+    z = is_anomaly(stat, transaction.amount) if notify else None
+    notification = None
+    if z is not None:
+        notification = Notification(
+            kind='spending_anomaly',
+            message=f"Unusual {category} expense: {transaction.amount:,.2f} "
+                    f"vs. a typical {stat.mean:,.2f}",
+            data=json.dumps({
+                "category": category,
+                "amount": transaction.amount,
+                "mean": round(stat.mean, 2),
+                "z_score": round(z, 2)
+            }),
+            user_id=transaction.user_id,
+            transaction=transaction
+        )
+        db.session.add(notification)
+    _add(stat, transaction.amount)
+    return notification
+
+
+def forget_expense(user_id, category, t_type, amount, created_at=None):
+    """Take an expense back out of the stats (before an edit or on delete); caller commits"""
+    if t_type != 'expense' or not in_window(created_at):
+        return
+    stat = SpendingStat.query.filter_by(
+        user_id=user_id, category=category_key(category)
+    ).with_for_update().first()
+    if stat:
+        _remove(stat, amount)
+
+
+def _remove_group(stat, count, mean, m2):
+    """Take a group of expenses with the given moments out of the stats (Chan's formula in reverse)"""
+    if count >= stat.count:
+        stat.count, stat.mean, stat.m2 = 0, 0.0, 0.0
+        return
+    remaining = stat.count - count
+    mean_without = (stat.count * stat.mean - count * mean) / remaining
+    delta = mean - mean_without
+    stat.m2 = max(stat.m2 - m2 - delta ** 2 * remaining * count / stat.count, 0.0)
+    stat.mean = mean_without
+    stat.count = remaining
+
+
+def _category_column():
+    """category_key() in SQL"""
+    return func.coalesce(func.nullif(func.lower(func.trim(Transaction.category)), ''), UNCATEGORIZED)
+
+
+def forget_expenses(condition):
+    """Take the expenses matching `condition` out of their owners' stats before a bulk delete; caller commits"""
+    category = _category_column()
+    groups = db.session.query(
+        Transaction.user_id, category, func.count(Transaction.id),
+        func.avg(Transaction.amount), func.sum(Transaction.amount * Transaction.amount)
+    ).filter(
+        condition, Transaction.type == 'expense', Transaction.user_id.isnot(None),
+        Transaction.created_at >= window_start()
+    ).group_by(Transaction.user_id, category).all()
+    for user_id, category_name, count, mean, squares in groups:
+        stat = SpendingStat.query.filter_by(user_id=user_id, category=category_name).with_for_update().first()
+        if stat:
+            _remove_group(stat, count, float(mean), max(float(squares) - count * float(mean) ** 2, 0.0))
+
+
+def _group_moments(user_ids, categories, amounts):
+    """Per-group (keys, count, mean, M2) for rows sorted by (user_id, category)"""
+    boundaries = np.r_[True, (user_ids[1:] != user_ids[:-1]) | (categories[1:] != categories[:-1])]
+    starts = np.flatnonzero(boundaries)
+    groups = np.cumsum(boundaries) - 1
+    counts = np.bincount(groups)
+    means = np.bincount(groups, weights=amounts) / counts
+    m2 = np.bincount(groups, weights=(amounts - means[groups]) ** 2)
+    keys = list(zip(user_ids[starts].tolist(), categories[starts].tolist()))
+    return keys, counts, means, m2
+
+
+def backfill_spending_stats(user_id=None):
+    """Recompute spending stats from the expenses in the window (optionally for one user); returns groups written"""
+    category = func.lower(func.trim(func.coalesce(Transaction.category, '')))
+    query = db.session.query(
+        Transaction.user_id, category, Transaction.amount
+    ).filter(
+        Transaction.type == 'expense',
+        Transaction.user_id.isnot(None),
+        Transaction.created_at >= window_start()
+    )
+    if user_id is not None:
+        query = query.filter(Transaction.user_id == user_id)
+    result = db.session.execute(
+        query.order_by(Transaction.user_id, category).statement.execution_options(
+            stream_results=True, yield_per=BACKFILL_FETCH_SIZE
+        )
+    )
+
+    totals = {}
+    for rows in result.partitions():
+        user_ids = np.array([row[0] for row in rows])
+        categories = np.array([row[1] or UNCATEGORIZED for row in rows], dtype=object)
+        amounts = np.array([row[2] for row in rows], dtype=float)
+        keys, counts, means, m2s = _group_moments(user_ids, categories, amounts)
+        for key, n, mean, m2 in zip(keys, counts.tolist(), means.tolist(), m2s.tolist()):
+            if key in totals:
+                # Only a group spanning two chunks gets here; merge with Chan's formula
+                n_a, mean_a, m2_a = totals[key]
+                total = n_a + n
+                delta = mean - mean_a
+                totals[key] = (total, mean_a + delta * n / total, m2_a + m2 + delta ** 2 * n_a * n / total)
+            else:
+                totals[key] = (n, mean, m2)
+
+    stats = SpendingStat.query
+    if user_id is not None:
+        stats = stats.filter(SpendingStat.user_id == user_id)
+    stats.delete(synchronize_session=False)
+    if totals:
+        db.session.execute(db.insert(SpendingStat), [
+            {"user_id": uid, "category": cat, "count": n, "mean": mean, "m2": m2}
+            for (uid, cat), (n, mean, m2) in totals.items()
+        ])
+    db.session.commit()
+    return len(totals)
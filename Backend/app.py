@@ -1,23 +1,30 @@
+import os
 from datetime import timedelta
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from models import db, TokenBlocklist
 from flask_migrate import Migrate
 from flask_mail import Mail
-from flask_jwt_extended import JWTManager
+from jwt_cache import CachingJWTManager
 from flask_cors import CORS
+from compression import Compress
+from metrics import Metrics
+from profiler import SQLProfiler
+from tasks import tasks_cli
+from outbox import outbox_cli
 
 # Create Flask app
 app = Flask(__name__)
 
 # Basic Flask configuration
 app.config['SECRET_KEY'] = 'ftyhjksytdfgj'  # Add this for Flask sessions
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///app.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # JWT configurations
 app.config["JWT_SECRET_KEY"] = "fghhhhaszdxfcwaesrdgdf"  
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
 app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=30)
+app.config["JWT_DECODE_CACHE_SIZE"] = 4096  # verified tokens kept per worker; 0 disables the cache
 
 # Mail configurations
 app.config['MAIL_SERVER'] = 'smtp.gmail.com' 
@@ -31,21 +38,61 @@ app.config['MAIL_DEFAULT_SENDER'] = 'testandonya@gmail.com'
 # Frontend URL for email links
 app.config['FRONTEND_URL'] = 'http://localhost:5173/'
 
+# Response compression (gzip, or brotli when installed)
+app.config['COMPRESS_MIN_SIZE'] = 1024  # bytes; smaller bodies are sent as-is
+app.config['COMPRESS_LEVEL'] = 6  # gzip level 1-9
+app.config['COMPRESS_BR_LEVEL'] = 4  # brotli quality 0-11
+
+# Metrics: set to a directory shared by all gunicorn workers to aggregate them
+app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR')
+app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')  # bearer token for GET /metrics; unset disables it
+
+# SQL profiler: X-DB-Queries / X-DB-Time headers and query budgets outside production
+app.config['SQL_PROFILER_ENABLED'] = os.environ.get('APP_ENV', 'development') != 'production'
+app.config['SQL_QUERY_BUDGET'] = 20  # default for routes without @query_budget
+app.config['SQL_QUERY_BUDGET_STRICT'] = False  # raise instead of log (always on under app.testing)
+
+# Cascading deletes remove child rows in batches of this size
+app.config['DELETE_BATCH_SIZE'] = 1000
+app.config['DELETE_JOB_TTL'] = 3600  # seconds GET /jobs/<id> reports a finished deletion
+
+# POST /batch limits
+app.config['BATCH_MAX_REQUESTS'] = 20
+app.config['BATCH_MAX_WORKERS'] = 4  # threads used for "parallel": true
+
+# GET /events: seconds between heartbeat comments on idle streams
+app.config['EVENTS_HEARTBEAT_SECONDS'] = 15
+
+# POST /sync: queued offline writes replayed per request
+app.config['SYNC_MAX_CHANGES'] = 100
+
 # Initialize extensions
 db.init_app(app)
 mail = Mail(app)
 migrate = Migrate(app, db)
-jwt = JWTManager(app)  # Remove the duplicate init_app call
+jwt = CachingJWTManager(app)  # verified tokens are cached until they expire (jwt_cache.py)
 
 # Enable CORS for all routes
 CORS(app)
 
+# Compress JSON responses for clients that accept it
+Compress(app)
+
+# Per-endpoint latency, status and SQL metrics served at /metrics
+Metrics(app)
+
+# Per-request SQL statement recording and query budgets
+SQLProfiler(app)
+
 # JWT token blocklist checker
 @jwt.token_in_blocklist_loader
 def check_if_token_revoked(jwt_header, jwt_payload: dict) -> bool:
     jti = jwt_payload["jti"]
-    token = db.session.query(TokenBlocklist.id).filter_by(jti=jti).scalar()
-    return token is not None
+    # Cached per app context, so /batch sub-requests check the token once
+    revoked_tokens = g.setdefault('revoked_tokens', {})
+    if jti not in revoked_tokens:
+        revoked_tokens[jti] = db.session.query(TokenBlocklist.id).filter_by(jti=jti).scalar() is not None
+    return revoked_tokens[jti]
 
 # JWT error handlers
 @jwt.expired_token_loader
@@ -73,6 +120,14 @@ from views.transactions import transaction_bp
 from views.goal import goal_bp
 from views.auth import auth_bp
 from views.dashboard import dashboard_bp
+from views.jobs import jobs_bp
+from views.recurring import recurring_bp
+from views.forecast import forecast_bp
+from views.notifications import notification_bp
+from views.batch import batch_bp
+from views.events import events_bp
+from views.sync import sync_bp
+from views.outbox import outbox_bp
 
 # Register blueprints
 app.register_blueprint(user_bp)
@@ -82,6 +137,19 @@ app.register_blueprint(transaction_bp)
 app.register_blueprint(goal_bp)
 app.register_blueprint(auth_bp)
 app.register_blueprint(dashboard_bp) 
+app.register_blueprint(jobs_bp)
+app.register_blueprint(recurring_bp)
+app.register_blueprint(forecast_bp)
+app.register_blueprint(notification_bp)
+app.register_blueprint(batch_bp)
+app.register_blueprint(events_bp)
+app.register_blueprint(sync_bp)
+app.register_blueprint(outbox_bp)
+
+# Scheduled tasks (flask tasks ...)
+app.cli.add_command(tasks_cli)
+# Outbox consumers (flask outbox ...)
+app.cli.add_command(outbox_cli)
 
 if __name__ == '__main__':
     with app.app_context():
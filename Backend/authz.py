@@ -0,0 +1,56 @@
+"""
+Ownership-scoped authorization shared by the blueprints.
+
+Users may read and change their own rows; admins may touch any row. Rather
+than loading a row and then comparing its user_id against the current user,
+the ownership rule is part of the query itself:
+
+    WHERE id = :id AND (user_id = :identity OR <current user is an admin>)
+
+so fetching a row and authorizing it is a single round trip, and a row the
+user may not see is indistinguishable from one that does not exist (404).
+Once the current user has been loaded for the request the admin check is
+resolved in Python; before that it is a scalar subquery on users in the same
+statement.
+"""
+
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import or_
+from models import db, User
+
+
+def get_current_user():
+    """The authenticated user, loaded at most once per request (None if the account is gone)"""
+    user_id = get_jwt_identity()
+    if not user_id:
+        return None
+    # Keyed by identity: a batch's sub-requests share g with the batch request
+    if g.get('current_user_id') != user_id:
+        g.current_user = db.session.get(User, user_id)
+        g.current_user_id = user_id
+    return g.current_user
+
+
+def owned_query(model, owner_id=None):
+    """`model.query` restricted to the rows the current user may access.
+
+    With owner_id the rows must belong to that user whoever is asking, e.g. a
+    goal allocated to a transaction must belong to the transaction's owner.
+    """
+    if owner_id is not None:
+        return model.query.filter(model.user_id == owner_id)
+
+    user_id = get_jwt_identity()
+    if g.get('current_user_id') == user_id and g.current_user is not None:
+        if g.current_user.is_admin:
+            return model.query
+        return model.query.filter(model.user_id == user_id)
+
+    is_admin = db.session.query(User.is_admin).filter(User.id == user_id).scalar_subquery()
+    return model.query.filter(or_(model.user_id == user_id, is_admin.is_(True)))
+
+
+def get_owned(model, object_id, owner_id=None):
+    """The row with this id if the current user may access it, else None"""
+    return owned_query(model, owner_id).filter(model.id == object_id).first()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark response compression: bytes on the wire and CPU cost per request
+
+Serves synthetic /transactions-shaped payloads of several sizes through a
+throwaway Flask app with the Compress extension and reports, per encoding,
+the response size and the CPU time spent per request.
+
+Usage: python benchmarks/compression_benchmark.py [--requests 50]
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from compression import Compress, brotli
+
+PAYLOAD_ROWS = [10, 100, 1000, 10000, 50000]
+CATEGORIES = ['stock', 'rent', 'airtime', 'transport', 'sales', 'wages', None]
+
+
+def make_transactions(count, seed=42):
+    """Build rows shaped like Transaction.to_dict()"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        t_type = 'income' if rng.random() < 0.55 else 'expense'
+        rows.append({
+            "id": i + 1,
+            "amount": round(rng.lognormvariate(6, 1), 2),
+            "type": t_type,
+            "description": f"{t_type.title()} entry {i}",
+            "created_at": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "updated_at": None,
+            "user_id": rng.randint(1, 50),
+            "hustle_id": rng.randint(1, 200),
+            "category": rng.choice(CATEGORIES),
+            "notes": None,
+            "tags": []
+        })
+    return rows
+
+
+def build_app(level, br_level):
+    app = Flask(__name__)
+    app.config['COMPRESS_LEVEL'] = level
+    app.config['COMPRESS_BR_LEVEL'] = br_level
+    Compress(app)
+
+    payloads = {rows: make_transactions(rows) for rows in PAYLOAD_ROWS}
+
+    @app.route('/payload/<int:rows>')
+    def payload(rows):
+        result = payloads[rows]
+        return jsonify({"transactions": result, "count": len(result)})
+
+    return app
+
+
+def measure(client, rows, accept_encoding, requests):
+    headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+    size = 0
+    start = time.process_time()
+    for _ in range(requests):
+        response = client.get(f'/payload/{rows}', headers=headers)
+        size = len(response.get_data())
+    cpu_ms = (time.process_time() - start) * 1000 / requests
+    return size, cpu_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=50, help='requests per measurement')
+    parser.add_argument('--level', type=int, default=6, help='gzip compression level')
+    parser.add_argument('--br-level', type=int, default=4, help='brotli quality')
+    args = parser.parse_args()
+
+    client = build_app(args.level, args.br_level).test_client()
+    encodings = [('identity', None), ('gzip', 'gzip')]
+    if brotli is not None:
+        encodings.append(('br', 'br'))
+    else:
+        print("brotli not installed; only gzip is measured")
+
+    print(f"{'rows':>8} {'encoding':>9} {'bytes':>12} {'ratio':>7} {'cpu ms/req':>11}")
+    print("-" * 52)
+    for rows in PAYLOAD_ROWS:
+        requests = max(1, args.requests if rows <= 1000 else args.requests // 10)
+        baseline_size = None
+        for name, header in encodings:
+            size, cpu_ms = measure(client, rows, header, requests)
+            baseline_size = baseline_size or size
+            print(f"{rows:>8} {name:>9} {size:>12,} {baseline_size / size:>6.1f}x {cpu_ms:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Fixtures for the endpoint benchmarks (test_endpoints.py).
+
+The benchmarks run against the current DATABASE_URL, so generate a dataset
+first with benchmarks/generate_data.py. They measure the user with the most
+transactions, and a bench_admin account (created on first use) for the admin
+routes.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import app  # noqa: E402
+from models import db, User, Transaction  # noqa: E402
+from benchmarks.datagen import password_hash  # noqa: E402
+
+
+def benchmark_users():
+    """The user with the most transactions, plus a benchmark admin"""
+    busiest = db.session.query(
+        Transaction.user_id
+    ).group_by(
+        Transaction.user_id
+    ).order_by(
+        func.count(Transaction.id).desc()
+    ).limit(1).scalar()
+    if busiest is None:
+        pytest.skip("No transactions found; run benchmarks/generate_data.py first")
+
+    admin = User.query.filter_by(username='bench_admin').first()
+    if not admin:
+        admin = User(username='bench_admin', email='bench_admin@example.com', password=password_hash(), is_admin=True)
+        db.session.add(admin)
+        db.session.commit()
+    return busiest, admin.id
+
+
+@pytest.fixture(scope='session')
+def bench_client():
+    return app.test_client()
+
+
+@pytest.fixture(scope='session')
+def bench_headers():
+    """Authorization headers keyed by 'user' and 'admin'"""
+    with app.app_context():
+        user_id, admin_id = benchmark_users()
+        return {
+            'user': {'Authorization': f"Bearer {create_access_token(identity=user_id)}"},
+            'admin': {'Authorization': f"Bearer {create_access_token(identity=admin_id)}"},
+        }
+
+
+@pytest.fixture(scope='session')
+def dataset(bench_headers):
+    """Row counts recorded with every result"""
+    with app.app_context():
+        user_id, _ = benchmark_users()
+        return {
+            'users': User.query.count(),
+            'transactions': Transaction.query.count(),
+            'user_transactions': Transaction.query.filter_by(user_id=user_id).count(),
+            'database': db.engine.url.render_as_string(hide_password=True),
+        }
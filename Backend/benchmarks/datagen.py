@@ -0,0 +1,249 @@
+"""
+Seeded synthetic data for benchmarks and load fixtures.
+
+Every user is generated from its own random stream (derived from the seed and
+the user's index), so any range of users can be produced independently and
+always yields the same rows. Row ids are assigned explicitly: callers pass the
+first id to use per table and the generator advances them, which lets separate
+partitions be generated in parallel without id collisions (see count_rows).
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+TABLES = ['users', 'hustles', 'transactions', 'debts', 'goals']
+
+# Password for every synthetic user
+DEFAULT_PASSWORD = 'password123'
+
+DEFAULT_SCALE = {
+    'hustles_per_user': 3,           # mean, at least 1
+    'transactions_per_hustle': 40,   # mean of a skewed distribution
+    'general_transactions': 5,       # mean, transactions without a hustle
+    'debts_per_user': 2,
+    'goals_per_user': 1,
+    'history_days': 730,             # how far back transactions go
+}
+
+HUSTLE_TYPES = [
+    ('retail', 0.30), ('food', 0.20), ('transport', 0.15), ('services', 0.15),
+    ('agriculture', 0.10), ('digital', 0.10)
+]
+HUSTLE_TITLES = {
+    'retail': ['Mitumba Stall', 'Kiosk', 'Shoe Stand', 'Electronics Stall'],
+    'food': ['Mama Mboga', 'Chapati Joint', 'Smokies Cart', 'Juice Stand'],
+    'transport': ['Boda Boda', 'Matatu Share', 'Tuk Tuk', 'Delivery Runs'],
+    'services': ['Barber Shop', 'Salon', 'M-Pesa Agent', 'Car Wash'],
+    'agriculture': ['Poultry', 'Kitchen Garden', 'Dairy Goats', 'Fish Pond'],
+    'digital': ['Graphic Design', 'Phone Repair', 'Cyber Cafe', 'Social Media Gigs'],
+}
+INCOME_CATEGORIES = [('sales', 0.7), ('services', 0.2), ('other', 0.1)]
+EXPENSE_CATEGORIES = [
+    ('stock', 0.35), ('rent', 0.15), ('transport', 0.15), ('airtime', 0.10),
+    ('wages', 0.10), ('utilities', 0.10), ('other', 0.05)
+]
+CREDITORS = ['Fuliza', 'Chama', 'Sacco', 'Supplier', 'Family', 'KCB M-Pesa', 'Tala']
+DEBT_STATUSES = [('pending', 0.5), ('partially_paid', 0.3), ('paid', 0.2)]
+GOAL_STATUSES = [('pending', 0.4), ('in_progress', 0.4), ('completed', 0.15), ('cancelled', 0.05)]
+
+_password_hash = None
+
+
+def password_hash():
+    """Hash DEFAULT_PASSWORD once; hashing per user would dominate generation time"""
+    global _password_hash
+    if _password_hash is None:
+        _password_hash = generate_password_hash(DEFAULT_PASSWORD)
+    return _password_hash
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def _count(rng, mean, minimum=0):
+    """Skewed non-negative count with the given mean (geometric-like)"""
+    if mean <= 0:
+        return minimum
+    return max(minimum, int(rng.expovariate(1 / mean) + 0.5))
+
+
+def user_rng(seed, index):
+    return random.Random(seed * 1_000_003 + index)
+
+
+def plan_user(rng, scale):
+    """Draw the row counts for one user; must run first on the user's stream"""
+    hustles = _count(rng, scale['hustles_per_user'], minimum=1)
+    transactions = [_count(rng, scale['transactions_per_hustle']) for _ in range(hustles)]
+    general = _count(rng, scale['general_transactions'])
+    debts = _count(rng, scale['debts_per_user'])
+    goals = _count(rng, scale['goals_per_user'])
+    return hustles, transactions, general, debts, goals
+
+
+def count_rows(seed, start_index, user_count, scale=None):
+    """Rows per table that generate_users would produce, without building them"""
+    scale = {**DEFAULT_SCALE, **(scale or {})}
+    counts = dict.fromkeys(TABLES, 0)
+    for index in range(start_index, start_index + user_count):
+        hustles, transactions, general, debts, goals = plan_user(user_rng(seed, index), scale)
+        counts['users'] += 1
+        counts['hustles'] += hustles
+        counts['transactions'] += sum(transactions) + general
+        counts['debts'] += debts
+        counts['goals'] += goals
+    return counts
+
+
+def _transaction(rng, txn_id, user_id, hustle_id, now, history_days):
+    t_type = 'income' if rng.random() < 0.6 else 'expense'
+    if t_type == 'income':
+        category = _weighted(rng, INCOME_CATEGORIES)
+        amount = round(rng.lognormvariate(7.0, 0.9), 2)
+    else:
+        category = _weighted(rng, EXPENSE_CATEGORIES)
+        amount = round(rng.lognormvariate(6.6, 1.0), 2)
+    # Skew towards recent activity
+    created_at = now - timedelta(days=history_days * rng.random() ** 2, seconds=rng.randint(0, 86399))
+    return {
+        'id': txn_id,
+        'amount': amount,
+        'type': t_type,
+        'description': f"{category.title()} {t_type}",
+        'created_at': created_at,
+        'updated_at': None,
+        'user_id': user_id,
+        'hustle_id': hustle_id,
+        'category': category,
+        'notes': None if rng.random() < 0.8 else f"Note for transaction {txn_id}",
+        'tags': None if rng.random() < 0.7 else category,
+    }
+
+
+def generate_users(seed, start_index, user_count, ids, scale=None, now=None):
+    """
+    Generate rows for users start_index .. start_index + user_count - 1.
+
+    `ids` maps each table name to the next id to assign and is advanced in
+    place. Returns a dict of table name -> list of row dicts.
+    """
+    scale = {**DEFAULT_SCALE, **(scale or {})}
+    now = now or datetime(2025, 6, 1)
+    hashed = password_hash()
+    rows = {table: [] for table in TABLES}
+
+    for index in range(start_index, start_index + user_count):
+        rng = user_rng(seed, index)
+        hustle_count, transaction_counts, general_count, debt_count, goal_count = plan_user(rng, scale)
+
+        user_id = ids['users']
+        ids['users'] += 1
+        joined = now - timedelta(days=scale['history_days'] + rng.randint(0, 365))
+        rows['users'].append({
+            'id': user_id,
+            'username': f"user{index}",
+            'email': f"user{index}@example.com",
+            'password': hashed,
+            'is_admin': False,
+            'is_verified': rng.random() < 0.7,
+            'is_active': True,
+            'created_at': joined,
+            'updated_at': joined,
+        })
+
+        hustle_ids = []
+        for _ in range(hustle_count):
+            hustle_id = ids['hustles']
+            ids['hustles'] += 1
+            hustle_ids.append(hustle_id)
+            h_type = _weighted(rng, HUSTLE_TYPES)
+            started = joined + timedelta(days=rng.randint(0, 365))
+            rows['hustles'].append({
+                'id': hustle_id,
+                'title': rng.choice(HUSTLE_TITLES[h_type]),
+                'type': h_type,
+                'description': f"{h_type.title()} hustle",
+                'date': started.date(),
+                'location': None,
+                'status': 'active' if rng.random() < 0.85 else 'inactive',
+                'created_at': started,
+                'updated_at': started,
+                'user_id': user_id,
+            })
+
+        for hustle_id, txn_count in zip(hustle_ids, transaction_counts):
+            for _ in range(txn_count):
+                rows['transactions'].append(
+                    _transaction(rng, ids['transactions'], user_id, hustle_id, now, scale['history_days']))
+                ids['transactions'] += 1
+        for _ in range(general_count):
+            rows['transactions'].append(
+                _transaction(rng, ids['transactions'], user_id, None, now, scale['history_days']))
+            ids['transactions'] += 1
+
+        for _ in range(debt_count):
+            taken = now - timedelta(days=rng.randint(0, scale['history_days']))
+            amount = round(rng.lognormvariate(8.0, 1.0), 2)
+            creditor = rng.choice(CREDITORS)
+            due_date = taken + timedelta(days=rng.choice([7, 14, 30, 60, 90]))
+            status = _weighted(rng, DEBT_STATUSES)
+            rows['debts'].append({
+                'id': ids['debts'],
+                'amount': amount,
+                'description': 'Loan',
+                'date': taken.date(),
+                'creditor': creditor,
+                'due_date': due_date,
+                'status': status,
+                'balance': 0.0 if status == 'paid' else round(amount / 2, 2) if status == 'partially_paid' else amount,
+                'created_at': taken,
+                'updated_at': taken,
+                'user_id': user_id,
+                'hustle_id': rng.choice(hustle_ids) if rng.random() < 0.6 else None,
+            })
+            ids['debts'] += 1
+
+        for _ in range(goal_count):
+            created = now - timedelta(days=rng.randint(0, 365))
+            title = rng.choice(['Buy stock', 'Emergency fund', 'New equipment', 'School fees'])
+            status = _weighted(rng, GOAL_STATUSES)
+            due_date = created + timedelta(days=rng.randint(30, 365))
+            target = round(rng.uniform(1000, 50000), -2)
+            saved = {'completed': target, 'in_progress': round(target * rng.random(), 2)}.get(status, 0.0)
+            rows['goals'].append({
+                'id': ids['goals'],
+                'title': title,
+                'description': 'Savings goal',
+                'status': status,
+                'due_date': due_date,
+                'target_amount': target,
+                'current_amount': saved,
+                'created_at': created,
+                'updated_at': created,
+                'user_id': user_id,
+                'hustle_id': rng.choice(hustle_ids) if rng.random() < 0.5 else None,
+            })
+            ids['goals'] += 1
+
+    return rows
+
+
+def insert_rows(connection, rows, chunk_size=5000):
+    """Bulk insert generated rows (executemany) in dependency order"""
+    from models import User, Hustle, Transaction, Debt, Goal
+
+    tables = {
+        'users': User.__table__,
+        'hustles': Hustle.__table__,
+        'transactions': Transaction.__table__,
+        'debts': Debt.__table__,
+        'goals': Goal.__table__,
+    }
+    for name in TABLES:
+        table_rows = rows[name]
+        for start in range(0, len(table_rows), chunk_size):
+            connection.execute(tables[name].insert(), table_rows[start:start + chunk_size])
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark the transactions list read path: ORM entities vs Core rows
+
+Loads one user with --rows transactions into a scratch SQLite database and
+builds the /transactions list both ways: loading Transaction objects and
+calling to_dict() (the old path), and serializing the selected row tuples
+with serializers.serialize_query() (the current path), plus a sparse
+fieldset for comparison. Reports the best wall time over --repeats runs and
+the peak memory allocated while building the list (tracemalloc).
+
+Usage: python benchmarks/list_benchmark.py [--rows 100000] [--repeats 3]
+"""
+
+import sys
+import os
+import gc
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCRATCH_DB = os.path.join(tempfile.mkdtemp(prefix='list_benchmark_'), 'bench.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{SCRATCH_DB}'
+
+from app import app
+from models import db, User, Hustle, Transaction
+from serializers import TRANSACTION_FIELDS, TRANSACTION_LIST_FIELDS, serialize_query
+from benchmarks.datagen import password_hash
+
+CATEGORIES = ['stock', 'rent', 'airtime', 'transport', 'sales', 'wages', None]
+
+
+def load(rows, seed=42):
+    """One user with a hustle and `rows` transactions; returns the user id"""
+    db.create_all()
+    user = User(username='bench_lists', email='bench_lists@example.com', password=password_hash())
+    db.session.add(user)
+    db.session.flush()
+    hustle = Hustle(title='Bench stall', type='retail', description='', date=datetime.utcnow().date(), user_id=user.id)
+    db.session.add(hustle)
+    db.session.commit()
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    batch = []
+    for i in range(rows):
+        t_type = 'income' if rng.random() < 0.55 else 'expense'
+        batch.append({
+            "amount": round(rng.lognormvariate(6, 1), 2),
+            "type": t_type,
+            "description": f"{t_type.title()} entry {i}",
+            "created_at": now - timedelta(minutes=rng.randint(0, 525600)),
+            "user_id": user.id,
+            "hustle_id": hustle.id,
+            "category": rng.choice(CATEGORIES),
+            "notes": "Paid in cash at the market" if rng.random() < 0.3 else None,
+            "tags": "mpesa,weekly" if rng.random() < 0.2 else None,
+        })
+        if len(batch) == 10000:
+            db.session.execute(db.insert(Transaction), batch)
+            batch = []
+    if batch:
+        db.session.execute(db.insert(Transaction), batch)
+    db.session.commit()
+    return user.id
+
+
+def orm_list(query):
+    return [transaction.to_dict() for transaction in query.all()]
+
+
+def row_list(query):
+    return serialize_query(query, TRANSACTION_FIELDS, TRANSACTION_LIST_FIELDS)
+
+
+def sparse_row_list(query):
+    return serialize_query(query, TRANSACTION_FIELDS, ['id', 'amount', 'type', 'created_at'])
+
+
+def measure(build, user_id, repeats):
+    """Best wall time (s) and peak traced memory (bytes) for building the list"""
+    best = None
+    for _ in range(repeats):
+        db.session.expunge_all()
+        gc.collect()
+        query = Transaction.query.filter_by(user_id=user_id).order_by(Transaction.created_at.desc())
+        started = time.perf_counter()
+        result = build(query)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        del result
+
+    db.session.expunge_all()
+    gc.collect()
+    query = Transaction.query.filter_by(user_id=user_id).order_by(Transaction.created_at.desc())
+    tracemalloc.start()
+    result = build(query)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000, help='transactions to load')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs per path (best is reported)')
+    args = parser.parse_args()
+
+    with app.app_context():
+        print(f"Loading {args.rows:,} transactions into {SCRATCH_DB}")
+        user_id = load(args.rows)
+
+        paths = [
+            ('orm + to_dict', orm_list),
+            ('core rows', row_list),
+            ('core rows, 4 fields', sparse_row_list),
+        ]
+        print(f"\n{'path':<22} {'rows':>9} {'best s':>8} {'rows/s':>11} {'peak MiB':>9} {'speedup':>8}")
+        print("-" * 72)
+        baseline = None
+        for name, build in paths:
+            seconds, peak, count = measure(build, user_id, args.repeats)
+            baseline = baseline or seconds
+            print(f"{name:<22} {count:>9,} {seconds:>8.3f} {count / seconds:>11,.0f} "
+                  f"{peak / 2 ** 20:>9.1f} {baseline / seconds:>7.1f}x")
+
+        db.session.remove()
+    os.remove(SCRATCH_DB)
+
+
+if __name__ == '__main__':
+    main()
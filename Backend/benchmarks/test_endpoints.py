@@ -0,0 +1,50 @@
+"""
+Benchmark the hot API endpoints through the Flask test client
+
+Each scenario is a pytest-benchmark test; the response size and SQL
+statement count go into the results' extra_info. The tests are marked
+`benchmark` and deselected by default (see pytest.ini), so select them
+explicitly. Save a run with --benchmark-autosave and compare a later one
+against it with --benchmark-compare; --benchmark-compare-fail fails the run
+when a scenario got slower than the threshold.
+
+Usage:
+    DATABASE_URL=sqlite:///bench.db python -m pytest -m benchmark benchmarks \\
+        --benchmark-storage=benchmarks/results --benchmark-autosave
+    DATABASE_URL=sqlite:///bench.db python -m pytest -m benchmark benchmarks \\
+        --benchmark-storage=benchmarks/results --benchmark-compare --benchmark-compare-fail=median:10%
+"""
+
+import pytest
+
+# (name, path, run as admin)
+SCENARIOS = [
+    ('current_user', '/users/me', False),
+    ('transactions_list', '/transactions', False),
+    ('transactions_columnar', '/transactions?format=columnar', False),
+    ('transactions_by_type', '/transactions?type=expense', False),
+    ('hustles_list', '/hustles', False),
+    ('debts_list', '/debts', False),
+    ('goals_list', '/goals', False),
+    ('dashboard_overview', '/dashboard/overview', False),
+    ('hustle_stats', '/hustles/stats', True),
+    ('admin_users', '/admin/users', True),
+]
+
+pytestmark = pytest.mark.benchmark(group='endpoints', min_rounds=30, warmup=True, warmup_iterations=3)
+
+
+@pytest.mark.parametrize(
+    'path, as_admin', [scenario[1:] for scenario in SCENARIOS], ids=[scenario[0] for scenario in SCENARIOS]
+)
+def test_endpoint(benchmark, bench_client, bench_headers, dataset, path, as_admin):
+    headers = bench_headers['admin' if as_admin else 'user']
+    response = benchmark(bench_client.get, path, headers=headers)
+
+    assert response.status_code == 200
+    benchmark.extra_info.update(
+        path=path,
+        response_bytes=len(response.get_data()),
+        db_queries=int(response.headers.get('X-DB-Queries', 0)) or None,
+        dataset=dataset,
+    )
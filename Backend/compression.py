@@ -0,0 +1,119 @@
+"""
+Response compression negotiated through the Accept-Encoding header.
+
+Brotli is used when the optional `brotli` package is installed and the client
+accepts it, gzip otherwise. Small bodies, streamed responses and content types
+that do not benefit from compression are passed through untouched.
+"""
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+DEFAULT_MIMETYPES = [
+    'application/json',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+    'application/javascript',
+]
+
+
+def parse_accept_encoding(header):
+    """Return the encodings a client accepts, mapped to their q-values"""
+    accepted = {}
+    for part in (header or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+    return accepted
+
+
+def choose_encoding(header):
+    """Pick the best supported encoding for an Accept-Encoding header, or None"""
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_body(data, encoding, gzip_level=6, brotli_quality=4):
+    """Compress raw bytes with the given content-coding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+
+class Compress:
+    """Flask extension compressing eligible responses in an after_request hook"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_ENABLED', True)
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_LEVEL', 6)
+        app.config.setdefault('COMPRESS_BR_LEVEL', 4)
+        app.config.setdefault('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES)
+
+        app.after_request(self.after_request)
+        app.extensions['compress'] = self
+        self.app = app
+
+    def after_request(self, response):
+        config = self.app.config
+        response.vary.add('Accept-Encoding')
+
+        if not config['COMPRESS_ENABLED']:
+            return response
+        if response.direct_passthrough or response.is_streamed:
+            return response
+        if response.status_code < 200 or response.status_code >= 300 or response.status_code == 204:
+            return response
+        if 'Content-Encoding' in response.headers:
+            return response
+        if response.mimetype not in config['COMPRESS_MIMETYPES']:
+            return response
+
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+
+        compressed = compress_body(
+            data,
+            encoding,
+            gzip_level=config['COMPRESS_LEVEL'],
+            brotli_quality=config['COMPRESS_BR_LEVEL']
+        )
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Length'] = len(compressed)
+        return response
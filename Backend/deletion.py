@@ -0,0 +1,199 @@
+"""
+Cascading deletion of users and hustles in bounded batches.
+
+Child rows (notifications, transactions, recurring rules, debt payments,
+debts, goals, then hustles) are deleted before their parent,
+DELETE_BATCH_SIZE rows at a time with a commit after every batch, so
+SQLite's write lock is never held for longer than one batch. Each batch
+also appends its outbox events (see outbox.py), takes deleted expenses out
+of the spending statistics (see anomaly.py) and, unless the whole user goes,
+the tombstones of synced rows (see sync.py).
+Deleting a user first deletes their hustles with everything attached to
+them, including rows other users (e.g. admins) created against those hustles.
+Deletions can run in a background thread; progress is kept in an in-process
+job registry (per worker process) and exposed through GET /jobs/<job_id>
+until DELETE_JOB_TTL seconds after the job finished.
+"""
+
+import uuid
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app, request
+from models import (
+    db, User, Hustle, Transaction, RecurringRule, Debt, DebtPayment, Goal, Notification, SpendingStat, Tombstone
+)
+from sync import SYNCED_MODELS, next_seq, record_deletions
+from outbox import CAPTURED_MODELS, capture, record
+from goal_progress import apply_contribution
+import anomaly
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Seconds a finished job stays in the registry
+DEFAULT_JOB_TTL = 3600
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _batch_size():
+    return current_app.config.get('DELETE_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+
+def delete_in_batches(model, condition, batch_size, on_batch=None, tombstones=True):
+    """Delete rows of `model` matching `condition`, committing after each batch"""
+    deleted = 0
+    tombstones = tombstones and model in SYNCED_MODELS
+    owner = model.id if model is User else model.user_id
+    while True:
+        rows = db.session.query(model.id, owner).filter(condition).limit(batch_size).all()
+        if not rows:
+            break
+        if tombstones:
+            record_deletions(model, rows)
+        if model in CAPTURED_MODELS:
+            record(model, 'deleted', [{"id": object_id, "user_id": user_id} for object_id, user_id in rows])
+        ids = [row[0] for row in rows]
+        if model is Transaction:
+            # Same as single deletes: the anomaly baseline forgets the expenses
+            anomaly.forget_expenses(Transaction.id.in_(ids))
+        db.session.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(ids)
+        if on_batch:
+            on_batch(model.__tablename__, len(ids))
+    return deleted
+
+
+def release_goal_contributions(transactions, goals):
+    """Take the transactions about to be deleted off the goals that survive them.
+
+    Their amounts come off each surviving goal's progress and they are
+    unallocated in the same database transaction, so progress stays right
+    whichever batch the deletion stops at. Transactions allocated to the goals
+    about to be deleted are unallocated too. Caller commits.
+    """
+    totals = db.session.query(Transaction.goal_id, db.func.sum(Transaction.amount)).filter(
+        transactions, Transaction.type == 'income', Transaction.goal_id.isnot(None), Transaction.goal_id.not_in(goals)
+    ).group_by(Transaction.goal_id).all()
+    for goal_id, total in totals:
+        apply_contribution(goal_id, -total)
+    capture(
+        db.update(Transaction).where(
+            db.or_(db.and_(transactions, Transaction.goal_id.not_in(goals)), Transaction.goal_id.in_(goals))
+        ).values(goal_id=None, change_seq=next_seq()).execution_options(synchronize_session=False),
+        Transaction
+    )
+
+
+def delete_hustles(hustle_ids, batch_size=None, on_batch=None):
+    """Delete hustles and everything attached to them; returns rows deleted per table"""
+    batch_size = batch_size or _batch_size()
+    counts = {}
+    # Hustle ids are bounded by the request, the child rows are not
+    for start in range(0, len(hustle_ids), batch_size):
+        chunk = hustle_ids[start:start + batch_size]
+        conditions = [
+            (Notification, Notification.transaction_id.in_(db.select(Transaction.id).where(Transaction.hustle_id.in_(chunk)))),
+            (Transaction, Transaction.hustle_id.in_(chunk)),
+            (RecurringRule, RecurringRule.hustle_id.in_(chunk)),
+            (DebtPayment, DebtPayment.debt_id.in_(db.select(Debt.id).where(Debt.hustle_id.in_(chunk)))),
+            (Debt, Debt.hustle_id.in_(chunk)),
+            (Goal, Goal.hustle_id.in_(chunk)),
+            (Hustle, Hustle.id.in_(chunk)),
+        ]
+        release_goal_contributions(
+            Transaction.hustle_id.in_(chunk), db.select(Goal.id).where(Goal.hustle_id.in_(chunk))
+        )
+        db.session.commit()
+        for model, condition in conditions:
+            deleted = delete_in_batches(model, condition, batch_size, on_batch)
+            counts[model.__tablename__] = counts.get(model.__tablename__, 0) + deleted
+    return counts
+
+
+def delete_user(user_id, batch_size=None, on_batch=None):
+    """Delete a user and everything they own; returns rows deleted per table"""
+    batch_size = batch_size or _batch_size()
+    # Rows attached to the user's hustles go with them whoever owns them;
+    # other owners get tombstones for theirs
+    hustle_ids = [row[0] for row in db.session.query(Hustle.id).filter(Hustle.user_id == user_id).all()]
+    counts = delete_hustles(hustle_ids, batch_size, on_batch)
+    release_goal_contributions(Transaction.user_id == user_id, db.select(Goal.id).where(Goal.user_id == user_id))
+    db.session.commit()
+    # No tombstones: nobody is left to sync them
+    for model in (Notification, SpendingStat, Transaction, RecurringRule, DebtPayment, Debt, Goal, Hustle, Tombstone, User):
+        column = model.id if model is User else model.user_id
+        deleted = delete_in_batches(model, column == user_id, batch_size, on_batch, tombstones=False)
+        counts[model.__tablename__] = counts.get(model.__tablename__, 0) + deleted
+    return counts
+
+
+# Background jobs
+
+def background_requested():
+    """True when the caller asked for ?background=true"""
+    return request.args.get("background", "").lower() in ("1", "true", "yes")
+
+
+def _prune_jobs(ttl):
+    """Forget jobs that finished more than `ttl` seconds ago; caller holds _jobs_lock"""
+    cutoff = (datetime.utcnow() - timedelta(seconds=ttl)).isoformat()
+    for job_id in [job_id for job_id, job in _jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]:
+        del _jobs[job_id]
+
+
+def get_job(job_id):
+    with _jobs_lock:
+        _prune_jobs(current_app.config.get('DELETE_JOB_TTL', DEFAULT_JOB_TTL))
+        job = _jobs.get(job_id)
+        return dict(job, deleted=dict(job["deleted"])) if job else None
+
+
+def _update_job(job_id, **changes):
+    with _jobs_lock:
+        _jobs[job_id].update(changes)
+
+
+def _record_batch(job_id):
+    def on_batch(table, count):
+        with _jobs_lock:
+            deleted = _jobs[job_id]["deleted"]
+            deleted[table] = deleted.get(table, 0) + count
+    return on_batch
+
+
+def _run_job(app, job_id, func, args):
+    with app.app_context():
+        _update_job(job_id, status="running", started_at=datetime.utcnow().isoformat())
+        try:
+            func(*args, on_batch=_record_batch(job_id))
+            _update_job(job_id, status="completed", finished_at=datetime.utcnow().isoformat())
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Deletion job {job_id} failed: {str(e)}", exc_info=True)
+            _update_job(job_id, status="failed", error=str(e), finished_at=datetime.utcnow().isoformat())
+
+
+def start_job(kind, target, owner_id, func, *args):
+    """Run a deletion function in a background thread and return the job record"""
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        _prune_jobs(current_app.config.get('DELETE_JOB_TTL', DEFAULT_JOB_TTL))
+        _jobs[job_id] = {
+            "id": job_id,
+            "kind": kind,
+            "target": target,
+            "owner_id": owner_id,
+            "status": "queued",
+            "deleted": {},
+            "error": None,
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None
+        }
+    app = current_app._get_current_object()
+    threading.Thread(target=_run_job, args=(app, job_id, func, args), daemon=True).start()
+    return get_job(job_id)
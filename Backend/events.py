@@ -0,0 +1,166 @@
+"""
+In-process pub/sub behind the GET /events Server-Sent Events stream.
+
+Writes publish small per-user deltas after they commit (the transaction that
+changed plus the user's refreshed month-to-date totals), so an open dashboard
+updates itself instead of re-running the overview on every refresh.
+
+Each open stream is a Subscription holding a bounded queue; publish() only
+appends to the queues of that user's subscriptions, under one short lock, and
+never blocks on a slow reader: a subscription whose queue is full is closed
+and the client reconnects. Every write is kept in a short per-user backlog,
+whether or not a stream is open, so a reconnecting EventSource catches up
+from its Last-Event-ID. Event ids start from the process start time, so ids
+from an earlier process (or another worker) are recognised; when the backlog
+cannot cover a Last-Event-ID the stream starts with a `resync` event instead.
+
+The broker lives in the worker process, so a write only reaches streams held
+by the same process. Idle streams cost a queue and a blocked greenlet each
+when served by an async worker, e.g. `gunicorn -k gevent -w 1 app:app`.
+"""
+
+import json
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict, defaultdict, deque
+from datetime import datetime
+
+from cashflow import month_index, monthly_totals
+
+# Events kept per user for Last-Event-ID replay
+BACKLOG_SIZE = 50
+
+# Users whose backlog is kept; the least recently written is forgotten first
+BACKLOG_USERS = 10000
+
+# Undelivered events a subscription may hold before it is dropped
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """One open event stream"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+        self.closed = False
+
+    def get(self, timeout):
+        """Next (id, kind, data) event, or None when nothing arrived within timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+        self._backlog = OrderedDict()
+        # Per user, the id of the last event pushed out of their backlog
+        self._evicted = {}
+        # Newest event id of any backlog forgotten as a whole
+        self._forgotten = 0
+        # Ids are unique across restarts: a process starts above the last one
+        self._first_id = self._next_id = int(time.time()) << 20
+
+    def subscribe(self, user_id, last_event_id=None):
+        """Register a stream; returns it with the backlog events after last_event_id.
+
+        The events are None when the backlog cannot tell what the client
+        missed: the id is from another process, or events after it are gone.
+        """
+        subscription = Subscription(user_id)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+            if last_event_id is None:
+                return subscription, []
+            if (not self._first_id <= last_event_id < self._next_id
+                    or last_event_id < max(self._evicted.get(user_id, 0), self._forgotten)):
+                return subscription, None
+            missed = [event for event in self._backlog.get(user_id, ()) if event[0] > last_event_id]
+        return subscription, missed
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.user_id]
+
+    def has_subscribers(self, user_id):
+        return bool(self._subscriptions.get(user_id))
+
+    def publish(self, user_id, kind, data):
+        """Queue an event for every open stream of the user; returns its id"""
+        with self._lock:
+            event = (self._next_id, kind, data)
+            self._next_id += 1
+            backlog = self._backlog.get(user_id)
+            if backlog is None:
+                backlog = self._backlog[user_id] = deque(maxlen=BACKLOG_SIZE)
+                if len(self._backlog) > BACKLOG_USERS:
+                    forgotten_user, forgotten = self._backlog.popitem(last=False)
+                    self._forgotten = max(self._forgotten, forgotten[-1][0])
+                    self._evicted.pop(forgotten_user, None)
+            else:
+                self._backlog.move_to_end(user_id)
+                if len(backlog) == BACKLOG_SIZE:
+                    self._evicted[user_id] = backlog[0][0]
+            backlog.append(event)
+            for subscription in list(self._subscriptions.get(user_id, ())):
+                try:
+                    subscription.queue.put_nowait(event)
+                except queue.Full:
+                    # Too far behind: close it and let the client resync on reconnect
+                    subscription.closed = True
+                    self._subscriptions[user_id].discard(subscription)
+        return event[0]
+
+
+broker = EventBroker()
+
+
+def format_event(event_id, kind, data):
+    """One SSE message"""
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def month_totals(user_id):
+    """Month-to-date income, expenses and net for a user"""
+    now = datetime.utcnow()
+    current = month_index(now.year, now.month)
+    income, expenses = monthly_totals(user_id, current).get(current, (0.0, 0.0))
+    return {
+        "month": now.strftime('%Y-%m'),
+        "income": income,
+        "expenses": expenses,
+        "net": income - expenses
+    }
+
+
+def publish_transaction(kind, user_id, transaction=None, transaction_id=None):
+    """Push a committed transaction change and the refreshed month totals to the user's streams.
+
+    While the user has no stream open the event only goes to the backlog,
+    without totals, so no query runs; a stream replaying it sends fresh
+    totals. The write has already committed, so a failure here is logged,
+    not raised.
+    """
+    if not user_id:
+        return None
+    data = {}
+    if broker.has_subscribers(user_id):
+        try:
+            data["totals"] = month_totals(user_id)
+        except Exception as e:
+            logging.error(f"Failed to load totals for {kind} of user {user_id}: {str(e)}")
+    if transaction is not None:
+        data["transaction"] = transaction
+    if transaction_id is not None:
+        data["transaction_id"] = transaction_id
+    return broker.publish(user_id, kind, data)
@@ -0,0 +1,65 @@
+"""
+Incremental savings-goal progress.
+
+Every income transaction allocated to a goal (goal_id) counts its amount
+towards the goal's current_amount; expenses cannot be allocated. The running total is adjusted with one atomic UPDATE in
+the same database transaction as the write that caused it, so list endpoints
+read progress straight off the goal row instead of summing transactions.
+Goals with a target complete themselves when it is reached and reopen if a
+contribution is later removed.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import case, update
+from models import Goal
+from sync import next_seq
+from outbox import capture
+
+
+def goal_status(current_amount, target_amount, status):
+    """Status a goal should have for the given totals (plain Python values)"""
+    if status == 'cancelled' or target_amount is None:
+        return status
+    if current_amount >= target_amount:
+        return 'completed'
+    if current_amount > 0:
+        return 'in_progress'
+    return 'pending' if status == 'completed' else status
+
+
+def contribution(t_type, amount):
+    """What a transaction adds to its goal: only income counts as savings"""
+    return amount if t_type == 'income' else 0
+
+
+def apply_contribution(goal_id, change):
+    """Move a goal's current_amount by `change`; caller commits"""
+    if not goal_id or not change:
+        return
+    new_amount = Goal.current_amount + change
+    capture(
+        update(Goal).where(Goal.id == goal_id).values(
+            current_amount=new_amount,
+            status=case(
+                (Goal.status == 'cancelled', Goal.status),
+                (Goal.target_amount.is_(None), Goal.status),
+                (new_amount >= Goal.target_amount, 'completed'),
+                (new_amount > 0, 'in_progress'),
+                (Goal.status == 'completed', 'pending'),
+                else_=Goal.status
+            ),
+            updated_at=datetime.utcnow(),
+            change_seq=next_seq()
+        ).execution_options(synchronize_session=False),
+        Goal
+    )
+
+
+def move_contribution(old_goal_id, old_amount, new_goal_id, new_amount):
+    """Re-allocate a transaction whose goal, amount or type changed (amounts as contribution() gives them)"""
+    if old_goal_id == new_goal_id:
+        apply_contribution(new_goal_id, new_amount - old_amount)
+    else:
+        apply_contribution(old_goal_id, -old_amount)
+        apply_contribution(new_goal_id, new_amount)
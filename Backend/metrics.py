@@ -0,0 +1,316 @@
+"""
+Request and database instrumentation exposed in Prometheus text format.
+
+Every thread (or greenlet) records into its own shard of counters, so the
+hot path never takes a lock; when the thread exits its shard is folded into
+one shard of retired counters. When METRICS_DIR is set (one directory shared by all gunicorn
+workers) each worker periodically writes its merged snapshot there and
+GET /metrics sums the snapshots of every worker.
+
+GET /metrics is only served when METRICS_TOKEN is set, to scrapers that send
+it as a bearer token.
+"""
+
+import os
+import hmac
+import json
+import time
+import weakref
+import threading
+from collections import defaultdict
+
+from flask import Response, g, has_app_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Latency histogram upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _new_shard():
+    return {
+        "requests": defaultdict(int),
+        "latency": {},
+        "sql_statements": defaultdict(int),
+        "db_seconds": defaultdict(float),
+        "jwt_cache": defaultdict(float),  # hits, misses, decode_seconds, saved_seconds (jwt_cache.py)
+        "in_flight": 0
+    }
+
+
+def _label_key(*parts):
+    return "|".join(str(part) for part in parts)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['metrics_query_start'].pop()
+    if has_app_context():
+        g.metrics_sql_statements = g.get('metrics_sql_statements', 0) + 1
+        g.metrics_db_seconds = g.get('metrics_db_seconds', 0.0) + (time.perf_counter() - started)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # after_cursor_execute never fires for a statement that raised
+    conn = context.connection
+    if conn is not None and context.execution_context is not None and conn.info.get('metrics_query_start'):
+        conn.info['metrics_query_start'].pop()
+
+
+class _ShardOwner:
+    """Kept in a thread's local storage; collected when the thread exits"""
+    __slots__ = ('shard', '__weakref__')
+
+
+class Metrics:
+    """Flask extension collecting per-endpoint request and SQL metrics"""
+
+    def __init__(self, app=None):
+        self._local = threading.local()
+        self._shards = {}  # id -> shard of every live thread
+        self._retired = _new_shard()  # counters of threads that have exited
+        # Reentrant: a thread's shard may be retired by garbage collection
+        # triggered while the same thread holds the lock
+        self._shards_lock = threading.RLock()
+        self._last_flush = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_DIR', None)
+        app.config.setdefault('METRICS_FLUSH_INTERVAL', 1.0)
+        app.config.setdefault('METRICS_TOKEN', None)
+
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.teardown_request(self.teardown_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view, methods=['GET'])
+        app.extensions['metrics'] = self
+        self.app = app
+
+    # Recording
+
+    def _shard(self):
+        owner = getattr(self._local, 'owner', None)
+        if owner is None:
+            owner = self._local.owner = _ShardOwner()
+            owner.shard = _new_shard()
+            # Registration happens once per thread; recording is lock-free
+            with self._shards_lock:
+                self._shards[id(owner.shard)] = owner.shard
+            weakref.finalize(owner, self._retire, owner.shard)
+        return owner.shard
+
+    def _retire(self, shard):
+        """Fold the shard of a thread that has exited into the retired counters"""
+        with self._shards_lock:
+            if self._shards.pop(id(shard), None) is not None:
+                _merge_into(self._retired, shard)
+
+    def before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_sql_statements = 0
+        g.metrics_db_seconds = 0.0
+        g.metrics_jwt_cache = {}
+        self._shard()["in_flight"] += 1
+
+    def after_request(self, response):
+        started = g.get('metrics_started')
+        if started is None:
+            return response
+
+        shard = self._shard()
+        endpoint = request.endpoint or 'unmatched'
+        key = _label_key(endpoint, request.method)
+        elapsed = time.perf_counter() - started
+
+        shard["requests"][_label_key(endpoint, request.method, response.status_code)] += 1
+        histogram = shard["latency"].get(key)
+        if histogram is None:
+            histogram = shard["latency"][key] = {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0}
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if elapsed <= bound:
+                histogram["buckets"][index] += 1
+                break
+        histogram["sum"] += elapsed
+        histogram["count"] += 1
+
+        shard["sql_statements"][key] += g.get('metrics_sql_statements', 0)
+        shard["db_seconds"][key] += g.get('metrics_db_seconds', 0.0)
+        for name, value in g.get('metrics_jwt_cache', {}).items():
+            shard["jwt_cache"][name] += value
+        return response
+
+    def teardown_request(self, exc):
+        if g.pop('metrics_started', None) is not None:
+            self._shard()["in_flight"] -= 1
+            self._maybe_flush()
+
+    # Aggregation
+
+    def snapshot(self):
+        """Merge every thread shard of this process into one plain dict"""
+        merged = _new_shard()
+        with self._shards_lock:
+            _merge_into(merged, self._retired)
+            for shard in list(self._shards.values()):
+                _merge_into(merged, shard)
+        return merged
+
+    def _snapshot_path(self, pid=None):
+        return os.path.join(self.app.config['METRICS_DIR'], f"worker-{pid or os.getpid()}.json")
+
+    def _maybe_flush(self, force=False):
+        if not self.app.config['METRICS_DIR']:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.app.config['METRICS_FLUSH_INTERVAL']:
+            return
+        self._last_flush = now
+
+        path = self._snapshot_path()
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.app.config['METRICS_DIR'], exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.app.logger.warning(f"Failed to write metrics snapshot: {str(e)}")
+
+    def collect(self):
+        """Metrics for this process, or for every worker when METRICS_DIR is set"""
+        metrics_dir = self.app.config['METRICS_DIR']
+        if not metrics_dir:
+            return self.snapshot()
+
+        self._maybe_flush(force=True)
+        merged = _new_shard()
+        for name in os.listdir(metrics_dir):
+            if not (name.startswith('worker-') and name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(metrics_dir, name)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            # Counters from exited workers are kept, their in-flight gauge is not
+            if not _pid_alive(int(name[len('worker-'):-len('.json')])):
+                snapshot["in_flight"] = 0
+            _merge_into(merged, snapshot)
+        return merged
+
+    def metrics_view(self):
+        token = self.app.config['METRICS_TOKEN']
+        if not token:
+            return jsonify({"error": "Not found"}), 404
+        supplied = request.headers.get('Authorization', '')
+        if supplied.startswith('Bearer '):
+            supplied = supplied[len('Bearer '):].strip()
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return jsonify({"error": "Invalid metrics token"}), 401
+        return Response(render_prometheus(self.collect()), mimetype='text/plain; version=0.0.4')
+
+
+def _merge_into(target, source):
+    for key, value in list(source["requests"].items()):
+        target["requests"][key] += value
+    for key, histogram in list(source["latency"].items()):
+        merged = target["latency"].setdefault(key, {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0})
+        merged["buckets"] = [a + b for a, b in zip(merged["buckets"], histogram["buckets"])]
+        merged["sum"] += histogram["sum"]
+        merged["count"] += histogram["count"]
+    for key, value in list(source["sql_statements"].items()):
+        target["sql_statements"][key] += value
+    for key, value in list(source["db_seconds"].items()):
+        target["db_seconds"][key] += value
+    for key, value in list(source.get("jwt_cache", {}).items()):
+        target["jwt_cache"][key] += value
+    target["in_flight"] += source["in_flight"]
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def render_prometheus(data):
+    """Render a merged snapshot in the Prometheus text exposition format"""
+    lines = [
+        "# HELP http_requests_total Total HTTP requests by endpoint, method and status.",
+        "# TYPE http_requests_total counter",
+    ]
+    for key, value in sorted(data["requests"].items()):
+        endpoint, method, status = key.split("|")
+        lines.append(f'http_requests_total{{endpoint="{_escape(endpoint)}",method="{method}",status="{status}"}} {value}')
+
+    lines += [
+        "# HELP http_request_duration_seconds Request latency by endpoint and method.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for key, histogram in sorted(data["latency"].items()):
+        endpoint, method = key.split("|")
+        labels = f'endpoint="{_escape(endpoint)}",method="{method}"'
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"]):
+            cumulative += count
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+        lines.append(f'http_request_duration_seconds_sum{{{labels}}} {histogram["sum"]:.6f}')
+        lines.append(f'http_request_duration_seconds_count{{{labels}}} {histogram["count"]}')
+
+    lines += [
+        "# HELP http_requests_in_flight Requests currently being served.",
+        "# TYPE http_requests_in_flight gauge",
+        f'http_requests_in_flight {data["in_flight"]}',
+        "# HELP db_statements_total SQL statements executed by endpoint and method.",
+        "# TYPE db_statements_total counter",
+    ]
+    for key, value in sorted(data["sql_statements"].items()):
+        endpoint, method = key.split("|")
+        lines.append(f'db_statements_total{{endpoint="{_escape(endpoint)}",method="{method}"}} {value}')
+
+    lines += [
+        "# HELP db_time_seconds_total Time spent in SQL statements by endpoint and method.",
+        "# TYPE db_time_seconds_total counter",
+    ]
+    for key, value in sorted(data["db_seconds"].items()):
+        endpoint, method = key.split("|")
+        lines.append(f'db_time_seconds_total{{endpoint="{_escape(endpoint)}",method="{method}"}} {value:.6f}')
+
+    jwt_cache = data["jwt_cache"]
+    hits, misses = int(jwt_cache.get("hits", 0)), int(jwt_cache.get("misses", 0))
+    lines += [
+        "# HELP jwt_decode_cache_hits_total Bearer tokens served from the verified-claims cache.",
+        "# TYPE jwt_decode_cache_hits_total counter",
+        f"jwt_decode_cache_hits_total {hits}",
+        "# HELP jwt_decode_cache_misses_total Bearer tokens verified and decoded.",
+        "# TYPE jwt_decode_cache_misses_total counter",
+        f"jwt_decode_cache_misses_total {misses}",
+        "# HELP jwt_decode_cache_hit_ratio Share of bearer tokens served from the cache.",
+        "# TYPE jwt_decode_cache_hit_ratio gauge",
+        f"jwt_decode_cache_hit_ratio {hits / (hits + misses) if hits + misses else 0:.4f}",
+        "# HELP jwt_decode_seconds_total CPU time spent verifying and decoding tokens.",
+        "# TYPE jwt_decode_seconds_total counter",
+        f'jwt_decode_seconds_total {jwt_cache.get("decode_seconds", 0.0):.6f}',
+        "# HELP jwt_decode_saved_seconds_total Estimated CPU time saved by cache hits.",
+        "# TYPE jwt_decode_saved_seconds_total counter",
+        f'jwt_decode_saved_seconds_total {jwt_cache.get("saved_seconds", 0.0):.6f}',
+    ]
+
+    return "\n".join(lines) + "\n"
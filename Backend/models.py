@@ -1,3 +1,4 @@
+import json
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime, timedelta
 from sqlalchemy import MetaData
@@ -46,8 +47,14 @@ class User(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
-    def to_dict_with_relations(self):
-        """Convert user to dictionary including related data"""
+    def to_dict_with_relations(self, counts=None):
+        """Convert user to dictionary including related data.
+
+        counts: (hustles, transactions, debts, goals) counted up front, so a
+        list of users does not load every user's collections.
+        """
+        if counts is None:
+            counts = (len(self.hustles), len(self.transactions), len(self.debts), len(self.goals))
         return {
             'id': self.id,
             'username': self.username,
@@ -56,10 +63,10 @@ class User(db.Model):
             'is_verified': self.is_verified,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'hustles_count': len(self.hustles),
-            'transactions_count': len(self.transactions),
-            'debts_count': len(self.debts),
-            'goals_count': len(self.goals)
+            'hustles_count': counts[0],
+            'transactions_count': counts[1],
+            'debts_count': counts[2],
+            'goals_count': counts[3]
         }
 
 
@@ -85,12 +92,18 @@ class Hustle(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Position in the change sequence (see sync.py), stamped on every write
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     # Relationships
     transactions = db.relationship('Transaction', backref='hustle', lazy=True)
     debts = db.relationship('Debt', backref='hustle', lazy=True)
     goals = db.relationship('Goal', backref='hustle', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_hustles_user_id_change_seq', 'user_id', 'change_seq'),
+    )
+
     def __repr__(self):
         return f"<Hustle {self.id} - {self.title}>"
 
@@ -112,6 +125,27 @@ class Hustle(db.Model):
 
 
 
+class HustleStats(db.Model):
+    """Precomputed admin hustle statistics, refreshed by `flask tasks refresh-hustle-stats`"""
+    __tablename__ = 'hustle_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    total_hustles = db.Column(db.Integer, nullable=False, default=0)
+    total_users_with_hustles = db.Column(db.Integer, nullable=False, default=0)
+    recent_hustles_30_days = db.Column(db.Integer, nullable=False, default=0)
+    types_distribution = db.Column(db.Text, nullable=False, default='[]')  # JSON list of {type, count}
+    refreshed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "total_hustles": self.total_hustles,
+            "total_users_with_hustles": self.total_users_with_hustles,
+            "recent_hustles_30_days": self.recent_hustles_30_days,
+            "hustle_types_distribution": json.loads(self.types_distribution),
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None
+        }
+
+
 class Transaction(db.Model):
     __tablename__ = 'transactions'
 
@@ -129,6 +163,18 @@ class Transaction(db.Model):
     notes = db.Column(db.Text)
     tags = db.Column(db.String(255))  # You’re storing tags as comma-separated string
 
+    # Set when materialized from a recurring rule; created_at is the occurrence
+    recurring_rule_id = db.Column(db.Integer, db.ForeignKey('recurring_rules.id'), nullable=True)
+    # Savings goal this transaction contributes to (see goal_progress.py)
+    goal_id = db.Column(db.Integer, db.ForeignKey('goals.id'), nullable=True, index=True)
+    # Position in the change sequence (see sync.py), stamped on every write
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        db.UniqueConstraint('recurring_rule_id', 'created_at', name='uq_transactions_recurring_occurrence'),
+        db.Index('ix_transactions_user_id_change_seq', 'user_id', 'change_seq'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -141,10 +187,126 @@ class Transaction(db.Model):
             "hustle_id": self.hustle_id,
             "category": self.category,
             "notes": self.notes,
-            "tags": self.tags.split(',') if self.tags else []
+            "tags": self.tags.split(',') if self.tags else [],
+            "recurring_rule_id": self.recurring_rule_id,
+            "goal_id": self.goal_id
+        }
+
+
+
+class RecurringRule(db.Model):
+    """RRULE-style schedule that materializes transactions (see recurring.py)"""
+    __tablename__ = 'recurring_rules'
+
+    id = db.Column(db.Integer, primary_key=True)
+    amount = db.Column(db.Float, nullable=False)
+    type = db.Column(db.String(20), nullable=False)  # 'income' or 'expense'
+    description = db.Column(db.String(255), nullable=False)
+    category = db.Column(db.String(100), nullable=True)
+    frequency = db.Column(db.String(10), nullable=False)  # 'daily', 'weekly', 'monthly', 'yearly'
+    interval = db.Column(db.Integer, nullable=False, default=1)
+    start_date = db.Column(db.DateTime, nullable=False)
+    until = db.Column(db.DateTime, nullable=True)
+    count = db.Column(db.Integer, nullable=True)  # stop after this many occurrences
+    occurrences = db.Column(db.Integer, nullable=False, default=0)  # materialized so far
+    skipped = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # passed over after an edit or a pause
+    next_run_at = db.Column(db.DateTime, nullable=True, index=True)  # NULL when paused or finished
+    last_run_at = db.Column(db.DateTime, nullable=True)
+    is_active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    hustle_id = db.Column(db.Integer, db.ForeignKey('hustles.id'), nullable=True)
+
+    def rrule(self):
+        parts = [f"FREQ={self.frequency.upper()}", f"INTERVAL={self.interval}"]
+        if self.count:
+            parts.append(f"COUNT={self.count}")
+        if self.until:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%d')}")
+        return ";".join(parts)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "amount": self.amount,
+            "type": self.type,
+            "description": self.description,
+            "category": self.category,
+            "frequency": self.frequency,
+            "interval": self.interval,
+            "rrule": self.rrule(),
+            "start_date": self.start_date.strftime('%Y-%m-%d') if self.start_date else None,
+            "until": self.until.strftime('%Y-%m-%d') if self.until else None,
+            "count": self.count,
+            "occurrences": self.occurrences,
+            "skipped": self.skipped,
+            "next_run_at": self.next_run_at.isoformat() if self.next_run_at else None,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "is_active": self.is_active,
+            "user_id": self.user_id,
+            "hustle_id": self.hustle_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None
         }
 
 
+class SpendingStat(db.Model):
+    """Running count/mean/M2 of a user's expenses in one category (see anomaly.py)"""
+    __tablename__ = 'spending_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    category = db.Column(db.String(100), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    mean = db.Column(db.Float, nullable=False, default=0)
+    m2 = db.Column(db.Float, nullable=False, default=0)  # sum of squared deviations from the mean
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'category', name='uq_spending_stats_user_category'),
+    )
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        return {
+            "category": self.category,
+            "count": self.count,
+            "mean": round(self.mean, 2),
+            "std": round(self.variance() ** 0.5, 2)
+        }
+
+
+class Notification(db.Model):
+    __tablename__ = 'notifications'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # e.g., 'spending_anomaly'
+    message = db.Column(db.String(255), nullable=False)
+    data = db.Column(db.Text, nullable=True)  # JSON details
+    is_read = db.Column(db.Boolean, nullable=False, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transactions.id'), nullable=True)
+
+    transaction = db.relationship('Transaction')
+
+    __table_args__ = (
+        db.Index('ix_notifications_user_id_created_at', 'user_id', 'created_at'),
+    )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "message": self.message,
+            "data": json.loads(self.data) if self.data else None,
+            "is_read": self.is_read,
+            "transaction_id": self.transaction_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
+
 
 class Debt(db.Model):
     __tablename__ = 'debts'
@@ -155,11 +317,20 @@ class Debt(db.Model):
     date = db.Column(db.Date, nullable=False)
     creditor = db.Column(db.String(100), nullable=True)
     due_date = db.Column(db.DateTime, nullable=True)
-    status = db.Column(db.String(50), nullable=True) # e.g., 'pending', 'paid'
+    status = db.Column(db.String(50), nullable=True) # e.g., 'pending', 'paid', 'overdue'
+    balance = db.Column(db.Float, nullable=False, default=0)  # outstanding amount, kept in step with debt_payments
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     hustle_id = db.Column(db.Integer, db.ForeignKey('hustles.id'), nullable=True)
+    # Position in the change sequence (see sync.py), stamped on every write
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        # Serves the overdue scanner and the aging summary
+        db.Index('ix_debts_status_due_date', 'status', 'due_date'),
+        db.Index('ix_debts_user_id_change_seq', 'user_id', 'change_seq'),
+    )
 
     def to_dict(self):
             return {
@@ -170,12 +341,37 @@ class Debt(db.Model):
             "date": self.date.isoformat() if self.date else None,
             "due_date": self.due_date.isoformat() if self.due_date else None,
             "status": self.status,
+            "balance": self.balance,
+            "amount_paid": round(self.amount - self.balance, 2) if self.balance is not None else None,
             "hustle_id": self.hustle_id,
             "user_id": self.user_id,
             "hustle_title": self.hustle.title if self.hustle else None
         }
 
 
+class DebtPayment(db.Model):
+    __tablename__ = 'debt_payments'
+
+    id = db.Column(db.Integer, primary_key=True)
+    amount = db.Column(db.Float, nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    note = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    debt_id = db.Column(db.Integer, db.ForeignKey('debts.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)  # owner of the debt
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "amount": self.amount,
+            "date": self.date.isoformat() if self.date else None,
+            "note": self.note,
+            "debt_id": self.debt_id,
+            "user_id": self.user_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
+
+
 class Goal(db.Model):
     __tablename__ = 'goals'
     
@@ -184,12 +380,29 @@ class Goal(db.Model):
     description = db.Column(db.String(200), nullable=False)
     status = db.Column(db.String(50), nullable=False)  # e.g., 'active', 'completed'
     due_date = db.Column(db.DateTime, nullable=False)
+    target_amount = db.Column(db.Float, nullable=True)
+    current_amount = db.Column(db.Float, nullable=False, default=0)  # sum of allocated transactions
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     hustle_id = db.Column(db.Integer, db.ForeignKey('hustles.id'), nullable=True)
+    # Position in the change sequence (see sync.py), stamped on every write
+    change_seq = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        db.Index('ix_goals_user_id_change_seq', 'user_id', 'change_seq'),
+    )
+
+    @staticmethod
+    def percent_saved(current_amount, target_amount):
+        """Percentage of the target saved so far, capped at 100"""
+        if not target_amount:
+            return None
+        return round(min(max(current_amount or 0, 0) / target_amount * 100, 100), 1)
 
+    def progress(self):
+        return Goal.percent_saved(self.current_amount, self.target_amount)
 
     def to_dict(self):
         return {
@@ -198,9 +411,86 @@ class Goal(db.Model):
         "description": self.description,
         "status": self.status,
         "due_date": self.due_date.isoformat() if self.due_date else None,
+        "target_amount": self.target_amount,
+        "current_amount": self.current_amount,
+        "progress": self.progress(),
         "user_id": self.user_id,
         "hustle_id": self.hustle_id,
         "hustle_title": self.hustle.title if self.hustle else None,
         "created_at": self.created_at.isoformat() if self.created_at else None,
         "updated_at": self.updated_at.isoformat() if self.updated_at else None
-    }
\ No newline at end of file
+    }
+
+
+class SyncState(db.Model):
+    """Single-row counter handing out change sequence numbers (see sync.py)"""
+    __tablename__ = 'sync_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+    # Tombstones up to this sequence number have been pruned
+    pruned_seq = db.Column(db.Integer, nullable=False, default=0)
+
+
+class Tombstone(db.Model):
+    """Record of a deleted hustle, transaction, debt or goal, so clients can drop their copy"""
+    __tablename__ = 'tombstones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # table name of the deleted row
+    entity_id = db.Column(db.Integer, nullable=False)
+    change_seq = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_tombstones_user_id_change_seq', 'user_id', 'change_seq'),
+    )
+
+
+class OutboxEvent(db.Model):
+    """A committed change to a captured table, for downstream consumers (see outbox.py)"""
+    __tablename__ = 'outbox_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    seq = db.Column(db.Integer, nullable=False)  # change sequence number of the write
+    entity = db.Column(db.String(20), nullable=False)  # table name
+    entity_id = db.Column(db.Integer, nullable=False)
+    operation = db.Column(db.String(10), nullable=False)  # 'created', 'updated' or 'deleted'
+    payload = db.Column(db.Text, nullable=False)  # JSON row columns after the change
+    user_id = db.Column(db.Integer, nullable=True)  # owner; no foreign key, events outlive users
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_outbox_events_seq_id', 'seq', 'id'),
+    )
+
+    def to_dict(self):
+        return {
+            "cursor": f"{self.seq}-{self.id}",
+            "id": self.id,
+            "seq": self.seq,
+            "entity": self.entity,
+            "entity_id": self.entity_id,
+            "operation": self.operation,
+            "payload": json.loads(self.payload),
+            "user_id": self.user_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class OutboxCheckpoint(db.Model):
+    """Position up to which a named consumer has processed the outbox"""
+    __tablename__ = 'outbox_checkpoints'
+
+    consumer = db.Column(db.String(50), primary_key=True)
+    seq = db.Column(db.Integer, nullable=False, default=0)
+    event_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "consumer": self.consumer,
+            "cursor": f"{self.seq}-{self.event_id}",
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -0,0 +1,194 @@
+"""
+Transactional outbox for change-data capture.
+
+Every write to users, hustles, transactions, recurring rules, debts, debt
+payments and goals appends an event (created, updated or deleted, with the
+row's columns after the change) to outbox_events inside the same database
+transaction, so an event exists exactly when its change committed. ORM
+writes are captured by the after_flush hook below; bulk Core statements go
+through capture(), which returns the rows they changed, or record().
+
+Events carry the change sequence number of their write (see sync.py), which
+orders them by commit. A consumer reads the events after its checkpoint in
+(seq, id) order, a batch at a time, and saves the position of the last event
+it has processed, so delivery is at least once and never skips an event
+that committed late. Consumers read through `flask outbox consume` or
+GET /outbox.
+
+`flask tasks compact-outbox` deletes events past the retention window that
+every consumer has already read.
+"""
+
+import json
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import and_, event, insert, or_
+from sqlalchemy.orm import Session
+
+from models import (
+    db, User, Hustle, Transaction, RecurringRule, Debt, DebtPayment, Goal, OutboxEvent, OutboxCheckpoint
+)
+from sync import flush_seq, next_seq
+
+CAPTURED_MODELS = (User, Hustle, Transaction, RecurringRule, Debt, DebtPayment, Goal)
+
+# Columns never copied into an event
+SECRET_COLUMNS = {'password', 'reset_token', 'reset_token_expires', 'verification_token'}
+
+DEFAULT_BATCH_SIZE = 500
+
+outbox_cli = AppGroup('outbox', help='Read the change-data-capture outbox.')
+
+
+def _json_default(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def _event(model, operation, values, seq):
+    if operation == 'deleted':
+        payload = {"id": values['id'], "user_id": values.get('user_id')}
+    else:
+        payload = {key: value for key, value in values.items() if key not in SECRET_COLUMNS}
+    return {
+        "seq": seq,
+        "entity": model.__tablename__,
+        "entity_id": values['id'],
+        "operation": operation,
+        "payload": json.dumps(payload, default=_json_default, sort_keys=True),
+        "user_id": values['id'] if model is User else values.get('user_id'),
+    }
+
+
+def _columns(obj):
+    return {column.key: getattr(obj, column.key) for column in obj.__table__.columns}
+
+
+@event.listens_for(Session, 'before_flush')
+def _note_deletions(session, flush_context, instances):
+    # Read while the rows still exist; after the flush they cannot be refreshed
+    deleted = [
+        (type(obj), {"id": obj.id, "user_id": getattr(obj, 'user_id', None)})
+        for obj in session.deleted if isinstance(obj, CAPTURED_MODELS)
+    ]
+    if deleted:
+        session.info['outbox_deleted'] = deleted
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_deletions(session, previous_transaction):
+    session.info.pop('outbox_deleted', None)
+
+
+@event.listens_for(Session, 'after_flush')
+def capture_flush(session, flush_context):
+    """Append an event for every captured row the flush inserted, changed or deleted"""
+    changes = [(type(obj), 'created', _columns(obj)) for obj in session.new if isinstance(obj, CAPTURED_MODELS)]
+    changes += [
+        (type(obj), 'updated', _columns(obj)) for obj in session.dirty
+        if isinstance(obj, CAPTURED_MODELS) and session.is_modified(obj, include_collections=False)
+    ]
+    changes += [(model, 'deleted', values) for model, values in session.info.pop('outbox_deleted', ())]
+    if not changes:
+        return
+
+    seq = flush_seq(session)
+    session.connection().execute(insert(OutboxEvent), [
+        _event(model, operation, values, seq) for model, operation, values in changes
+    ])
+
+
+def record(model, operation, rows, seq=None):
+    """Append events for rows (mappings of column values; id and user_id for deletes) written in bulk"""
+    rows = list(rows)
+    if not rows:
+        return
+    seq = seq or next_seq()
+    db.session.execute(insert(OutboxEvent), [_event(model, operation, dict(row), seq) for row in rows])
+
+
+def capture(statement, model, operation='updated', params=None):
+    """Execute a bulk UPDATE/INSERT/DELETE on model's table and record an event per row it touched.
+
+    Returns the changed rows (every column, via RETURNING).
+    """
+    statement = statement.returning(*model.__table__.columns)
+    result = db.session.execute(statement, params) if params is not None else db.session.execute(statement)
+    rows = [row._mapping for row in result.all()]
+    record(model, operation, rows)
+    return rows
+
+
+# Consumers
+
+def parse_cursor(raw):
+    """(seq, event_id) from a "seq-id" cursor; raises ValueError"""
+    seq, event_id = (int(part) for part in raw.split('-'))
+    if seq < 0 or event_id < 0:
+        raise ValueError(raw)
+    return seq, event_id
+
+
+def get_position(consumer):
+    """(seq, event_id) of the last event the consumer has processed"""
+    checkpoint = db.session.get(OutboxCheckpoint, consumer)
+    return (checkpoint.seq, checkpoint.event_id) if checkpoint else (0, 0)
+
+
+def events_after(position):
+    """Query of the events after a (seq, event_id) position"""
+    seq, event_id = position
+    return OutboxEvent.query.filter(
+        or_(OutboxEvent.seq > seq, and_(OutboxEvent.seq == seq, OutboxEvent.id > event_id))
+    )
+
+
+def read_events(after, batch_size=DEFAULT_BATCH_SIZE):
+    """The next batch of events after the (seq, event_id) position, in commit order"""
+    return events_after(after).order_by(OutboxEvent.seq, OutboxEvent.id).limit(batch_size).all()
+
+
+def save_checkpoint(consumer, seq, event_id):
+    """Record the consumer's position and commit"""
+    checkpoint = db.session.get(OutboxCheckpoint, consumer)
+    if checkpoint is None:
+        checkpoint = OutboxCheckpoint(consumer=consumer)
+        db.session.add(checkpoint)
+    checkpoint.seq, checkpoint.event_id = seq, event_id
+    db.session.commit()
+    return checkpoint
+
+
+@outbox_cli.command('consume')
+@click.option('--consumer', required=True, help='Name the checkpoint is saved under.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True,
+              help='Events read and checkpointed at a time.')
+@click.option('--max-batches', default=0, show_default=True, help='Stop after this many batches (0: until caught up).')
+def consume_command(consumer, batch_size, max_batches):
+    """Print the events after the consumer's checkpoint as JSON lines, checkpointing every batch."""
+    position = get_position(consumer)
+    batches = events_read = 0
+    while not max_batches or batches < max_batches:
+        events = read_events(position, batch_size)
+        if not events:
+            break
+        for outbox_event in events:
+            click.echo(json.dumps(outbox_event.to_dict(), separators=(',', ':')))
+        position = (events[-1].seq, events[-1].id)
+        save_checkpoint(consumer, *position)
+        batches += 1
+        events_read += len(events)
+    click.echo(f"{consumer}: {events_read} events, now at {position[0]}-{position[1]}", err=True)
+
+
+@outbox_cli.command('status')
+def status_command():
+    """Show every consumer's checkpoint and the events still ahead of it."""
+    checkpoints = OutboxCheckpoint.query.order_by(OutboxCheckpoint.consumer).all()
+    if not checkpoints:
+        click.echo("No consumers")
+    for checkpoint in checkpoints:
+        pending = events_after((checkpoint.seq, checkpoint.event_id)).count()
+        click.echo(f"{checkpoint.consumer}: at {checkpoint.seq}-{checkpoint.event_id}, {pending} pending")
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Parallel load-fixture generator for large datasets (millions of transactions)
+
+Splits the users into partitions and generates each partition in its own
+worker process (rows come from benchmarks/datagen.py, so output is the same
+for a given seed regardless of the number of workers). Secondary indexes are
+dropped for the load and rebuilt once at the end, also when the load fails.
+
+- SQLite: each worker writes its partition into a private shard file with
+  executemany, then the shards are ATTACHed and copied into the main database
+  with INSERT ... SELECT, SQLite's fastest bulk path.
+- Other databases: each worker inserts its partition directly with executemany.
+
+Usage: DATABASE_URL=sqlite:///load.db python parallel_seed.py --users 100000 --workers 8
+"""
+
+import sys
+import os
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from sqlalchemy import create_engine, func, inspect
+
+    from app import app
+    from models import db, User, Hustle, Transaction, Debt, Goal
+    from benchmarks.datagen import DEFAULT_SCALE, TABLES, count_rows, generate_users, insert_rows
+
+except ImportError as e:
+    print(f"Import error: {e}")
+    print("Please check:")
+    print("1. Your main app file name (change 'from app import app' if needed)")
+    print("2. Your models.py and benchmarks/datagen.py files exist")
+    sys.exit(1)
+
+MODELS = {'users': User, 'hustles': Hustle, 'transactions': Transaction, 'debts': Debt, 'goals': Goal}
+
+# Users generated and written per round inside a worker; bounds worker memory
+USERS_PER_CHUNK = 500
+
+
+def partition_users(start_index, users, workers):
+    """Split a user index range into roughly equal contiguous partitions"""
+    size = -(-users // workers)
+    return [
+        (first, min(size, start_index + users - first))
+        for first in range(start_index, start_index + users, size)
+    ]
+
+
+def _sqlite_value(value):
+    """Store values the way SQLAlchemy's SQLite dialect does"""
+    if hasattr(value, 'hour'):
+        return value.strftime('%Y-%m-%d %H:%M:%S.%f')
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _write_sqlite_shard(path, rows):
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=OFF")
+    connection.execute("PRAGMA synchronous=OFF")
+    for name in TABLES:
+        if not rows[name]:
+            continue
+        columns = list(rows[name][0].keys())
+        sql = f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        connection.executemany(sql, ([_sqlite_value(row[c]) for c in columns] for row in rows[name]))
+    connection.commit()
+    connection.close()
+
+
+def generate_partition(task):
+    """Worker: generate one user partition and write it; returns rows written per table"""
+    seed, first, count, ids, scale, target = task
+    totals = dict.fromkeys(TABLES, 0)
+
+    engine = None
+    if target['kind'] == 'sqlite-shard':
+        shard_engine = create_engine(f"sqlite:///{target['path']}")
+        db.metadata.create_all(shard_engine, tables=[MODELS[name].__table__ for name in TABLES])
+        shard_engine.dispose()
+    else:
+        engine = create_engine(target['url'])
+
+    for chunk_first in range(first, first + count, USERS_PER_CHUNK):
+        chunk_count = min(USERS_PER_CHUNK, first + count - chunk_first)
+        rows = generate_users(seed, chunk_first, chunk_count, ids, scale)
+        if engine is None:
+            _write_sqlite_shard(target['path'], rows)
+        else:
+            with engine.begin() as connection:
+                insert_rows(connection, rows)
+        for name in TABLES:
+            totals[name] += len(rows[name])
+
+    if engine is not None:
+        engine.dispose()
+    return totals
+
+
+def count_partition(task):
+    seed, first, count, scale = task
+    return count_rows(seed, first, count, scale)
+
+
+def drop_secondary_indexes(engine):
+    """Drop non-unique indexes on the seeded tables; returns what is needed to rebuild them"""
+    inspector = inspect(engine)
+    dropped = []
+    with engine.begin() as connection:
+        for name in TABLES:
+            for index in inspector.get_indexes(name):
+                if index.get('unique'):
+                    continue
+                connection.exec_driver_sql(f"DROP INDEX {index['name']}")
+                dropped.append((name, index['name'], index['column_names']))
+    return dropped
+
+
+def rebuild_indexes(engine, dropped):
+    with engine.begin() as connection:
+        for table, name, columns in dropped:
+            connection.exec_driver_sql(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+
+
+def merge_sqlite_shards(database_path, shard_paths):
+    """Copy every shard into the main database with ATTACH + INSERT ... SELECT"""
+    connection = sqlite3.connect(database_path, isolation_level=None)
+    connection.execute("PRAGMA synchronous=OFF")
+    for path in shard_paths:
+        # ATTACH / DETACH are not allowed inside a transaction
+        connection.execute("ATTACH DATABASE ? AS shard", (path,))
+        connection.execute("BEGIN")
+        for name in TABLES:
+            columns = ', '.join(column.name for column in MODELS[name].__table__.columns)
+            connection.execute(f"INSERT INTO main.{name} ({columns}) SELECT {columns} FROM shard.{name}")
+        connection.execute("COMMIT")
+        connection.execute("DETACH DATABASE shard")
+    connection.close()
+
+
+def seed(users, workers, seed_value=42, scale=None, start_index=0, reset=False):
+    scale = {**DEFAULT_SCALE, **(scale or {})}
+
+    with app.app_context():
+        if reset:
+            db.drop_all()
+        db.create_all()
+        engine = db.engine
+        url = engine.url.render_as_string(hide_password=False)
+        is_sqlite = engine.dialect.name == 'sqlite'
+        next_ids = {
+            name: (db.session.query(func.max(model.id)).scalar() or 0) + 1
+            for name, model in MODELS.items()
+        }
+        db.session.remove()
+
+        partitions = partition_users(start_index, users, workers)
+        started = time.perf_counter()
+
+        shard_dir = tempfile.mkdtemp(prefix='seed-shards-')
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Row counts per partition give every partition its own dense id range
+            counts = list(pool.map(count_partition, [(seed_value, first, count, scale) for first, count in partitions]))
+            tasks = []
+            for index, ((first, count), partition_counts) in enumerate(zip(partitions, counts)):
+                if is_sqlite:
+                    target = {'kind': 'sqlite-shard', 'path': os.path.join(shard_dir, f"shard-{index}.db")}
+                else:
+                    target = {'kind': 'direct', 'url': url}
+                tasks.append((seed_value, first, count, dict(next_ids), scale, target))
+                for name in TABLES:
+                    next_ids[name] += partition_counts[name]
+
+            dropped = drop_secondary_indexes(engine)
+            print(f"Dropped {len(dropped)} secondary indexes for the load")
+
+            # The indexes come back and the shards go away even if a worker
+            # or the merge fails
+            try:
+                totals = dict.fromkeys(TABLES, 0)
+                for partition_totals in pool.map(generate_partition, tasks):
+                    for name in TABLES:
+                        totals[name] += partition_totals[name]
+                generated = time.perf_counter()
+                rows = sum(totals.values())
+                print(f"✓ Generated {rows:,} rows in {generated - started:.1f}s "
+                      f"({rows / (generated - started):,.0f} rows/sec across {workers} workers)")
+
+                if is_sqlite:
+                    engine.dispose()
+                    merge_sqlite_shards(engine.url.database, [task[5]['path'] for task in tasks])
+                    merged = time.perf_counter()
+                    print(f"✓ Merged shards in {merged - generated:.1f}s ({rows / (merged - generated):,.0f} rows/sec)")
+            finally:
+                shutil.rmtree(shard_dir, ignore_errors=True)
+                rebuild_started = time.perf_counter()
+                rebuild_indexes(engine, dropped)
+                print(f"✓ Rebuilt {len(dropped)} indexes in {time.perf_counter() - rebuild_started:.1f}s")
+
+        elapsed = time.perf_counter() - started
+        for name in TABLES:
+            print(f"  {name:<13} {totals[name]:>12,}")
+        print(f"Total: {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/sec)")
+        return totals
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate large load fixtures in parallel")
+    parser.add_argument('--users', type=int, default=10000, help='number of users to generate')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='worker processes')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--start-index', type=int, default=0, help='index of the first user (to extend a dataset)')
+    parser.add_argument('--reset', action='store_true', help='drop and recreate all tables first')
+    for key, value in DEFAULT_SCALE.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=int, default=value)
+    args = parser.parse_args()
+
+    print("Parallel Seeding Script")
+    print("=" * 40)
+    seed(
+        args.users,
+        args.workers,
+        seed_value=args.seed,
+        scale={key: getattr(args, key) for key in DEFAULT_SCALE},
+        start_index=args.start_index,
+        reset=args.reset
+    )
+    print("=" * 40)
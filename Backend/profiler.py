@@ -0,0 +1,141 @@
+"""
+Per-request SQL profiler with query budgets.
+
+Records every statement a request executes together with its duration and
+the line of application code that triggered it. Outside production the
+totals are returned in X-DB-Queries / X-DB-Time headers. Requests that run
+more statements than their budget are logged, or raise QueryBudgetExceeded
+when SQL_QUERY_BUDGET_STRICT is set (always the case under app.testing) so
+test runs fail on query-count regressions.
+
+Routes declare their budget with the query_budget decorator:
+
+    @dashboard_bp.route('/dashboard/overview', methods=['GET'])
+    @query_budget(5)
+    @jwt_required()
+    def get_dashboard_overview():
+        ...
+
+query_budget(None) leaves a route unbudgeted. It is for batched deletions,
+which run a few statements per batch, so their count grows with the rows
+deleted by design.
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+_ignored_files = (os.path.abspath(__file__),)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a request runs more SQL than its budget"""
+
+
+def query_budget(max_queries):
+    """Declare the maximum number of SQL statements a view may execute (None: unbounded)"""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def _call_site():
+    """First frame inside the application code that led to the statement"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith('<'):
+            filename = os.path.abspath(filename)
+        if (filename.startswith(PROJECT_ROOT)
+                and 'site-packages' not in filename
+                and filename not in _ignored_files):
+            return f"{os.path.relpath(filename, PROJECT_ROOT)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def _profiling():
+    return has_app_context() and g.get('sql_profile') is not None
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _profiling():
+        conn.info.setdefault('profiler_query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not _profiling() or not conn.info.get('profiler_query_start'):
+        return
+    duration = time.perf_counter() - conn.info['profiler_query_start'].pop()
+    g.sql_profile.append({
+        "statement": statement,
+        "duration": duration,
+        "call_site": _call_site()
+    })
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # A statement that raised never reaches after_cursor_execute
+    conn = context.connection
+    if conn is not None and context.execution_context is not None and conn.info.get('profiler_query_start'):
+        conn.info['profiler_query_start'].pop()
+
+
+class SQLProfiler:
+    """Flask extension recording the SQL statements of each request"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SQL_PROFILER_ENABLED', False)
+        app.config.setdefault('SQL_QUERY_BUDGET', 20)
+        app.config.setdefault('SQL_QUERY_BUDGET_STRICT', False)
+
+        app.before_request(self.before_request)
+        app.after_request(self.after_request)
+        app.extensions['sql_profiler'] = self
+        self.app = app
+
+    def before_request(self):
+        if self.app.config['SQL_PROFILER_ENABLED'] or self.app.testing:
+            g.sql_profile = []
+
+    def budget_for(self, endpoint):
+        view = self.app.view_functions.get(endpoint)
+        return getattr(view, 'query_budget', self.app.config['SQL_QUERY_BUDGET'])
+
+    def after_request(self, response):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+
+        query_count = len(profile)
+        db_time_ms = sum(entry["duration"] for entry in profile) * 1000
+        response.headers['X-DB-Queries'] = str(query_count)
+        response.headers['X-DB-Time'] = f"{db_time_ms:.3f}ms"
+
+        budget = self.budget_for(request.endpoint)
+        if budget is not None and query_count > budget:
+            hot_spots = Counter(entry["call_site"] for entry in profile).most_common(5)
+            message = (
+                f"{request.method} {request.path} ({request.endpoint}) ran {query_count} SQL statements "
+                f"in {db_time_ms:.1f}ms, budget is {budget}. Top call sites: "
+                + ", ".join(f"{site} x{count}" for site, count in hot_spots)
+            )
+            if self.app.config['SQL_QUERY_BUDGET_STRICT'] or self.app.testing:
+                raise QueryBudgetExceeded(message)
+            self.app.logger.warning(message)
+
+        return response
@@ -0,0 +1,95 @@
+"""
+Per-hustle income, expenses, profit and rank from one windowed query.
+
+ranked_hustles() aggregates a user's transactions per hustle in a CTE and
+ranks the totals with window functions in the same statement: RANK() by
+profit, ROW_NUMBER() by income and COUNT(*) OVER () for the number of
+hustles ranked. The dashboard's top-5 income comparison and top-3
+performance blocks are both read from one execution of it (top_hustles()),
+and GET /hustles/ranking pages through it (hustle_ranking()).
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from models import db, Hustle, Transaction
+
+# A hustle with no transaction for this long needs attention
+ACTIVITY_WINDOW = timedelta(days=30)
+
+
+def ranked_hustles(user_id, idle=True):
+    """Subquery of the user's hustles with their totals and ranks.
+
+    idle=False leaves out hustles without transactions, as the dashboard does.
+    """
+    totals = select(
+        Hustle.id,
+        Hustle.title,
+        func.coalesce(func.sum(Transaction.amount).filter(Transaction.type == 'income'), 0).label('income'),
+        func.coalesce(func.sum(Transaction.amount).filter(Transaction.type == 'expense'), 0).label('expenses'),
+        func.count(Transaction.id).label('transactions'),
+        func.max(Transaction.created_at).label('last_activity')
+    ).select_from(Hustle).join(
+        Transaction, Transaction.hustle_id == Hustle.id, isouter=idle
+    ).where(
+        Hustle.user_id == user_id
+    ).group_by(Hustle.id, Hustle.title).cte('hustle_totals')
+
+    profit = totals.c.income - totals.c.expenses
+    return select(
+        totals,
+        profit.label('profit'),
+        func.rank().over(order_by=profit.desc()).label('rank'),
+        func.row_number().over(order_by=(totals.c.income.desc(), totals.c.id)).label('income_rank'),
+        func.count().over().label('total')
+    ).subquery('ranked_hustles')
+
+
+def hustle_status(last_activity, profit, now=None):
+    """'active' for a profitable hustle with recent transactions, else 'needs_attention'"""
+    now = now or datetime.utcnow()
+    if last_activity and now - last_activity < ACTIVITY_WINDOW and profit >= 0:
+        return 'active'
+    return 'needs_attention'
+
+
+def top_hustles(user_id, by_income=5, by_profit=3):
+    """(top hustles by income, top hustles by profit) among those with transactions, one query"""
+    ranked = ranked_hustles(user_id, idle=False)
+    rows = db.session.execute(
+        select(ranked).where(
+            (ranked.c.income_rank <= by_income) | (ranked.c.rank <= by_profit)
+        ).order_by(ranked.c.rank, ranked.c.id)
+    ).all()
+    by_profit_rows = [row for row in rows if row.rank <= by_profit][:by_profit]
+    by_income_rows = sorted((row for row in rows if row.income_rank <= by_income), key=lambda row: row.income_rank)
+    return by_income_rows, by_profit_rows
+
+
+def hustle_ranking(user_id, limit, offset=0):
+    """One page of the user's hustles in profit order and the number of hustles ranked"""
+    ranked = ranked_hustles(user_id)
+    rows = db.session.execute(
+        select(ranked).order_by(ranked.c.rank, ranked.c.id).limit(limit).offset(offset)
+    ).all()
+    if rows:
+        return rows, rows[0].total
+    # Past the last page the window has no row to report the total on
+    total = db.session.query(func.count(Hustle.id)).filter(Hustle.user_id == user_id).scalar() if offset else 0
+    return rows, total
+
+
+def ranking_entry(row, now=None):
+    return {
+        'id': row.id,
+        'title': row.title,
+        'rank': row.rank,
+        'income_rank': row.income_rank,
+        'income': row.income,
+        'expenses': row.expenses,
+        'profit': row.profit,
+        'transactions': row.transactions,
+        'last_activity': row.last_activity.isoformat() if row.last_activity else None,
+        'status': hustle_status(row.last_activity, row.profit, now)
+    }
@@ -0,0 +1,165 @@
+"""
+Recurring transaction rules and their batched materialization.
+
+A rule is an RRULE-style schedule (FREQ/INTERVAL/COUNT/UNTIL) for a
+transaction. Occurrence n is always computed from the rule's start date, so
+monthly rules on the 31st stay on the last day of short months without
+drifting. The scheduler picks due rules through the next_run_at index, writes
+every missed occurrence in one pass and advances next_run_at in the same
+transaction. Each materialized transaction is unique on (rule, occurrence
+time), so re-running after a crash or concurrently never duplicates rows.
+Changing a rule's frequency or interval, or resuming a paused rule, skips
+the occurrences already in the past instead of back-filling them.
+"""
+
+import calendar
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from models import db, RecurringRule, Transaction
+from sync import next_seq
+from outbox import capture
+
+FREQUENCIES = ["daily", "weekly", "monthly", "yearly"]
+
+# Rules loaded and materialized per commit
+DEFAULT_BATCH_SIZE = 500
+
+
+def parse_rrule(value):
+    """Parse 'FREQ=MONTHLY;INTERVAL=1;COUNT=12;UNTIL=20251231' into rule fields"""
+    fields = {}
+    for part in value.strip().split(';'):
+        if not part:
+            continue
+        key, _, raw = part.partition('=')
+        key = key.strip().upper()
+        raw = raw.strip()
+        if key == 'FREQ':
+            fields['frequency'] = raw.lower()
+        elif key == 'INTERVAL':
+            fields['interval'] = int(raw)
+        elif key == 'COUNT':
+            fields['count'] = int(raw)
+        elif key == 'UNTIL':
+            fields['until'] = datetime.strptime(raw[:8], '%Y%m%d')
+        else:
+            raise ValueError(f"Unsupported RRULE part: {key}")
+    if fields.get('frequency') not in FREQUENCIES:
+        raise ValueError(f"FREQ must be one of {', '.join(f.upper() for f in FREQUENCIES)}")
+    return fields
+
+
+def _add_months(value, months):
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def occurrence(rule, n):
+    """Datetime of the rule's n-th occurrence (0-based)"""
+    step = n * (rule.interval or 1)
+    if rule.frequency == 'daily':
+        return rule.start_date + timedelta(days=step)
+    if rule.frequency == 'weekly':
+        return rule.start_date + timedelta(weeks=step)
+    if rule.frequency == 'monthly':
+        return _add_months(rule.start_date, step)
+    return _add_months(rule.start_date, 12 * step)
+
+
+def next_run(rule):
+    """Next occurrence still to materialize, or None once the rule is finished or paused"""
+    if not rule.is_active:
+        return None
+    if rule.count is not None and rule.occurrences >= rule.count:
+        return None
+    at = occurrence(rule, rule.occurrences + (rule.skipped or 0))
+    if rule.until is not None and at > rule.until:
+        return None
+    return at
+
+
+def skip_missed(rule, now=None):
+    """Pass over, without materializing, the occurrences earlier than now.
+
+    Used when a rule's grid changes or a paused rule resumes; occurrences stay
+    anchored to the start date, so monthly rules keep their day of the month.
+    """
+    now = now or datetime.utcnow()
+    n = rule.occurrences + (rule.skipped or 0)
+    while True:
+        at = occurrence(rule, n)
+        if at >= now or (rule.until is not None and at > rule.until):
+            break
+        n += 1
+    rule.skipped = n - rule.occurrences
+    return rule
+
+
+def schedule(rule):
+    """Recompute next_run_at after the rule was created or edited"""
+    rule.next_run_at = next_run(rule)
+    return rule
+
+
+def _insert_ignoring_duplicates(rows):
+    """Insert transactions, skipping occurrences that already exist"""
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        capture(insert(Transaction), Transaction, 'created', rows)
+        return
+    statement = dialect_insert(Transaction).on_conflict_do_nothing(
+        index_elements=['recurring_rule_id', 'created_at']
+    )
+    capture(statement, Transaction, 'created', rows)
+
+
+def materialize_due(now=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Materialize every due occurrence for all users; returns (rules, transactions) processed"""
+    now = now or datetime.utcnow()
+    rules_processed = 0
+    created = 0
+    while True:
+        rules = RecurringRule.query.filter(
+            RecurringRule.next_run_at.isnot(None),
+            RecurringRule.next_run_at <= now
+        ).order_by(
+            RecurringRule.next_run_at
+        ).limit(batch_size).with_for_update(skip_locked=True).all()
+        if not rules:
+            break
+
+        rows = []
+        for rule in rules:
+            at = rule.next_run_at
+            while at is not None and at <= now:
+                rows.append({
+                    "amount": rule.amount,
+                    "type": rule.type,
+                    "description": rule.description,
+                    "category": rule.category,
+                    "created_at": at,
+                    "user_id": rule.user_id,
+                    "hustle_id": rule.hustle_id,
+                    "recurring_rule_id": rule.id
+                })
+                rule.occurrences += 1
+                at = next_run(rule)
+            rule.next_run_at = at
+            rule.last_run_at = now
+
+        if rows:
+            seq = next_seq()
+            for row in rows:
+                row["change_seq"] = seq
+            _insert_ignoring_duplicates(rows)
+        db.session.commit()
+        rules_processed += len(rules)
+        created += len(rows)
+    return rules_processed, created
@@ -0,0 +1,185 @@
+"""
+Read-only list serialization from Core rows.
+
+The GET list endpoints never touch ORM entities: each list has a field spec
+mapping an output key to the column expressions it reads and a function
+rendering them, the list query is narrowed with with_entities() to those
+columns, and the response dicts are built straight from the row tuples. That
+skips identity-map bookkeeping, attribute instrumentation and per-object
+state, so large lists serialize faster and in less memory
+(benchmarks/list_benchmark.py). Writes still go through the ORM.
+
+Without ?fields= a list returns the same keys as the model's to_dict(); with
+`?fields=title,amount` only those columns are selected, and the hustle/user
+outer join is added only when a joined key (hustle_title, username) is asked
+for, so unrequested columns such as transactions.notes are never read.
+"""
+
+from collections import namedtuple
+
+from models import db, User, Hustle, Transaction, Debt, Goal
+
+# columns: expressions selected; render: builds the value from them (None
+# copies a single column as is); join: (target, onclause) outer-joined when
+# the field is selected
+Field = namedtuple('Field', ['columns', 'render', 'join'])
+
+
+def _column(column, render=None):
+    return Field((column,), render, None)
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _day(value):
+    return value.strftime('%Y-%m-%d') if value else None
+
+
+def _hustle_title(model):
+    return Field((Hustle.title,), None, (Hustle, model.hustle_id == Hustle.id))
+
+
+HUSTLE_FIELDS = {
+    'id': _column(Hustle.id),
+    'title': _column(Hustle.title),
+    'type': _column(Hustle.type),
+    'description': _column(Hustle.description),
+    'date': _column(Hustle.date, _iso),
+    'location': _column(Hustle.location),
+    'status': _column(Hustle.status),
+    'created_at': _column(Hustle.created_at, _iso),
+    'updated_at': _column(Hustle.updated_at, _iso),
+    'user_id': _column(Hustle.user_id),
+    'change_seq': _column(Hustle.change_seq),
+    'username': Field((User.username,), None, (User, Hustle.user_id == User.id)),
+}
+
+TRANSACTION_FIELDS = {
+    'id': _column(Transaction.id),
+    'amount': _column(Transaction.amount),
+    'type': _column(Transaction.type),
+    'description': _column(Transaction.description),
+    'created_at': _column(Transaction.created_at, _day),
+    'updated_at': _column(Transaction.updated_at, _day),
+    'user_id': _column(Transaction.user_id),
+    'hustle_id': _column(Transaction.hustle_id),
+    'category': _column(Transaction.category),
+    'notes': _column(Transaction.notes),
+    'tags': _column(Transaction.tags, lambda tags: tags.split(',') if tags else []),
+    'recurring_rule_id': _column(Transaction.recurring_rule_id),
+    'goal_id': _column(Transaction.goal_id),
+    'change_seq': _column(Transaction.change_seq),
+    'hustle_title': _hustle_title(Transaction),
+}
+
+DEBT_FIELDS = {
+    'id': _column(Debt.id),
+    'amount': _column(Debt.amount),
+    'description': _column(Debt.description),
+    'creditor': _column(Debt.creditor),
+    'date': _column(Debt.date, _iso),
+    'due_date': _column(Debt.due_date, _iso),
+    'status': _column(Debt.status),
+    'balance': _column(Debt.balance),
+    'amount_paid': Field(
+        (Debt.amount, Debt.balance),
+        lambda amount, balance: round(amount - balance, 2) if balance is not None else None,
+        None
+    ),
+    'hustle_id': _column(Debt.hustle_id),
+    'user_id': _column(Debt.user_id),
+    'change_seq': _column(Debt.change_seq),
+    'hustle_title': _hustle_title(Debt),
+}
+
+GOAL_FIELDS = {
+    'id': _column(Goal.id),
+    'title': _column(Goal.title),
+    'description': _column(Goal.description),
+    'status': _column(Goal.status),
+    'due_date': _column(Goal.due_date, _iso),
+    'target_amount': _column(Goal.target_amount),
+    'current_amount': _column(Goal.current_amount),
+    'progress': Field((Goal.current_amount, Goal.target_amount), Goal.percent_saved, None),
+    'user_id': _column(Goal.user_id),
+    'hustle_id': _column(Goal.hustle_id),
+    'hustle_title': _hustle_title(Goal),
+    'created_at': _column(Goal.created_at, _iso),
+    'updated_at': _column(Goal.updated_at, _iso),
+    'change_seq': _column(Goal.change_seq),
+}
+
+# Default keys of each list, matching to_dict() (the hustle lists have
+# always left out location and updated_at; change_seq is only listed on request)
+HUSTLE_LIST_FIELDS = ['id', 'title', 'type', 'description', 'date', 'status', 'user_id', 'username', 'created_at']
+TRANSACTION_LIST_FIELDS = [name for name in TRANSACTION_FIELDS if name not in ('hustle_title', 'change_seq')]
+DEBT_LIST_FIELDS = [name for name in DEBT_FIELDS if name != 'change_seq']
+GOAL_LIST_FIELDS = [name for name in GOAL_FIELDS if name != 'change_seq']
+
+
+def parse_fields(raw, spec):
+    """Keys requested in a ?fields= value, in order; raises ValueError for unknown keys"""
+    names = list(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    if not names:
+        raise ValueError("fields must name at least one field")
+    unknown = [name for name in names if name not in spec]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(spec)}")
+    return names
+
+
+def select_fields(query, spec, names):
+    """Narrow `query` to the columns (and joins) the named fields need.
+
+    Returns the query and, per field, the positions of its columns in each row.
+    Columns are matched by identity since == on them builds SQL expressions.
+    """
+    # The primary key is always selected so the listed model anchors the FROM,
+    # even when only joined columns are requested
+    model = query.column_descriptions[0]['entity']
+    columns = {id(model.id): (0, model.id)}
+    joins = {}
+    positions = []
+    for name in names:
+        field = spec[name]
+        positions.append([columns.setdefault(id(column), (len(columns), column))[0] for column in field.columns])
+        if field.join:
+            joins.setdefault(id(field.join), field.join)
+    query = query.with_entities(*(column for _, column in columns.values()))
+    for target, onclause in joins.values():
+        query = query.outerjoin(target, onclause)
+    return query, positions
+
+
+def serialize_rows(rows, spec, names, positions):
+    """Dicts of the named fields from row tuples selected by select_fields()"""
+    # Split by shape once so the per-row loop does no dispatching
+    copied, rendered, combined = [], [], []
+    for name, indexes in zip(names, positions):
+        render = spec[name].render
+        if len(indexes) > 1:
+            combined.append((name, render, indexes))
+        elif render is None:
+            copied.append((name, indexes[0]))
+        else:
+            rendered.append((name, render, indexes[0]))
+
+    result = []
+    for row in rows:
+        item = {name: row[i] for name, i in copied}
+        for name, render, i in rendered:
+            item[name] = render(row[i])
+        for name, render, indexes in combined:
+            item[name] = render(*[row[i] for i in indexes])
+        result.append(item)
+    return result
+
+
+def serialize_query(query, spec, names):
+    """Run a list query narrowed to `names` on the session's connection and serialize the rows"""
+    query, positions = select_fields(query, spec, names)
+    # Executed as a plain Core statement: no ORM result processing per row
+    rows = db.session.connection().execute(query.statement).all()
+    return serialize_rows(rows, spec, names, positions)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Snapshot/restore script for fast database resets
+
+Build a seeded template once, then restore it in well under a second
+instead of dropping, recreating and reseeding the database:
+
+    python snapshot_database.py build --users 1000   # reset + seed + save template
+    python snapshot_database.py save                 # save the current database as template
+    python snapshot_database.py restore              # reset the database to the template
+
+- SQLite: the template is a file next to the database (<name>.template).
+  Restore copies it back with SQLite's online backup API, which is safe while
+  the app holds connections; --copy does an atomic file copy instead.
+- PostgreSQL: the template is a database named <name>_template and restore
+  recreates the database from it with CREATE DATABASE ... TEMPLATE.
+"""
+
+import sys
+import os
+import time
+import shutil
+import sqlite3
+import argparse
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from sqlalchemy import create_engine, text
+
+    from app import app
+    from models import db
+
+except ImportError as e:
+    print(f"Import error: {e}")
+    print("Please check:")
+    print("1. Your main app file name (change 'from app import app' if needed)")
+    print("2. Your models.py file exists")
+    sys.exit(1)
+
+
+def database_url():
+    with app.app_context():
+        return db.engine.url
+
+
+def sqlite_template_path(url, template=None):
+    return template or f"{url.database}.template"
+
+
+def _sqlite_backup(source_path, target_path):
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def _postgres_admin_engine(url):
+    """Connection to the maintenance database; CREATE/DROP DATABASE need autocommit"""
+    return create_engine(url.set(database='postgres'), isolation_level='AUTOCOMMIT')
+
+
+def _terminate_connections(connection, name):
+    connection.execute(text(
+        "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+        "WHERE datname = :name AND pid <> pg_backend_pid()"
+    ), {"name": name})
+
+
+def save_snapshot(template=None):
+    """Save the current database as the template"""
+    url = database_url()
+    if url.get_backend_name() == 'sqlite':
+        path = sqlite_template_path(url, template)
+        _sqlite_backup(url.database, path)
+        return path
+
+    if url.get_backend_name() == 'postgresql':
+        name = template or f"{url.database}_template"
+        with app.app_context():
+            db.engine.dispose()
+        engine = _postgres_admin_engine(url)
+        with engine.connect() as connection:
+            _terminate_connections(connection, url.database)
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+            connection.execute(text(f'CREATE DATABASE "{name}" TEMPLATE "{url.database}"'))
+        engine.dispose()
+        return name
+
+    raise ValueError(f"Snapshots are not supported for {url.get_backend_name()}")
+
+
+def restore_snapshot(template=None, copy=False):
+    """Reset the database to the template"""
+    url = database_url()
+    if url.get_backend_name() == 'sqlite':
+        path = sqlite_template_path(url, template)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No template at {path}; run: python snapshot_database.py build")
+        with app.app_context():
+            db.engine.dispose()
+        if copy:
+            tmp_path = f"{url.database}.restoring"
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, url.database)
+        else:
+            _sqlite_backup(path, url.database)
+        return path
+
+    if url.get_backend_name() == 'postgresql':
+        name = template or f"{url.database}_template"
+        with app.app_context():
+            db.engine.dispose()
+        engine = _postgres_admin_engine(url)
+        with engine.connect() as connection:
+            _terminate_connections(connection, url.database)
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{url.database}"'))
+            connection.execute(text(f'CREATE DATABASE "{url.database}" TEMPLATE "{name}"'))
+        engine.dispose()
+        return name
+
+    raise ValueError(f"Snapshots are not supported for {url.get_backend_name()}")
+
+
+def build_snapshot(users=0, seed=42, template=None):
+    """Reset and seed the database, then save it as the template"""
+    from reset_database import reset_database
+    from simple_seed import create_users_direct
+
+    if not reset_database():
+        raise RuntimeError("Database reset failed")
+    create_users_direct()
+    if users:
+        from benchmarks.generate_data import generate
+        with app.app_context():
+            totals = generate(users, seed=seed)
+        print(f"✓ Generated {sum(totals.values()):,} synthetic rows")
+    return save_snapshot(template)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Snapshot and restore the database")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='reset, seed and save the template')
+    build_parser.add_argument('--users', type=int, default=0, help='synthetic users to add on top of the demo users')
+    build_parser.add_argument('--seed', type=int, default=42)
+    subparsers.add_parser('save', help='save the current database as the template')
+    restore_parser = subparsers.add_parser('restore', help='reset the database to the template')
+    restore_parser.add_argument('--copy', action='store_true', help='SQLite: atomic file copy instead of the backup API')
+
+    for subparser in subparsers.choices.values():
+        subparser.add_argument('--template', help='template file (SQLite) or database name (PostgreSQL)')
+
+    args = parser.parse_args()
+    started = time.perf_counter()
+
+    try:
+        if args.command == 'build':
+            location = build_snapshot(args.users, args.seed, args.template)
+            print(f"✓ Template built at {location}")
+        elif args.command == 'save':
+            location = save_snapshot(args.template)
+            print(f"✓ Template saved to {location}")
+        else:
+            location = restore_snapshot(args.template, args.copy)
+            print(f"✓ Database restored from {location}")
+    except Exception as e:
+        print(f"Snapshot error: {e}")
+        sys.exit(1)
+
+    print(f"Done in {time.perf_counter() - started:.3f}s")
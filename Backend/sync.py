@@ -0,0 +1,188 @@
+"""
+Delta sync of hustles, transactions, debts and goals for offline clients.
+
+Every write to one of these tables stamps the rows it touches with the next
+number of a global change sequence, and every delete leaves a tombstone
+carrying its own number. A client remembers the highest number it has seen
+and asks GET /sync?since=<seq> for what changed after it, which is a range
+scan of the (user_id, change_seq) index on each table.
+
+Numbers come from the single sync_state row. Reserving one updates that row,
+which stays locked until the writing transaction commits, so writes take
+their numbers in commit order and a reader never sees a number appear below
+one it has already passed. ORM writes are stamped by the before_flush hook
+below, one number per flush; bulk Core statements pass next_seq() to their
+UPDATE/INSERT themselves. Rows loaded outside both (seed scripts) keep 0 and
+reach clients on their first, full sync. A row moved to another user
+(an admin reassigning a hustle) is stamped for its new owner and leaves a
+tombstone for its old one.
+
+Tombstones older than the retention window are pruned by
+`flask tasks prune-tombstones`; a client whose cursor predates the pruned
+range must resync from scratch.
+"""
+
+from sqlalchemy import event, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from models import db, Hustle, Transaction, Debt, Goal, SyncState, Tombstone
+from serializers import HUSTLE_FIELDS, TRANSACTION_FIELDS, DEBT_FIELDS, GOAL_FIELDS, serialize_query
+
+SYNCED_MODELS = (Hustle, Transaction, Debt, Goal)
+
+# Keys sent per table: the row's own columns, without joined display fields
+# (hustle_title, username) that change when another row does
+SYNC_TABLES = {
+    'hustles': (Hustle, HUSTLE_FIELDS, [name for name in HUSTLE_FIELDS if name != 'username']),
+    'transactions': (Transaction, TRANSACTION_FIELDS, [name for name in TRANSACTION_FIELDS if name != 'hustle_title']),
+    'debts': (Debt, DEBT_FIELDS, [name for name in DEBT_FIELDS if name != 'hustle_title']),
+    'goals': (Goal, GOAL_FIELDS, [name for name in GOAL_FIELDS if name != 'hustle_title']),
+}
+
+SYNC_STATE_ID = 1
+
+
+class CursorExpired(Exception):
+    """The client's cursor predates tombstones that have been pruned"""
+
+
+def _reserve(connection, count):
+    state = SyncState.__table__
+    seq = connection.execute(
+        update(state).where(state.c.id == SYNC_STATE_ID).values(
+            last_seq=state.c.last_seq + count
+        ).returning(state.c.last_seq)
+    ).scalar_one_or_none()
+    if seq is None:
+        # Databases built with create_all() rather than the migrations
+        connection.execute(insert(state).values(id=SYNC_STATE_ID, last_seq=count, pruned_seq=0))
+        seq = count
+    return seq
+
+
+def next_seq(count=1):
+    """Reserve `count` sequence numbers and return the highest; caller commits"""
+    return _reserve(db.session.connection(), count)
+
+
+def sync_state():
+    """(last_seq, pruned_seq) as committed"""
+    row = db.session.execute(
+        select(SyncState.last_seq, SyncState.pruned_seq).where(SyncState.id == SYNC_STATE_ID)
+    ).first()
+    return (row.last_seq, row.pruned_seq) if row else (0, 0)
+
+
+def flush_seq(session):
+    """Sequence number of the flush in progress, reserved on first use and shared by its hooks"""
+    seq = session.info.get('flush_seq')
+    if seq is None:
+        seq = session.info['flush_seq'] = _reserve(session.connection(), 1)
+    return seq
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+@event.listens_for(Session, 'after_soft_rollback')
+def _end_flush(session, *args):
+    session.info.pop('flush_seq', None)
+
+
+@event.listens_for(Session, 'before_flush')
+def stamp_changes(session, flush_context, instances):
+    """Stamp new and modified synced rows and record tombstones for deleted and reassigned ones"""
+    changed = [obj for obj in session.new if isinstance(obj, SYNCED_MODELS)]
+    changed += [
+        obj for obj in session.dirty
+        if isinstance(obj, SYNCED_MODELS) and session.is_modified(obj, include_collections=False)
+    ]
+    deleted = [obj for obj in session.deleted if isinstance(obj, SYNCED_MODELS)]
+    if not changed and not deleted:
+        return
+
+    seq = flush_seq(session)
+    for obj in changed:
+        obj.change_seq = seq
+        # The previous owner no longer sees the row, so it must drop its copy
+        for old_user_id in inspect(obj).attrs.user_id.history.deleted:
+            if old_user_id is not None and old_user_id != obj.user_id:
+                session.add(Tombstone(entity=obj.__tablename__, entity_id=obj.id, user_id=old_user_id, change_seq=seq))
+    for obj in deleted:
+        if obj.user_id is not None:
+            session.add(Tombstone(entity=obj.__tablename__, entity_id=obj.id, user_id=obj.user_id, change_seq=seq))
+
+
+def record_deletions(model, rows):
+    """Tombstones for (id, user_id) rows about to be deleted in bulk; caller commits"""
+    rows = [(object_id, user_id) for object_id, user_id in rows if user_id is not None]
+    if not rows or model not in SYNCED_MODELS:
+        return
+    seq = next_seq()
+    db.session.execute(insert(Tombstone), [
+        {"entity": model.__tablename__, "entity_id": object_id, "user_id": user_id, "change_seq": seq}
+        for object_id, user_id in rows
+    ])
+
+
+def prune_tombstones(before):
+    """Delete tombstones recorded before `before`; returns the number deleted"""
+    cutoff = db.session.query(func.max(Tombstone.change_seq)).filter(Tombstone.deleted_at < before).scalar()
+    if cutoff is None:
+        return 0
+    deleted = Tombstone.query.filter(Tombstone.change_seq <= cutoff).delete(synchronize_session=False)
+    db.session.execute(
+        update(SyncState).where(SyncState.id == SYNC_STATE_ID, SyncState.pruned_seq < cutoff).values(pruned_seq=cutoff)
+    )
+    db.session.commit()
+    return deleted
+
+
+def _fetch(name, user_id, since, until, limit):
+    """Rows of one table (or the tombstones) with since < change_seq <= until, in sequence order"""
+    if name == 'deleted':
+        query = db.session.query(Tombstone.entity, Tombstone.entity_id, Tombstone.change_seq).filter(
+            Tombstone.user_id == user_id, Tombstone.change_seq > since, Tombstone.change_seq <= until
+        ).order_by(Tombstone.change_seq, Tombstone.id)
+        if limit:
+            query = query.limit(limit)
+        return [{"entity": entity, "id": entity_id, "change_seq": seq} for entity, entity_id, seq in query.all()]
+
+    model, spec, names = SYNC_TABLES[name]
+    query = model.query.filter(
+        model.user_id == user_id, model.change_seq > since, model.change_seq <= until
+    ).order_by(model.change_seq, model.id)
+    if limit:
+        query = query.limit(limit)
+    return serialize_query(query, spec, names)
+
+
+def changes_since(user_id, since=None, limit=500):
+    """A user's rows changed after `since` (all rows when None), at most `limit` per table.
+
+    Returns the changed rows per table, the tombstones and the cursor to pass
+    as `since` next time. A page never ends inside one sequence number, so a
+    write is delivered whole; one that touched more than `limit` rows of a
+    table is sent in a single, larger page.
+    """
+    last_seq, pruned_seq = sync_state()
+    if since is not None and since < pruned_seq:
+        raise CursorExpired()
+
+    # Read once, before the rows: anything committed after it waits for the next call
+    until = last_seq
+    names = list(SYNC_TABLES) + (['deleted'] if since is not None else [])
+    since = -1 if since is None else since
+    pages = {name: _fetch(name, user_id, since, until, limit + 1) for name in names}
+
+    truncated = {name: rows for name, rows in pages.items() if len(rows) > limit}
+    if truncated:
+        # Stop below the first sequence number some table could not include
+        until = min(rows[limit]['change_seq'] for rows in truncated.values()) - 1
+        if until <= since:
+            until += 1
+            for name, rows in truncated.items():
+                if rows[limit]['change_seq'] == until:
+                    pages[name] = _fetch(name, user_id, since, until, None)
+        pages = {name: [row for row in rows if row['change_seq'] <= until] for name, rows in pages.items()}
+
+    pages.setdefault('deleted', [])
+    return dict(pages, since=since if since >= 0 else None, until=until, has_more=bool(truncated))
@@ -0,0 +1,149 @@
+"""
+Scheduled maintenance tasks, run from cron through the Flask CLI:
+
+    flask --app app tasks refresh-hustle-stats
+    flask --app app tasks materialize-recurring
+    flask --app app tasks mark-overdue-debts
+    flask --app app tasks backfill-spending-stats
+    flask --app app tasks prune-tombstones
+    flask --app app tasks compact-outbox
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup
+from models import db, Hustle, HustleStats, Debt, OutboxEvent, OutboxCheckpoint
+import recurring
+import anomaly
+from sync import next_seq, prune_tombstones
+from outbox import capture
+from deletion import DEFAULT_BATCH_SIZE as DELETE_BATCH_SIZE, delete_in_batches
+
+tasks_cli = AppGroup('tasks', help='Scheduled maintenance tasks.')
+
+# Debt statuses that become 'overdue' once the due date has passed
+OVERDUE_FROM_STATUSES = ['pending', 'partially_paid']
+
+# Debts updated per statement by the overdue scanner
+OVERDUE_BATCH_SIZE = 1000
+
+# Days a delete stays visible to GET /sync; older cursors must resync
+TOMBSTONE_RETENTION_DAYS = 90
+
+# Days outbox events are kept, at least until every consumer has read them
+OUTBOX_RETENTION_DAYS = 7
+
+
+def start_of_today():
+    return datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def refresh_hustle_stats():
+    """Recompute the admin hustle statistics into the single hustle_stats row"""
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    totals = db.session.query(
+        db.func.count(Hustle.id),
+        db.func.count(db.distinct(Hustle.user_id)),
+        db.func.count(Hustle.id).filter(Hustle.created_at >= thirty_days_ago)
+    ).one()
+    hustle_types = db.session.query(Hustle.type, db.func.count(Hustle.id)).group_by(Hustle.type).all()
+
+    stats = HustleStats.query.get(1) or HustleStats(id=1)
+    stats.total_hustles = totals[0]
+    stats.total_users_with_hustles = totals[1]
+    stats.recent_hustles_30_days = totals[2]
+    stats.types_distribution = json.dumps([{"type": ht[0], "count": ht[1]} for ht in hustle_types])
+    stats.refreshed_at = datetime.utcnow()
+    db.session.add(stats)
+    db.session.commit()
+    return stats
+
+
+@tasks_cli.command('refresh-hustle-stats')
+def refresh_hustle_stats_command():
+    """Refresh the precomputed admin hustle statistics."""
+    stats = refresh_hustle_stats()
+    click.echo(f"Hustle stats refreshed: {stats.total_hustles} hustles, "
+               f"{stats.total_users_with_hustles} users with hustles")
+
+
+@tasks_cli.command('materialize-recurring')
+@click.option('--batch-size', default=recurring.DEFAULT_BATCH_SIZE, show_default=True,
+              help='Rules materialized per commit.')
+def materialize_recurring_command(batch_size):
+    """Create the transactions of every due recurring rule, catching up missed runs."""
+    rules, created = recurring.materialize_due(batch_size=batch_size)
+    click.echo(f"Recurring rules processed: {rules}, transactions created: {created}")
+
+
+def mark_overdue_debts(batch_size=OVERDUE_BATCH_SIZE):
+    """Move open debts past their due date to 'overdue'; returns the number updated"""
+    today = start_of_today()
+    due = db.select(Debt.id).where(
+        Debt.status.in_(OVERDUE_FROM_STATUSES),
+        Debt.due_date < today
+    ).limit(batch_size)
+    updated = 0
+    while True:
+        # One set-based UPDATE per batch, driven by the (status, due_date) index
+        rows = capture(
+            db.update(Debt).where(
+                Debt.id.in_(due.scalar_subquery())
+            ).values(
+                status='overdue', updated_at=datetime.utcnow(), change_seq=next_seq()
+            ).execution_options(synchronize_session=False),
+            Debt
+        )
+        db.session.commit()
+        updated += len(rows)
+        if len(rows) < batch_size:
+            break
+    return updated
+
+
+@tasks_cli.command('mark-overdue-debts')
+@click.option('--batch-size', default=OVERDUE_BATCH_SIZE, show_default=True,
+              help='Debts updated per statement.')
+def mark_overdue_debts_command(batch_size):
+    """Mark open debts past their due date as overdue."""
+    updated = mark_overdue_debts(batch_size)
+    click.echo(f"Debts marked overdue: {updated}")
+
+
+@tasks_cli.command('backfill-spending-stats')
+@click.option('--user-id', type=int, default=None, help='Only rebuild this user\'s statistics.')
+def backfill_spending_stats_command(user_id):
+    """Rebuild the per-category spending statistics from the expenses in the window; run daily."""
+    groups = anomaly.backfill_spending_stats(user_id)
+    click.echo(f"Spending stats rebuilt for {groups} user/category groups")
+
+
+@tasks_cli.command('prune-tombstones')
+@click.option('--days', default=TOMBSTONE_RETENTION_DAYS, show_default=True,
+              help='Keep tombstones recorded within this many days.')
+def prune_tombstones_command(days):
+    """Delete sync tombstones older than the retention window."""
+    deleted = prune_tombstones(datetime.utcnow() - timedelta(days=days))
+    click.echo(f"Tombstones pruned: {deleted}")
+
+
+def compact_outbox(before, batch_size=DELETE_BATCH_SIZE):
+    """Delete outbox events created before `before` that every consumer has read; returns the number deleted"""
+    condition = OutboxEvent.created_at < before
+    slowest = db.session.query(db.func.min(OutboxCheckpoint.seq)).scalar()
+    if slowest is not None:
+        # Whole sequence numbers behind the slowest consumer's position
+        condition = db.and_(condition, OutboxEvent.seq < slowest)
+    return delete_in_batches(OutboxEvent, condition, batch_size)
+
+
+@tasks_cli.command('compact-outbox')
+@click.option('--days', default=OUTBOX_RETENTION_DAYS, show_default=True,
+              help='Keep events created within this many days.')
+@click.option('--batch-size', default=DELETE_BATCH_SIZE, show_default=True, help='Events deleted per commit.')
+def compact_outbox_command(days, batch_size):
+    """Delete outbox events past the retention window that every consumer has read."""
+    deleted = compact_outbox(datetime.utcnow() - timedelta(days=days), batch_size)
+    click.echo(f"Outbox events deleted: {deleted}")
@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+import pytest
+
+# app.py reads DATABASE_URL at import time
+_db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as flask_app  # noqa: E402
+from models import db, User, Hustle, Transaction, Debt, Goal  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    # Under app.testing over-budget requests raise QueryBudgetExceeded
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        db.create_all()
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def users(app):
+    """An admin and a regular user with a few hustles, transactions, debts and goals; returns their ids"""
+    with app.app_context():
+        admin = User(username='admin', email='admin@example.com', password=generate_password_hash('x'), is_admin=True)
+        user = User(username='user', email='user@example.com', password=generate_password_hash('x'))
+        db.session.add_all([admin, user])
+        db.session.commit()
+
+        now = datetime.utcnow()
+        for number in range(4):
+            hustle = Hustle(title=f'Hustle {number}', type='retail', date=date.today(), user_id=user.id)
+            db.session.add(hustle)
+            db.session.flush()
+            for day in range(12):
+                db.session.add(Transaction(
+                    amount=10 + day, type='income' if day % 3 else 'expense', description=f'Sale {day}',
+                    category='food', created_at=now - timedelta(days=day * 25),
+                    user_id=user.id, hustle_id=hustle.id
+                ))
+            db.session.add(Debt(
+                amount=100, balance=100, description='Stock', date=date.today(), creditor='Supplier',
+                due_date=now - timedelta(days=number * 40), status='pending', user_id=user.id, hustle_id=hustle.id
+            ))
+            db.session.add(Goal(
+                title=f'Goal {number}', description='Save', due_date=now + timedelta(days=90),
+                target_amount=500, status='pending', user_id=user.id, hustle_id=hustle.id
+            ))
+        db.session.commit()
+        return admin.id, user.id
+
+
+def auth_header(app, user_id):
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+
+@pytest.fixture
+def admin_headers(app, users):
+    return auth_header(app, users[0])
+
+
+@pytest.fixture
+def user_headers(app, users):
+    return auth_header(app, users[1])
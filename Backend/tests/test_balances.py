@@ -0,0 +1,97 @@
+"""
+Incremental balances: goal progress follows the income allocated to it and
+debt balances follow the recorded payments, through every kind of edit.
+"""
+
+
+def goal(client, headers, goal_id):
+    return client.get(f'/goals/{goal_id}', headers=headers).get_json()
+
+
+def debt(client, headers, debt_id):
+    return client.get(f'/debts/{debt_id}', headers=headers).get_json()
+
+
+def add_income(client, headers, amount, goal_id):
+    response = client.post('/transactions', json={
+        'amount': amount, 'type': 'income', 'description': 'Saved', 'goal_id': goal_id
+    }, headers=headers)
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()['transaction']['id']
+
+
+def test_goal_progress_follows_allocated_income(client, user_headers):
+    first = add_income(client, user_headers, 100, 1)
+    add_income(client, user_headers, 50, 1)
+    assert goal(client, user_headers, 1)['current_amount'] == 150
+
+    client.put(f'/transactions/{first}', json={'amount': 200}, headers=user_headers)
+    assert goal(client, user_headers, 1)['current_amount'] == 250
+
+    client.put(f'/transactions/{first}', json={'goal_id': 2}, headers=user_headers)
+    assert goal(client, user_headers, 1)['current_amount'] == 50
+    assert goal(client, user_headers, 2)['current_amount'] == 200
+
+    client.delete(f'/transactions/{first}', headers=user_headers)
+    assert goal(client, user_headers, 2)['current_amount'] == 0
+
+
+def test_goal_reached_at_target(client, user_headers):
+    add_income(client, user_headers, 500, 1)
+    saved = goal(client, user_headers, 1)
+    assert saved['progress'] == 100
+    assert saved['status'] == 'completed'
+
+
+def test_expenses_cannot_fund_goals(client, user_headers):
+    response = client.post('/transactions', json={
+        'amount': 100, 'type': 'expense', 'description': 'Stock', 'goal_id': 1
+    }, headers=user_headers)
+    assert response.status_code == 400
+
+    income = add_income(client, user_headers, 100, 1)
+    response = client.put(f'/transactions/{income}', json={'type': 'expense'}, headers=user_headers)
+    assert response.status_code == 400
+    assert goal(client, user_headers, 1)['current_amount'] == 100
+
+
+def test_debt_balance_follows_payments(client, user_headers):
+    response = client.post('/debts/1/payments', json={'amount': 30}, headers=user_headers)
+    assert response.status_code == 201
+    payment_id = response.get_json()['payment']['id']
+    assert debt(client, user_headers, 1)['balance'] == 70
+
+    response = client.post('/debts/1/payments', json={'amount': 80}, headers=user_headers)
+    assert response.status_code == 400
+    assert debt(client, user_headers, 1)['balance'] == 70
+
+    client.post('/debts/1/payments', json={'amount': 70}, headers=user_headers)
+    settled = debt(client, user_headers, 1)
+    assert settled['balance'] == 0
+    assert settled['status'] == 'paid'
+
+    client.delete(f'/debts/1/payments/{payment_id}', headers=user_headers)
+    reopened = debt(client, user_headers, 1)
+    assert reopened['balance'] == 30
+    assert reopened['status'] != 'paid'
+
+
+def test_debt_amount_edit_keeps_payments(client, user_headers):
+    client.post('/debts/1/payments', json={'amount': 40}, headers=user_headers)
+
+    response = client.put('/debts/1', json={'amount': 30}, headers=user_headers)
+    assert response.status_code == 400
+
+    response = client.put('/debts/1', json={'amount': 150}, headers=user_headers)
+    assert response.status_code == 200
+    assert response.get_json()['debt']['balance'] == 110
+
+
+def test_marking_debt_paid_records_payment(client, user_headers):
+    response = client.put('/debts/1', json={'status': 'paid'}, headers=user_headers)
+    assert response.status_code == 200
+    assert response.get_json()['debt']['balance'] == 0
+
+    payments = client.get('/debts/1/payments', headers=user_headers).get_json()
+    assert [payment['amount'] for payment in payments['payments']] == [100]
+    assert client.put('/debts/1', json={'status': 'pending'}, headers=user_headers).status_code == 400
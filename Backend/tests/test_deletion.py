@@ -0,0 +1,86 @@
+"""
+Batched deletion of hustles and users: everything attached goes with them,
+synced clients get tombstones, and goals and spending stats stay right.
+"""
+
+import time
+
+import pytest
+
+import anomaly
+from models import db, Hustle, Transaction, Debt, Goal, SpendingStat, Tombstone
+
+
+@pytest.fixture
+def small_batches(app):
+    app.config['DELETE_BATCH_SIZE'] = 5
+    yield
+    app.config.pop('DELETE_BATCH_SIZE')
+
+
+def spending_stats():
+    return sorted((stat.user_id, stat.category, stat.count, round(stat.mean, 6)) for stat in SpendingStat.query.all())
+
+
+def test_delete_hustle_removes_children(app, client, users, user_headers, small_batches):
+    response = client.delete('/hustles/1', headers=user_headers)
+    assert response.status_code == 200
+    assert response.get_json()['deleted']['transactions'] == 12
+
+    with app.app_context():
+        assert db.session.get(Hustle, 1) is None
+        assert Transaction.query.filter_by(hustle_id=1).count() == 0
+        assert Debt.query.filter_by(hustle_id=1).count() == 0
+        assert Goal.query.filter_by(hustle_id=1).count() == 0
+        assert Transaction.query.count() == 36
+        tombstones = {(row.entity, row.user_id) for row in Tombstone.query.all()}
+        assert tombstones == {(name, users[1]) for name in ('hustles', 'transactions', 'debts', 'goals')}
+        assert Tombstone.query.filter_by(entity='transactions').count() == 12
+
+
+def test_delete_hustle_releases_surviving_goals(client, user_headers):
+    response = client.post('/transactions', json={
+        'amount': 100, 'type': 'income', 'description': 'Saved', 'hustle_id': 1, 'goal_id': 2
+    }, headers=user_headers)
+    assert response.status_code == 201
+
+    client.delete('/hustles/1', headers=user_headers)
+    assert client.get('/goals/2', headers=user_headers).get_json()['current_amount'] == 0
+
+
+def test_delete_hustle_updates_spending_stats(app, client, users, user_headers, small_batches):
+    with app.app_context():
+        anomaly.backfill_spending_stats()
+
+    client.delete('/hustles/1', headers=user_headers)
+
+    with app.app_context():
+        incremental = spending_stats()
+        anomaly.backfill_spending_stats()
+        assert incremental == spending_stats()
+
+
+def test_delete_user_removes_everything(app, client, users, admin_headers, small_batches):
+    response = client.delete(f'/users/{users[1]}', headers=admin_headers)
+    assert response.status_code == 200
+
+    with app.app_context():
+        for model in (Hustle, Transaction, Debt, Goal):
+            assert model.query.filter_by(user_id=users[1]).count() == 0
+
+
+def test_background_deletion_job(app, client, admin_headers, user_headers, small_batches):
+    response = client.delete('/hustles/1?background=true', headers=user_headers)
+    assert response.status_code == 202
+    job_id = response.get_json()['job']['id']
+
+    deadline = time.time() + 10
+    while True:
+        job = client.get(f'/jobs/{job_id}', headers=user_headers).get_json()['job']
+        if job['status'] in ('completed', 'failed') or time.time() > deadline:
+            break
+        time.sleep(0.05)
+    assert job['status'] == 'completed', job
+    assert job['deleted']['transactions'] == 12
+    assert client.get(f'/jobs/{job_id}', headers=admin_headers).status_code == 200
+
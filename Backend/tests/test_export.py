@@ -0,0 +1,85 @@
+"""
+Data export: the archive is deterministic, so an interrupted download can be
+resumed with a Range request and the pieces join up to the full archive.
+"""
+
+import io
+import zipfile
+
+import pytest
+
+import export
+
+
+def download(client, headers, user_id, fmt='csv', **request_headers):
+    """Fetch the export and close the streamed response, which pops its request context"""
+    response = client.get(f'/users/{user_id}/export?format={fmt}', headers=dict(headers, **request_headers))
+    response.get_data()
+    response.close()
+    return response
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'json'])
+def test_archive_contents(client, users, user_headers, fmt):
+    response = download(client, user_headers, users[1], fmt)
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.data))
+    extension = 'jsonl' if fmt == 'json' else 'csv'
+    assert f'transactions.{extension}' in archive.namelist()
+    lines = archive.read(f'transactions.{extension}').decode().strip().splitlines()
+    assert len(lines) == 48 + (fmt == 'csv')
+
+
+def test_archive_is_deterministic(client, users, user_headers):
+    first = download(client, user_headers, users[1])
+    second = download(client, user_headers, users[1])
+    assert first.data == second.data
+    assert first.headers['ETag'] == second.headers['ETag']
+
+
+def test_range_resumes_download(client, users, user_headers):
+    full = download(client, user_headers, users[1])
+    etag = full.headers['ETag']
+    split = len(full.data) // 3
+
+    head = download(client, user_headers, users[1], Range=f'bytes=0-{split - 1}', **{'If-Range': etag})
+    assert head.status_code == 206
+    assert head.headers['Content-Range'] == f'bytes 0-{split - 1}/{len(full.data)}'
+
+    tail = download(client, user_headers, users[1], Range=f'bytes={split}-', **{'If-Range': etag})
+    assert tail.status_code == 206
+    assert int(tail.headers['Content-Length']) == len(full.data) - split
+    assert head.data + tail.data == full.data
+
+
+def test_changed_data_restarts_download(client, users, user_headers):
+    full = download(client, user_headers, users[1])
+    client.put('/transactions/1', json={'description': 'Edited'}, headers=user_headers)
+
+    response = download(client, user_headers, users[1], Range='bytes=100-', **{'If-Range': full.headers['ETag']})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != full.headers['ETag']
+    assert response.data != full.data
+
+
+def test_unsatisfiable_range(client, users, user_headers):
+    size = len(download(client, user_headers, users[1]).data)
+    response = download(client, user_headers, users[1], Range=f'bytes={size}-')
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{size}'
+
+
+def test_export_of_other_user_is_denied(client, users, user_headers):
+    assert download(client, user_headers, users[0]).status_code == 403
+
+
+def test_resumed_download_compresses_once(client, users, user_headers, monkeypatch):
+    full = download(client, user_headers, users[1])
+    generated = []
+    original = export._archive_chunks
+    monkeypatch.setattr(export, '_archive_chunks', lambda *args: generated.append(args) or original(*args))
+
+    response = download(client, user_headers, users[1], Range='bytes=100-', **{'If-Range': full.headers['ETag']})
+    assert response.status_code == 206
+    assert response.data == full.data[100:]
+    assert len(generated) == 1
@@ -0,0 +1,21 @@
+"""
+Hustle reads report the status stored on the hustle, whichever endpoint or
+fieldset is used.
+"""
+
+from models import db, Hustle
+
+
+def test_status_is_the_stored_one(app, client, users, user_headers):
+    with app.app_context():
+        db.session.get(Hustle, 1).status = 'paused'
+        db.session.commit()
+
+    def statuses(path):
+        return {row['id']: row['status'] for row in client.get(path, headers=user_headers).get_json()['hustles']}
+
+    expected = {1: 'paused', 2: 'active', 3: 'active', 4: 'active'}
+    assert statuses('/hustles') == expected
+    assert statuses('/hustles?fields=id,status') == expected
+    assert statuses(f'/users/{users[1]}/hustles') == expected
+    assert client.get('/hustles/1', headers=user_headers).get_json()['hustle']['status'] == 'paused'
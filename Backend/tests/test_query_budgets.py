@@ -0,0 +1,68 @@
+"""
+Query budgets under app.testing: every budgeted route must stay within its
+@query_budget, independently of how many rows the user has.
+"""
+
+import pytest
+
+from profiler import QueryBudgetExceeded
+
+USER_ROUTES = [
+    '/dashboard/overview',
+    '/users/me',
+    '/transactions',
+    '/transactions/1',
+    '/hustles/1/transactions',
+    '/hustles/ranking',
+    '/debts/aging',
+    '/notifications',
+    '/forecast',
+    '/sync',
+]
+
+
+def budget_of(app, path):
+    adapter = app.url_map.bind('localhost')
+    endpoint, _ = adapter.match(path, method='GET')
+    return app.view_functions[endpoint].query_budget
+
+
+@pytest.mark.parametrize('path', USER_ROUTES)
+def test_route_stays_within_budget(app, client, user_headers, path):
+    response = client.get(path, headers=user_headers)
+    assert response.status_code == 200, response.get_json()
+    assert int(response.headers['X-DB-Queries']) <= budget_of(app, path)
+
+
+def test_dashboard_budget(app, client, user_headers):
+    response = client.get('/dashboard/overview', headers=user_headers)
+    assert budget_of(app, '/dashboard/overview') == 5
+    assert int(response.headers['X-DB-Queries']) <= 5
+    assert len(response.get_json()['recentTransactions']) == 5
+
+
+def test_dashboard_without_transactions(client, admin_headers):
+    response = client.get('/dashboard/overview', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()['totalIncome'] == 0
+    assert int(response.headers['X-DB-Queries']) <= 5
+
+
+def test_admin_users_does_not_load_collections(app, client, admin_headers):
+    response = client.get('/admin/users', headers=admin_headers)
+    assert response.status_code == 200
+    counts = {user['username']: user for user in response.get_json()}
+    assert counts['user']['transactions_count'] == 48
+    assert counts['user']['hustles_count'] == 4
+    assert int(response.headers['X-DB-Queries']) <= budget_of(app, '/admin/users')
+
+
+def test_over_budget_request_raises(app, client, user_headers):
+    view = app.view_functions['dashboard.get_dashboard_overview']
+    budget = view.query_budget
+    view.query_budget = 1
+    try:
+        with pytest.raises(QueryBudgetExceeded):
+            client.get('/dashboard/overview', headers=user_headers)
+    finally:
+        view.query_budget = budget
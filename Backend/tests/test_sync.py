@@ -0,0 +1,98 @@
+"""
+Delta sync: the cursor returns exactly what changed after it, deletions and
+reassignments arrive as tombstones, and pages never split a write.
+"""
+
+from datetime import datetime, timedelta
+
+from conftest import auth_header
+from models import db, User
+from sync import prune_tombstones
+
+
+def sync(client, headers, since=None, limit=None):
+    params = {}
+    if since is not None:
+        params['since'] = since
+    if limit is not None:
+        params['limit'] = limit
+    response = client.get('/sync', query_string=params, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_full_sync_returns_all_rows(client, user_headers):
+    page = sync(client, user_headers)
+    assert len(page['hustles']) == 4
+    assert len(page['transactions']) == 48
+    assert len(page['debts']) == 4
+    assert len(page['goals']) == 4
+    assert page['deleted'] == []
+    assert page['has_more'] is False
+
+
+def test_cursor_returns_only_later_changes(client, user_headers):
+    cursor = sync(client, user_headers)['until']
+    assert sync(client, user_headers, cursor)['transactions'] == []
+
+    response = client.put('/transactions/1', json={'description': 'Edited'}, headers=user_headers)
+    assert response.status_code == 200
+    page = sync(client, user_headers, cursor)
+    assert [row['id'] for row in page['transactions']] == [1]
+    assert page['transactions'][0]['description'] == 'Edited'
+    assert page['until'] > cursor
+    assert sync(client, user_headers, page['until'])['transactions'] == []
+
+
+def test_deletion_leaves_tombstone(client, user_headers):
+    cursor = sync(client, user_headers)['until']
+    response = client.delete('/transactions/1', headers=user_headers)
+    assert response.status_code == 200
+
+    page = sync(client, user_headers, cursor)
+    assert [(row['entity'], row['id']) for row in page['deleted']] == [('transactions', 1)]
+
+
+def test_reassigned_hustle_moves_between_users(app, client, users, admin_headers, user_headers):
+    with app.app_context():
+        other = User(username='other', email='other@example.com', password='x')
+        db.session.add(other)
+        db.session.commit()
+        other_id = other.id
+    other_headers = auth_header(app, other_id)
+    cursor = sync(client, user_headers)['until']
+    other_cursor = sync(client, other_headers)['until']
+
+    response = client.put('/hustles/1/assign', json={'user_id': other_id}, headers=admin_headers)
+    assert response.status_code == 200
+
+    page = sync(client, user_headers, cursor)
+    assert [(row['entity'], row['id']) for row in page['deleted']] == [('hustles', 1)]
+    assert page['hustles'] == []
+    assert [row['id'] for row in sync(client, other_headers, other_cursor)['hustles']] == [1]
+
+
+def test_pages_cover_every_row_once(client, user_headers):
+    seen, cursor = [], None
+    while True:
+        page = sync(client, user_headers, cursor, limit=5)
+        seen += [row['id'] for row in page['transactions']]
+        cursor = page['until']
+        if not page['has_more']:
+            break
+    assert sorted(seen) == list(range(1, 49))
+
+
+def test_expired_cursor_is_rejected(app, client, user_headers):
+    cursor = sync(client, user_headers)['until']
+    client.delete('/transactions/1', headers=user_headers)
+    with app.app_context():
+        assert prune_tombstones(datetime.utcnow() + timedelta(days=1)) == 1
+
+    response = client.get('/sync', query_string={'since': cursor}, headers=user_headers)
+    assert response.status_code == 410
+
+
+def test_invalid_cursor(client, user_headers):
+    assert client.get('/sync?since=abc', headers=user_headers).status_code == 400
+    assert client.get('/sync?since=-1', headers=user_headers).status_code == 400
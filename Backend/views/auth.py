@@ -1,9 +1,10 @@
 from flask import Flask, request, jsonify, Blueprint, current_app
 from werkzeug.security import check_password_hash
 from models import db, User, TokenBlocklist
-from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required, get_jwt
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt
 from datetime import datetime
 from datetime import timezone
+from authz import get_current_user
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -28,9 +29,7 @@ def login():
 @auth_bp.route("/current_user", methods=["GET"])
 @jwt_required()
 def fetch_current_user():
-    current_user_id = get_jwt_identity()
-
-    user = User.query.get(current_user_id)
+    user = get_current_user()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
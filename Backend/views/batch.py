@@ -0,0 +1,145 @@
+import io
+import json
+import logging
+from urllib.parse import urlsplit, unquote
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, jsonify, request, current_app, g
+from flask_jwt_extended import jwt_required
+from authz import get_current_user
+
+batch_bp = Blueprint('batch', __name__)
+
+# Request headers not passed on to sub-requests: sub-responses are embedded
+# in the batch body, which is compressed as a whole
+DROPPED_HEADERS = ('HTTP_ACCEPT_ENCODING', 'CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IF_NONE_MATCH', 'HTTP_RANGE')
+
+# Endpoints whose responses are streams (the endless SSE feed, zip exports):
+# they cannot be embedded in a JSON envelope, so they are never dispatched
+STREAMING_ENDPOINTS = ('events.stream_events', 'user.export_user_data')
+STREAMING_ERROR = {"error": "Streaming endpoints cannot be batched; request them directly"}
+
+
+def sub_request_environ(path, method='GET', body=None):
+    """WSGI environ for a sub-request, inheriting the batch request's headers.
+
+    A body is sent as JSON (used by POST /sync to replay queued writes).
+    """
+    parts = urlsplit(path)
+    environ = {key: value for key, value in request.environ.items()
+               if key not in DROPPED_HEADERS and not key.startswith('werkzeug.')}
+    data = json.dumps(body).encode() if body is not None else b''
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': unquote(parts.path),
+        'QUERY_STRING': parts.query,
+        'CONTENT_LENGTH': str(len(data)),
+        'wsgi.input': io.BytesIO(data),
+    })
+    if body is not None:
+        environ['CONTENT_TYPE'] = 'application/json'
+    return environ
+
+
+def dispatch(app, environ):
+    """Run one sub-request through the full request cycle and return (status, body)"""
+    with app.request_context(environ):
+        # Checked before dispatching: a stream's view may already hold resources
+        # (an event subscription) that only iterating it would release
+        if request.url_rule is not None and request.url_rule.endpoint in STREAMING_ENDPOINTS:
+            return 400, STREAMING_ERROR
+        try:
+            response = app.full_dispatch_request()
+        except Exception as e:
+            logging.error(f"Batch sub-request {environ['PATH_INFO']} failed: {str(e)}", exc_info=True)
+            return 500, {"error": "Internal server error"}
+        try:
+            # Reading a streamed body may never finish. Werkzeug's error pages
+            # (404, 405) also come back as iterators, but short ones
+            if response.is_streamed and response.status_code < 400:
+                return 400, STREAMING_ERROR
+            data = response.get_data()
+            if response.is_json:
+                body = json.loads(data) if data else None
+            else:
+                body = data.decode('utf-8', errors='replace')
+            return response.status_code, body
+        finally:
+            response.close()
+
+
+def dispatch_shared(app, environ):
+    """Sub-request inside the batch's app context.
+
+    The session (and its identity map, so the current user is loaded once),
+    the blocklist cache and everything else in g are shared; per-request
+    state that hooks keep in g is saved and restored around the sub-request.
+    """
+    saved = dict(vars(g))
+    try:
+        return dispatch(app, environ)
+    finally:
+        vars(g).clear()
+        vars(g).update(saved)
+
+
+def dispatch_threaded(app, environ, revoked_tokens):
+    """Sub-request in its own app context, for running batch items concurrently"""
+    with app.app_context():
+        g.revoked_tokens = dict(revoked_tokens)
+        return dispatch(app, environ)
+
+
+# BATCH GET REQUESTS
+@batch_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch():
+    data = request.get_json(silent=True) or {}
+    items = data.get('requests')
+    max_requests = current_app.config.get('BATCH_MAX_REQUESTS', 20)
+
+    if not isinstance(items, list) or not items:
+        return jsonify({
+            "error": "requests must be a non-empty list",
+            "expected": {"requests": [{"id": "overview", "path": "/dashboard/overview"}], "parallel": False}
+        }), 400
+    if len(items) > max_requests:
+        return jsonify({"error": f"At most {max_requests} requests per batch"}), 400
+
+    environs = []
+    for index, item in enumerate(items):
+        path = item.get('path') if isinstance(item, dict) else None
+        if not isinstance(path, str) or not path.startswith('/'):
+            return jsonify({"error": f"Request {index} needs a path starting with '/'"}), 400
+        if (item.get('method') or 'GET').upper() != 'GET':
+            return jsonify({"error": f"Request {index}: only GET requests can be batched"}), 400
+        if urlsplit(path).path.rstrip('/') == '/batch':
+            return jsonify({"error": f"Request {index}: batches cannot be nested"}), 400
+        environs.append(sub_request_environ(path))
+
+    # get_current_user() keeps the user in g, so every shared sub-request
+    # reuses it instead of reloading it
+    if not get_current_user():
+        return jsonify({"error": "User not found"}), 404
+
+    app = current_app._get_current_object()
+    if data.get('parallel') and len(environs) > 1:
+        # Each worker gets its own app context and database session
+        workers = min(len(environs), current_app.config.get('BATCH_MAX_WORKERS', 4))
+        revoked_tokens = g.get('revoked_tokens', {})
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda environ: dispatch_threaded(app, environ, revoked_tokens), environs))
+    else:
+        results = [dispatch_shared(app, environ) for environ in environs]
+
+    return jsonify({
+        "responses": [
+            {
+                "id": item.get('id', index),
+                "path": item['path'],
+                "status": status,
+                "body": body
+            }
+            for index, (item, (status, body)) in enumerate(zip(items, results))
+        ]
+    }), 200
@@ -1,19 +1,60 @@
 from flask import request, jsonify, Blueprint
-from models import db, Debt, User, Hustle
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
-from sqlalchemy import or_
+from models import db, Debt, DebtPayment, Hustle
+from flask_jwt_extended import jwt_required
+from datetime import datetime, timedelta
+from sqlalchemy import or_, case, delete, func, update
+from profiler import query_budget
+from tasks import OVERDUE_FROM_STATUSES, start_of_today
+from serializers import DEBT_FIELDS, DEBT_LIST_FIELDS, parse_fields, serialize_query
+from authz import get_current_user, owned_query, get_owned
+from sync import next_seq
+from outbox import capture
 
 debt_bp = Blueprint('debt', __name__)
 
-def get_current_user():
-    """Helper function to get current user from JWT"""
-    try:
-        current_user_id = get_jwt_identity()
-        return User.query.get(current_user_id) if current_user_id else None
-    except Exception as e:
-        print(f"Error getting current user: {str(e)}")
-        return None
+# Balances are floats; anything below this counts as fully paid
+BALANCE_EPSILON = 0.005
+
+DEBT_STATUSES = ["pending", "partially_paid", "paid", "overdue"]
+
+def sync_overdue_status(debt):
+    """Keep 'overdue' in step with due_date between runs of the overdue scanner"""
+    today = start_of_today()
+    if debt.status in OVERDUE_FROM_STATUSES and debt.due_date and debt.due_date < today:
+        debt.status = "overdue"
+    elif debt.status == "overdue" and (not debt.due_date or debt.due_date >= today):
+        debt.status = "partially_paid" if debt.balance < debt.amount else "pending"
+
+def paid_total(debt_id):
+    """Sum of the payments recorded against a debt, as a scalar subquery"""
+    return db.select(func.coalesce(func.sum(DebtPayment.amount), 0.0)).where(
+        DebtPayment.debt_id == debt_id
+    ).scalar_subquery()
+
+def settling_payment(debt, note="Marked as paid"):
+    """Payment of a debt's whole outstanding balance, for debts marked paid directly"""
+    return DebtPayment(
+        amount=debt.balance,
+        date=datetime.utcnow().date(),
+        note=note,
+        debt_id=debt.id,
+        user_id=debt.user_id
+    )
+
+def balance_update(change):
+    """Column values that move a debt's balance by `change` in one atomic UPDATE"""
+    new_balance = Debt.balance + change
+    return {
+        "balance": case((new_balance < BALANCE_EPSILON, 0.0), else_=new_balance),
+        "status": case(
+            (new_balance < BALANCE_EPSILON, "paid"),
+            (Debt.due_date < start_of_today(), "overdue"),
+            (new_balance < Debt.amount, "partially_paid"),
+            else_="pending"
+        ),
+        "updated_at": datetime.utcnow(),
+        "change_seq": next_seq()
+    }
 
 # CREATE DEBT
 @debt_bp.route("/debts", methods=["POST"])
@@ -43,20 +84,15 @@ def create_debt():
         hustle_id = data.get("hustle_id")
 
         # Validate status
-        valid_statuses = ["pending", "partially_paid", "paid"]
-        if status not in valid_statuses:
+        if status not in DEBT_STATUSES:
             return jsonify({
                 "error": "Invalid status",
-                "valid_statuses": valid_statuses
+                "valid_statuses": DEBT_STATUSES
             }), 400
 
         # Validate hustle if provided
-        if hustle_id:
-            hustle = Hustle.query.get(hustle_id)
-            if not hustle:
-                return jsonify({"error": "Hustle not found"}), 404
-            if not current_user.is_admin and hustle.user_id != current_user.id:
-                return jsonify({"error": "Hustle does not belong to you"}), 403
+        if hustle_id and not get_owned(Hustle, hustle_id):
+            return jsonify({"error": "Hustle not found"}), 404
 
         # Create new debt
         new_debt = Debt(
@@ -67,10 +103,17 @@ def create_debt():
             creditor=data["creditor"],
             due_date=due_date,
             status=status,
+            balance=amount,
             hustle_id=hustle_id
         )
+        sync_overdue_status(new_debt)
 
         db.session.add(new_debt)
+        if status == "paid":
+            # The balance always equals the amount minus the recorded payments
+            db.session.flush()
+            db.session.add(settling_payment(new_debt, note="Paid when recorded"))
+            new_debt.balance = 0.0
         db.session.commit()
 
         return jsonify({
@@ -99,18 +142,10 @@ def create_debt():
 @debt_bp.route("/debts/<int:debt_id>", methods=["GET"])
 @jwt_required()
 def get_debt(debt_id):
-    current_user = get_current_user()
-    if not current_user:
-        return jsonify({"error": "Unauthorized"}), 401
-
-    debt = Debt.query.get(debt_id)
+    debt = get_owned(Debt, debt_id)
     if not debt:
         return jsonify({"error": "Debt not found"}), 404
 
-    # Check permissions
-    if not current_user.is_admin and debt.user_id != current_user.id:
-        return jsonify({"error": "Access denied"}), 403
-
     return jsonify(debt.to_dict()), 200
 
 # GET ALL DEBTS (with filters)
@@ -128,12 +163,15 @@ def get_all_debts():
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     search = request.args.get('search')
+    fields = request.args.get('fields')
+    if fields:
+        try:
+            fields = parse_fields(fields, DEBT_FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
     # Base query
-    if current_user.is_admin:
-        query = Debt.query
-    else:
-        query = Debt.query.filter_by(user_id=current_user.id)
+    query = owned_query(Debt)
 
     # Apply filters
     if status:
@@ -162,54 +200,123 @@ def get_all_debts():
             )
         )
 
-    # Execute query
-    debts = query.order_by(Debt.due_date.asc()).all()
-    
+    # Execute query; rows are serialized without loading Debt objects and a
+    # sparse fieldset selects only the requested columns
+    query = query.order_by(Debt.due_date.asc())
+    result = serialize_query(query, DEBT_FIELDS, fields or DEBT_LIST_FIELDS)
+
     return jsonify({
-        "debts": [debt.to_dict() for debt in debts],
-        "count": len(debts)
+        "debts": result,
+        "count": len(result)
     }), 200
 
-# UPDATE DEBT
-@debt_bp.route("/debts/<int:debt_id>", methods=["PUT"])
+# DEBT AGING SUMMARY
+@debt_bp.route("/debts/aging", methods=["GET"])
+@query_budget(3)
 @jwt_required()
-def update_debt(debt_id):
+def get_debt_aging():
     current_user = get_current_user()
     if not current_user:
         return jsonify({"error": "Unauthorized"}), 401
 
-    debt = Debt.query.get(debt_id)
+    today = start_of_today()
+    bucket = case(
+        (Debt.due_date >= today - timedelta(days=30), "0-30"),
+        (Debt.due_date >= today - timedelta(days=60), "31-60"),
+        (Debt.due_date >= today - timedelta(days=90), "61-90"),
+        else_="90+"
+    )
+
+    # Unpaid debts past their due date, whether or not the scanner has run yet;
+    # totals are what is still owed after partial payments
+    query = db.session.query(
+        bucket.label("bucket"), func.count(Debt.id), func.coalesce(func.sum(Debt.balance), 0)
+    ).filter(
+        Debt.status.in_(OVERDUE_FROM_STATUSES + ["overdue"]),
+        Debt.due_date < today
+    )
+    if not current_user.is_admin:
+        query = query.filter(Debt.user_id == current_user.id)
+    rows = {row[0]: row for row in query.group_by(bucket).all()}
+
+    buckets = [
+        {
+            "bucket": name,
+            "count": rows[name][1] if name in rows else 0,
+            "total": float(rows[name][2]) if name in rows else 0.0
+        }
+        for name in ["0-30", "31-60", "61-90", "90+"]
+    ]
+
+    return jsonify({
+        "buckets": buckets,
+        "total_overdue": sum(b["total"] for b in buckets),
+        "count": sum(b["count"] for b in buckets),
+        "as_of": today.strftime('%Y-%m-%d')
+    }), 200
+
+# UPDATE DEBT
+@debt_bp.route("/debts/<int:debt_id>", methods=["PUT"])
+@jwt_required()
+def update_debt(debt_id):
+    debt = get_owned(Debt, debt_id)
     if not debt:
         return jsonify({"error": "Debt not found"}), 404
 
-    # Check permissions
-    if not current_user.is_admin and debt.user_id != current_user.id:
-        return jsonify({"error": "Access denied"}), 403
-
     data = request.get_json()
 
     try:
-        # Update fields
+        status = data['status'].lower() if 'status' in data else None
+        if status is not None and status not in DEBT_STATUSES:
+            return jsonify({
+                "error": "Invalid status",
+                "valid_statuses": DEBT_STATUSES
+            }), 400
+
+        # The balance is the amount minus the recorded payments; the status follows it
         if 'amount' in data:
-            debt.amount = float(data['amount'])
+            amount = float(data['amount'])
+            paid = db.session.scalar(db.select(paid_total(debt.id)))
+            if amount + BALANCE_EPSILON < paid:
+                return jsonify({
+                    "error": "Amount is below what has already been paid",
+                    "amount_paid": paid
+                }), 400
+            debt.amount = amount
+            # Computed in the UPDATE, so a payment recorded meanwhile still counts
+            debt.balance = amount - paid_total(debt.id)
+            db.session.flush()
+            db.session.refresh(debt)
+            if debt.balance < BALANCE_EPSILON:
+                debt.balance = 0.0
+        if status == "paid" and debt.balance >= BALANCE_EPSILON:
+            db.session.add(settling_payment(debt))
+            debt.balance = 0.0
+        elif status in ("pending", "partially_paid") and debt.balance < BALANCE_EPSILON:
+            db.session.rollback()
+            return jsonify({
+                "error": "Debt is fully paid; delete a payment to reopen it"
+            }), 400
+        if status is not None or 'amount' in data:
+            if debt.balance < BALANCE_EPSILON:
+                debt.status = "paid"
+            elif status == "overdue":
+                debt.status = status
+            else:
+                debt.status = "partially_paid" if debt.balance < debt.amount else "pending"
         if 'description' in data:
             debt.description = data['description']
         if 'creditor' in data:
             debt.creditor = data['creditor']
-        if 'status' in data:
-            debt.status = data['status'].lower()
         if 'hustle_id' in data:
-            if data['hustle_id']:
-                hustle = Hustle.query.get(data['hustle_id'])
-                if not hustle:
-                    return jsonify({"error": "Hustle not found"}), 404
-                if not current_user.is_admin and hustle.user_id != current_user.id:
-                    return jsonify({"error": "Hustle does not belong to you"}), 403
+            if data['hustle_id'] and not get_owned(Hustle, data['hustle_id']):
+                return jsonify({"error": "Hustle not found"}), 404
             debt.hustle_id = data['hustle_id']
         if 'date' in data:
             debt.date = datetime.strptime(data['date'], "%Y-%m-%d").date()
         if 'due_date' in data:
             debt.due_date = datetime.strptime(data['due_date'], "%Y-%m-%d")
+        sync_overdue_status(debt)
 
         db.session.commit()
         return jsonify({
@@ -234,19 +341,15 @@ def update_debt(debt_id):
 @debt_bp.route("/debts/<int:debt_id>", methods=["DELETE"])
 @jwt_required()
 def delete_debt(debt_id):
-    current_user = get_current_user()
-    if not current_user:
-        return jsonify({"error": "Unauthorized"}), 401
-
-    debt = Debt.query.get(debt_id)
+    debt = get_owned(Debt, debt_id)
     if not debt:
         return jsonify({"error": "Debt not found"}), 404
 
-    # Check permissions
-    if not current_user.is_admin and debt.user_id != current_user.id:
-        return jsonify({"error": "Access denied"}), 403
-
     try:
+        capture(
+            delete(DebtPayment).where(DebtPayment.debt_id == debt.id).execution_options(synchronize_session=False),
+            DebtPayment, 'deleted'
+        )
         db.session.delete(debt)
         db.session.commit()
         return jsonify({"success": "Debt deleted successfully"}), 200
@@ -255,4 +358,125 @@ def delete_debt(debt_id):
         return jsonify({
             "error": "Failed to delete debt",
             "message": str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+# RECORD DEBT PAYMENT
+@debt_bp.route("/debts/<int:debt_id>/payments", methods=["POST"])
+@jwt_required()
+def create_debt_payment(debt_id):
+    debt = get_owned(Debt, debt_id)
+    if not debt:
+        return jsonify({"error": "Debt not found"}), 404
+
+    data = request.get_json()
+    if "amount" not in data:
+        return jsonify({
+            "error": "Missing required fields",
+            "missing": ["amount"]
+        }), 400
+
+    try:
+        amount = float(data["amount"])
+        if amount <= 0:
+            return jsonify({"error": "Amount must be greater than 0"}), 400
+        date = datetime.strptime(data["date"], "%Y-%m-%d").date() if data.get("date") else datetime.utcnow().date()
+
+        # The balance check and decrement are one statement, so concurrent
+        # payments can never take the balance below zero
+        updated = capture(
+            update(Debt).where(
+                Debt.id == debt.id,
+                Debt.balance + BALANCE_EPSILON >= amount
+            ).values(
+                **balance_update(-amount)
+            ).execution_options(synchronize_session=False),
+            Debt
+        )
+        if not updated:
+            db.session.rollback()
+            return jsonify({
+                "error": "Payment exceeds outstanding balance",
+                "balance": debt.balance
+            }), 400
+
+        payment = DebtPayment(
+            amount=amount,
+            date=date,
+            note=data.get("note"),
+            debt_id=debt.id,
+            user_id=debt.user_id
+        )
+        db.session.add(payment)
+        db.session.commit()
+
+        return jsonify({
+            "success": "Payment recorded successfully",
+            "payment": payment.to_dict(),
+            "debt": debt.to_dict()
+        }), 201
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "Invalid data format",
+            "message": str(e),
+            "expected": {
+                "amount": "number",
+                "date": "YYYY-MM-DD"
+            }
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "Failed to record payment",
+            "message": str(e)
+        }), 500
+
+# GET DEBT PAYMENTS
+@debt_bp.route("/debts/<int:debt_id>/payments", methods=["GET"])
+@jwt_required()
+def get_debt_payments(debt_id):
+    debt = get_owned(Debt, debt_id)
+    if not debt:
+        return jsonify({"error": "Debt not found"}), 404
+
+    payments = DebtPayment.query.filter_by(debt_id=debt.id).order_by(
+        DebtPayment.date.asc(), DebtPayment.id.asc()
+    ).all()
+
+    return jsonify({
+        "payments": [payment.to_dict() for payment in payments],
+        "count": len(payments),
+        "balance": debt.balance
+    }), 200
+
+# DELETE DEBT PAYMENT
+@debt_bp.route("/debts/<int:debt_id>/payments/<int:payment_id>", methods=["DELETE"])
+@jwt_required()
+def delete_debt_payment(debt_id, payment_id):
+    payment = owned_query(DebtPayment).filter_by(id=payment_id, debt_id=debt_id).first()
+    if not payment:
+        return jsonify({"error": "Payment not found"}), 404
+
+    try:
+        capture(
+            update(Debt).where(
+                Debt.id == debt_id
+            ).values(
+                **balance_update(payment.amount)
+            ).execution_options(synchronize_session=False),
+            Debt
+        )
+        db.session.delete(payment)
+        db.session.commit()
+
+        debt = Debt.query.get(debt_id)
+        return jsonify({
+            "success": "Payment deleted successfully",
+            "debt": debt.to_dict()
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "Failed to delete payment",
+            "message": str(e)
+        }), 500
@@ -0,0 +1,61 @@
+import json
+
+from flask import Blueprint, Response, jsonify, request, current_app
+from flask_jwt_extended import jwt_required
+from authz import get_current_user
+from profiler import query_budget
+from events import broker, format_event, month_totals
+
+events_bp = Blueprint('events', __name__)
+
+
+def last_event_id():
+    """Id of the last event the client saw: EventSource sends it when reconnecting"""
+    value = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+# LIVE DASHBOARD EVENTS (Server-Sent Events)
+@events_bp.route('/events', methods=['GET'])
+# Blocklist, user, and the month totals when replayed events lack them
+@query_budget(3)
+# EventSource cannot set headers, so the token may also come as ?jwt=
+@jwt_required(locations=['headers', 'query_string'])
+def stream_events():
+    user = get_current_user()
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    heartbeat = current_app.config.get('EVENTS_HEARTBEAT_SECONDS', 15)
+    subscription, missed = broker.subscribe(user.id, last_event_id())
+    # Events written while no stream was open carry no totals; send fresh ones
+    totals = month_totals(user.id) if missed and any("totals" not in event[2] for event in missed) else None
+
+    # Runs after the request context (and its database session) is gone, so an
+    # idle stream holds no connection; it only waits on its queue
+    def stream():
+        try:
+            yield f"retry: {heartbeat * 1000}\n\n"
+            if missed is None:
+                # Events after the client's Last-Event-ID are gone: reload the overview
+                yield "event: resync\ndata: {}\n\n"
+            for event in missed or ():
+                yield format_event(*event)
+            if totals is not None:
+                yield f"event: totals\ndata: {json.dumps(totals, separators=(',', ':'))}\n\n"
+            while not subscription.closed:
+                event = subscription.get(timeout=heartbeat)
+                # Comment lines keep proxies from timing out idle streams
+                yield format_event(*event) if event else ": heartbeat\n\n"
+            # Dropped for falling behind: the client should reload the overview
+            yield "event: resync\ndata: {}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx: don't buffer the stream
+    return response
@@ -0,0 +1,29 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from profiler import query_budget
+from authz import get_current_user
+import cashflow
+
+forecast_bp = Blueprint('forecast', __name__)
+
+# CASH-FLOW FORECAST
+@forecast_bp.route('/forecast', methods=['GET'])
+@query_budget(4)
+@jwt_required()
+def get_forecast():
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+
+        try:
+            months = int(request.args.get('months', 6))
+        except ValueError:
+            return jsonify({'error': 'months must be a number between 3 and 12'}), 400
+        if not 3 <= months <= 12:
+            return jsonify({'error': 'months must be a number between 3 and 12'}), 400
+
+        return jsonify(cashflow.forecast(user.id, months)), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,20 +1,16 @@
 from flask import request, jsonify, Blueprint
-from models import db, Goal, User, Hustle
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import db, Goal, Transaction, Hustle
+from flask_jwt_extended import jwt_required
 from datetime import datetime
-from sqlalchemy import or_
+from sqlalchemy import or_, update
+from goal_progress import goal_status
+from serializers import GOAL_FIELDS, GOAL_LIST_FIELDS, parse_fields, serialize_query
+from authz import get_current_user, owned_query, get_owned
+from sync import next_seq
+from outbox import capture
 
 goal_bp = Blueprint('goal', __name__)
 
-def get_current_user():
-    """Helper function to get current user from JWT"""
-    try:
-        current_user_id = get_jwt_identity()
-        return User.query.get(current_user_id) if current_user_id else None
-    except Exception as e:
-        print(f"Error getting current user: {str(e)}")
-        return None
-
 # CREATE GOAL
 @goal_bp.route("/goals", methods=["POST"])
 @jwt_required()
@@ -39,6 +35,10 @@ def create_goal():
         due_date = datetime.fromisoformat(data["due_date"])
         status = data.get("status", "pending").lower()
         hustle_id = data.get("hustle_id")
+        target_amount = float(data["target_amount"]) if data.get("target_amount") is not None else None
+        current_amount = float(data.get("current_amount") or 0)
+        if target_amount is not None and target_amount <= 0:
+            return jsonify({"error": "Target amount must be greater than 0"}), 400
 
         # Validate status
         valid_statuses = ["pending", "in_progress", "completed", "cancelled"]
@@ -49,19 +49,17 @@ def create_goal():
             }), 400
 
         # Validate hustle if provided
-        if hustle_id:
-            hustle = Hustle.query.get(hustle_id)
-            if not hustle:
-                return jsonify({"error": "Hustle not found"}), 404
-            if not current_user.is_admin and hustle.user_id != current_user.id:
-                return jsonify({"error": "Hustle does not belong to you"}), 403
+        if hustle_id and not get_owned(Hustle, hustle_id):
+            return jsonify({"error": "Hustle not found"}), 404
 
         # Create new goal
         new_goal = Goal(
             title=data["title"],
             description=data["description"],
             due_date=due_date,
-            status=status,
+            status=goal_status(current_amount, target_amount, status),
+            target_amount=target_amount,
+            current_amount=current_amount,
             user_id=current_user.id,
             hustle_id=hustle_id
         )
@@ -76,8 +74,8 @@ def create_goal():
 
     except ValueError as e:
         return jsonify({
-            "error": "Invalid date format",
-            "message": "Use ISO format: YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS",
+            "error": "Invalid data format",
+            "message": "Use ISO format: YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS for dates and numbers for amounts",
             "details": str(e)
         }), 400
     except Exception as e:
@@ -91,18 +89,10 @@ def create_goal():
 @goal_bp.route("/goals/<int:goal_id>", methods=["GET"])
 @jwt_required()
 def get_goal(goal_id):
-    current_user = get_current_user()
-    if not current_user:
-        return jsonify({"error": "Unauthorized"}), 401
-
-    goal = Goal.query.get(goal_id)
+    goal = get_owned(Goal, goal_id)
     if not goal:
         return jsonify({"error": "Goal not found"}), 404
 
-    # Check permissions
-    if not current_user.is_admin and goal.user_id != current_user.id:
-        return jsonify({"error": "Access denied"}), 403
-
     return jsonify(goal.to_dict()), 200
 
 # GET ALL GOALS (with filters)
@@ -119,12 +109,15 @@ def get_all_goals():
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     search = request.args.get('search')
+    fields = request.args.get('fields')
+    if fields:
+        try:
+            fields = parse_fields(fields, GOAL_FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-    # Base query
-    if current_user.is_admin:
-        query = Goal.query
-    else:
-        query = Goal.query.filter_by(user_id=current_user.id)
+    # Base query; progress is read off the goal rows
+    query = owned_query(Goal)
 
     # Apply filters
     if status:
@@ -151,30 +144,24 @@ def get_all_goals():
             )
         )
 
-    # Execute query
-    goals = query.order_by(Goal.due_date.asc()).all()
-    
+    # Execute query; rows are serialized without loading Goal objects and a
+    # sparse fieldset selects only the requested columns
+    query = query.order_by(Goal.due_date.asc())
+    result = serialize_query(query, GOAL_FIELDS, fields or GOAL_LIST_FIELDS)
+
     return jsonify({
-        "goals": [goal.to_dict() for goal in goals],
-        "count": len(goals)
+        "goals": result,
+        "count": len(result)
     }), 200
 
 # UPDATE GOAL
 @goal_bp.route("/goals/<int:goal_id>", methods=["PUT"])
 @jwt_required()
 def update_goal(goal_id):
-    current_user = get_current_user()
-    if not current_user:
-        return jsonify({"error": "Unauthorized"}), 401
-
-    goal = Goal.query.get(goal_id)
+    goal = get_owned(Goal, goal_id)
     if not goal:
         return jsonify({"error": "Goal not found"}), 404
 
-    # Check permissions
-    if not current_user.is_admin and goal.user_id != current_user.id:
-        return jsonify({"error": "Access denied"}), 403
-
     data = request.get_json()
 
     try:
@@ -188,13 +175,15 @@ def update_goal(goal_id):
         if 'due_date' in data:
             goal.due_date = datetime.fromisoformat(data['due_date'])
         if 'hustle_id' in data:
-            if data['hustle_id']:
-                hustle = Hustle.query.get(data['hustle_id'])
-                if not hustle:
-                    return jsonify({"error": "Hustle not found"}), 404
-                if not current_user.is_admin and hustle.user_id != current_user.id:
-                    return jsonify({"error": "Hustle does not belong to you"}), 403
+            if data['hustle_id'] and not get_owned(Hustle, data['hustle_id']):
+                return jsonify({"error": "Hustle not found"}), 404
             goal.hustle_id = data['hustle_id']
+        if 'target_amount' in data:
+            goal.target_amount = float(data['target_amount']) if data['target_amount'] is not None else None
+            if goal.target_amount is not None and goal.target_amount <= 0:
+                return jsonify({"error": "Target amount must be greater than 0"}), 400
+            if 'status' not in data:
+                goal.status = goal_status(goal.current_amount, goal.target_amount, goal.status)
 
         db.session.commit()
         return jsonify({
@@ -219,19 +208,18 @@ def update_goal(goal_id):
 @goal_bp.route("/goals/<int:goal_id>", methods=["DELETE"])
 @jwt_required()
 def delete_goal(goal_id):
-    current_user = get_current_user()
-    if not current_user:
-        return jsonify({"error": "Unauthorized"}), 401
-
-    goal = Goal.query.get(goal_id)
+    goal = get_owned(Goal, goal_id)
     if not goal:
         return jsonify({"error": "Goal not found"}), 404
 
-    # Check permissions
-    if not current_user.is_admin and goal.user_id != current_user.id:
-        return jsonify({"error": "Access denied"}), 403
-
     try:
+        # Allocated transactions stay, they just no longer count towards a goal
+        capture(
+            update(Transaction).where(Transaction.goal_id == goal.id).values(
+                goal_id=None, change_seq=next_seq()
+            ).execution_options(synchronize_session=False),
+            Transaction
+        )
         db.session.delete(goal)
         db.session.commit()
         return jsonify({"success": "Goal deleted successfully"}), 200
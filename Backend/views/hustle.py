@@ -1,23 +1,18 @@
 from flask import Flask, request, jsonify, Blueprint
 from datetime import datetime
-from models import db, Hustle, User
+from models import db, Hustle, User, HustleStats
+from tasks import refresh_hustle_stats
+import deletion
+from serializers import HUSTLE_FIELDS, HUSTLE_LIST_FIELDS, parse_fields, serialize_query
+from authz import get_current_user, owned_query, get_owned
+from profiler import query_budget
+import ranking
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import timedelta
 import logging
 
 hustle_bp = Blueprint('hustle', __name__)
 
-# Helper Functions
-def get_current_user():
-    """Helper function to get current user from JWT"""
-    current_user_id = get_jwt_identity()
-    return User.query.get(current_user_id)
-
-def is_admin_user(user_id):
-    """Helper function to check if user is admin"""
-    user = User.query.get(user_id)
-    return user and user.is_admin
-
 # CREATE HUSTLE
 # CREATE HUSTLE - QUICK FIX (Remove location temporarily)
 @hustle_bp.route("/hustles", methods=["POST"])
@@ -25,8 +20,7 @@ def is_admin_user(user_id):
 def create_hustle():
     try:
         # Get current user
-        current_user_id = get_jwt_identity()
-        current_user = User.query.get(current_user_id)
+        current_user = get_current_user()
         
         if not current_user:
             return jsonify({"error": "Invalid user"}), 401
@@ -55,7 +49,7 @@ def create_hustle():
             return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
         
         # For admin users, allow assigning to other users
-        user_id = current_user_id
+        user_id = current_user.id
         if current_user.is_admin and "user_id" in data:
             if not User.query.get(data["user_id"]):
                 return jsonify({"error": "Specified user not found"}), 404
@@ -82,7 +76,7 @@ def create_hustle():
                 "description": new_hustle.description,
                 "date": new_hustle.date.isoformat(),
                 "user_id": new_hustle.user_id,
-                "status": "active",
+                "status": new_hustle.status,
                 "created_at": new_hustle.created_at.isoformat() if new_hustle.created_at else None
             }
         }), 201
@@ -99,20 +93,12 @@ def create_hustle():
 @hustle_bp.route("/hustles/<int:hustle_id>", methods=["GET"])
 @jwt_required()
 def get_hustle(hustle_id):
-    current_user = get_current_user()
-    
-    if not current_user:
-        return jsonify({"error": "User not found"}), 404
-    
-    hustle = Hustle.query.get(hustle_id)
+    # Only hustles the user owns (any, for admins) are found
+    hustle = get_owned(Hustle, hustle_id)
 
     if not hustle:
         return jsonify({"error": "Hustle not found"}), 404
 
-    # Check if user owns this hustle or is admin
-    if not current_user.is_admin and hustle.user_id != current_user.id:
-        return jsonify({"error": "Access denied"}), 403
-
     return jsonify({
         "hustle": {
             "id": hustle.id,
@@ -120,7 +106,7 @@ def get_hustle(hustle_id):
             "type": hustle.type,
             "description": hustle.description,
             "date": hustle.date.isoformat(),
-            "status": "active",
+            "status": hustle.status,
             "user_id": hustle.user_id,
             "created_at": hustle.created_at.isoformat() if hustle.created_at else None,
             "updated_at": hustle.updated_at.isoformat() if hustle.updated_at else None
@@ -135,26 +121,20 @@ def get_all_hustles():
     
     if not current_user:
         return jsonify({"error": "User not found"}), 404
-    
+
+    fields = request.args.get('fields')
+    if fields:
+        try:
+            fields = parse_fields(fields, HUSTLE_FIELDS)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
     # Admin can see all hustles, regular users see only their own
-    if current_user.is_admin:
-        hustles = Hustle.query.order_by(Hustle.created_at.desc()).all()
-    else:
-        hustles = Hustle.query.filter_by(user_id=current_user.id).order_by(Hustle.created_at.desc()).all()
-    
-    result = []
-    for hustle in hustles:
-        result.append({
-            "id": hustle.id,
-            "title": hustle.title,
-            "type": hustle.type,
-            "description": hustle.description,
-            "date": hustle.date.isoformat(),
-            "user_id": hustle.user_id,
-            "username": hustle.user.username if hustle.user else None,
-            "created_at": hustle.created_at.isoformat() if hustle.created_at else None,
-            "status": "active"
-        })
+    query = owned_query(Hustle).order_by(Hustle.created_at.desc())
+
+    # Serialized from row tuples; with a sparse fieldset the users join only
+    # happens when username is requested
+    result = serialize_query(query, HUSTLE_FIELDS, fields or HUSTLE_LIST_FIELDS)
 
     return jsonify({"hustles": result, "count": len(result)}), 200
 
@@ -176,21 +156,12 @@ def get_hustles_by_user(user_id):
     if not target_user:
         return jsonify({"error": "User not found"}), 404
     
-    hustles = Hustle.query.filter_by(user_id=user_id).order_by(Hustle.created_at.desc()).all()
-    result = []
-    
-    for hustle in hustles:
-        result.append({
-            "id": hustle.id,
-            "title": hustle.title,
-            "type": hustle.type,
-            "description": hustle.description,
-            "date": hustle.date.isoformat(),
-            "user_id": hustle.user_id,
-            "username": target_user.username,
-            "created_at": hustle.created_at.isoformat() if hustle.created_at else None,
-            "status": "active"
-        })
+    query = Hustle.query.filter_by(user_id=user_id).order_by(Hustle.created_at.desc())
+    fields = [name for name in HUSTLE_LIST_FIELDS if name != 'username']
+    result = [
+        dict(row, username=target_user.username)
+        for row in serialize_query(query, HUSTLE_FIELDS, fields)
+    ]
 
     return jsonify({
         "user": {
@@ -214,43 +185,47 @@ def get_hustle_stats():
     if not current_user.is_admin:
         return jsonify({"error": "Admin access required"}), 403
     
-    # Get statistics
-    total_hustles = Hustle.query.count()
-    total_users_with_hustles = db.session.query(Hustle.user_id).distinct().count()
-    
-    # Get hustle types distribution
-    hustle_types = db.session.query(Hustle.type, db.func.count(Hustle.id)).group_by(Hustle.type).all()
-    
-    # Get recent hustles (last 30 days)
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    recent_hustles = Hustle.query.filter(Hustle.created_at >= thirty_days_ago).count()
+    # Statistics are precomputed by the refresh-hustle-stats task; see refreshed_at
+    stats = HustleStats.query.get(1) or refresh_hustle_stats()
+    result = stats.to_dict()
+    result["stale_seconds"] = int((datetime.utcnow() - stats.refreshed_at).total_seconds())
     
+    return jsonify(result), 200
+
+# GET HUSTLE RANKING (own hustles by profit, paginated)
+@hustle_bp.route("/hustles/ranking", methods=["GET"])
+@query_budget(3)
+@jwt_required()
+def get_hustle_ranking():
+    try:
+        limit = min(int(request.args.get('limit', 20)), 100)
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be numbers"}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({"error": "limit must be at least 1 and offset not negative"}), 400
+
+    rows, total = ranking.hustle_ranking(get_jwt_identity(), limit, offset)
+    now = datetime.utcnow()
     return jsonify({
-        "total_hustles": total_hustles,
-        "total_users_with_hustles": total_users_with_hustles,
-        "recent_hustles_30_days": recent_hustles,
-        "hustle_types_distribution": [{"type": ht[0], "count": ht[1]} for ht in hustle_types]
+        "hustles": [ranking.ranking_entry(row, now) for row in rows],
+        "count": len(rows),
+        "total": total,
+        "limit": limit,
+        "offset": offset
     }), 200
 
 # UPDATE HUSTLE
 @hustle_bp.route("/hustles/<int:hustle_id>", methods=["PUT"])
 @jwt_required()
 def update_hustle(hustle_id):
-    current_user = get_current_user()
-    
-    if not current_user:
-        return jsonify({"error": "User not found"}), 404
-    
     data = request.get_json()
-    hustle = Hustle.query.get(hustle_id)
+    # Only hustles the user owns (any, for admins) are found
+    hustle = get_owned(Hustle, hustle_id)
 
     if not hustle:
         return jsonify({"error": "Hustle not found"}), 404
 
-    # Check if user owns this hustle or is admin
-    if not current_user.is_admin and hustle.user_id != current_user.id:
-        return jsonify({"error": "Access denied"}), 403
-
     # Update fields if they exist in request
     if "title" in data:
         hustle.title = data["title"]
@@ -263,7 +238,7 @@ def update_hustle(hustle_id):
             hustle.date = datetime.strptime(data["date"], "%Y-%m-%d").date()
         except ValueError:
             return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
-    if "status" in data and current_user.is_admin:
+    if "status" in data and get_current_user().is_admin:
         hustle.status = data["status"]
 
     hustle.updated_at = datetime.utcnow()
@@ -285,29 +260,34 @@ def update_hustle(hustle_id):
 
 # DELETE HUSTLE
 @hustle_bp.route("/hustles/<int:hustle_id>", methods=["DELETE"])
+# A few statements per batch of every child table
+@query_budget(None)
 @jwt_required()
 def delete_hustle(hustle_id):
-    current_user = get_current_user()
-    
-    if not current_user:
-        return jsonify({"error": "User not found"}), 404
-    
-    hustle = Hustle.query.get(hustle_id)
+    # Only hustles the user owns (any, for admins) are found
+    hustle = get_owned(Hustle, hustle_id)
 
     if not hustle:
         return jsonify({"error": "Hustle not found"}), 404
 
-    # Check if user owns this hustle or is admin
-    if not current_user.is_admin and hustle.user_id != current_user.id:
-        return jsonify({"error": "Access denied"}), 403
+    # Transactions, debts and goals go with the hustle, in bounded batches
+    if deletion.background_requested():
+        job = deletion.start_job("hustle", hustle_id, get_jwt_identity(), deletion.delete_hustles, [hustle_id])
+        return jsonify({"success": True, "message": "Hustle deletion started", "job": job}), 202
 
-    db.session.delete(hustle)
-    db.session.commit()
+    try:
+        deleted = deletion.delete_hustles([hustle_id])
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Delete hustle error: {str(e)}")
+        return jsonify({"error": "Failed to delete hustle"}), 500
 
-    return jsonify({"success": True, "message": "Hustle deleted successfully"}), 200
+    return jsonify({"success": True, "message": "Hustle deleted successfully", "deleted": deleted}), 200
 
 # BULK DELETE HUSTLES (Admin only)
 @hustle_bp.route("/hustles/bulk-delete", methods=["DELETE"])
+# A few statements per batch of every child table
+@query_budget(None)
 @jwt_required()
 def bulk_delete_hustles():
     current_user = get_current_user()
@@ -324,14 +304,23 @@ def bulk_delete_hustles():
     if not hustle_ids:
         return jsonify({"error": "No hustle IDs provided"}), 400
     
+    if deletion.background_requested():
+        job = deletion.start_job("hustles", hustle_ids, current_user.id, deletion.delete_hustles, list(hustle_ids))
+        return jsonify({
+            "success": True,
+            "message": f"Deletion of {len(hustle_ids)} hustles started",
+            "job": job
+        }), 202
+
     try:
-        deleted_count = Hustle.query.filter(Hustle.id.in_(hustle_ids)).delete(synchronize_session=False)
-        db.session.commit()
+        deleted = deletion.delete_hustles(list(hustle_ids))
+        deleted_count = deleted.get(Hustle.__tablename__, 0)
         
         return jsonify({
             "success": True,
             "message": f"Successfully deleted {deleted_count} hustles",
-            "deleted_count": deleted_count
+            "deleted_count": deleted_count,
+            "deleted": deleted
         }), 200
     
     except Exception as e:
@@ -366,6 +355,7 @@ def assign_hustle_to_user(hustle_id):
         return jsonify({"error": "Target user not found"}), 404
     
     old_user_id = hustle.user_id
+    # The sync hook stamps the hustle for its new owner and tombstones it for the old one
     hustle.user_id = new_user_id
     db.session.commit()
     
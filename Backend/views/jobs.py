@@ -0,0 +1,23 @@
+from flask import jsonify, Blueprint
+from flask_jwt_extended import jwt_required
+from authz import get_current_user
+import deletion
+
+jobs_bp = Blueprint('jobs', __name__)
+
+# GET BACKGROUND JOB PROGRESS
+@jobs_bp.route("/jobs/<job_id>", methods=["GET"])
+@jwt_required()
+def get_job(job_id):
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    job = deletion.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    if not current_user.is_admin and job["owner_id"] != current_user.id:
+        return jsonify({"error": "Access denied"}), 403
+
+    return jsonify({"job": job}), 200
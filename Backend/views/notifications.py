@@ -0,0 +1,75 @@
+from flask import request, jsonify, Blueprint
+from models import db, Notification
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from profiler import query_budget
+from authz import get_current_user, get_owned
+
+notification_bp = Blueprint('notification', __name__)
+
+# GET NOTIFICATIONS
+@notification_bp.route("/notifications", methods=["GET"])
+@query_budget(4)
+@jwt_required()
+def get_notifications():
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        limit = min(int(request.args.get('limit', 50)), 200)
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
+
+    query = Notification.query.filter_by(user_id=current_user.id)
+    if request.args.get('unread', '').lower() in ('1', 'true', 'yes'):
+        query = query.filter_by(is_read=False)
+
+    notifications = query.order_by(Notification.created_at.desc()).limit(limit).all()
+    unread = Notification.query.filter_by(user_id=current_user.id, is_read=False).count()
+
+    return jsonify({
+        "notifications": [notification.to_dict() for notification in notifications],
+        "count": len(notifications),
+        "unread": unread
+    }), 200
+
+# MARK NOTIFICATION AS READ
+@notification_bp.route("/notifications/<int:notification_id>/read", methods=["PUT"])
+@jwt_required()
+def mark_notification_read(notification_id):
+    # Notifications are private, admins included
+    notification = get_owned(Notification, notification_id, owner_id=get_jwt_identity())
+    if not notification:
+        return jsonify({"error": "Notification not found"}), 404
+
+    try:
+        notification.is_read = True
+        db.session.commit()
+        return jsonify(notification.to_dict()), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "Failed to update notification",
+            "message": str(e)
+        }), 500
+
+# MARK ALL NOTIFICATIONS AS READ
+@notification_bp.route("/notifications/read-all", methods=["PUT"])
+@jwt_required()
+def mark_all_notifications_read():
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        updated = Notification.query.filter_by(user_id=current_user.id, is_read=False).update(
+            {"is_read": True}, synchronize_session=False
+        )
+        db.session.commit()
+        return jsonify({"success": "Notifications marked as read", "updated": updated}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "Failed to update notifications",
+            "message": str(e)
+        }), 500
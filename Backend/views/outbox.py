@@ -0,0 +1,86 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from models import OutboxCheckpoint
+from authz import get_current_user
+from outbox import DEFAULT_BATCH_SIZE, parse_cursor, get_position, read_events, save_checkpoint, events_after
+
+outbox_bp = Blueprint('outbox', __name__)
+
+# Largest batch one GET /outbox returns
+MAX_BATCH_SIZE = 5000
+
+
+def require_admin():
+    """Error response unless the caller is an admin, else None"""
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+    if not current_user.is_admin:
+        return jsonify({"error": "Admin access required"}), 403
+    return None
+
+
+# READ OUTBOX EVENTS (Admin only)
+@outbox_bp.route('/outbox', methods=['GET'])
+@jwt_required()
+def get_outbox_events():
+    denied = require_admin()
+    if denied:
+        return denied
+
+    consumer = request.args.get('consumer')
+    try:
+        limit = min(int(request.args.get('limit', DEFAULT_BATCH_SIZE)), MAX_BATCH_SIZE)
+        after = request.args.get('after')
+        # Explicit cursor first, then the consumer's checkpoint, then the start
+        position = parse_cursor(after) if after else get_position(consumer) if consumer else (0, 0)
+    except ValueError:
+        return jsonify({"error": "limit must be a number and after a 'seq-id' cursor"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be at least 1"}), 400
+
+    events = read_events(position, limit)
+    if events:
+        position = (events[-1].seq, events[-1].id)
+    return jsonify({
+        "events": [event.to_dict() for event in events],
+        "count": len(events),
+        # Pass back as ?after=, or save it with PUT /outbox/checkpoints/<consumer> once processed
+        "cursor": f"{position[0]}-{position[1]}",
+        "has_more": len(events) == limit
+    }), 200
+
+
+# LIST CONSUMER CHECKPOINTS (Admin only)
+@outbox_bp.route('/outbox/checkpoints', methods=['GET'])
+@jwt_required()
+def get_outbox_checkpoints():
+    denied = require_admin()
+    if denied:
+        return denied
+
+    checkpoints = OutboxCheckpoint.query.order_by(OutboxCheckpoint.consumer).all()
+    return jsonify([
+        dict(checkpoint.to_dict(), pending=events_after((checkpoint.seq, checkpoint.event_id)).count())
+        for checkpoint in checkpoints
+    ]), 200
+
+
+# SAVE A CONSUMER CHECKPOINT (Admin only)
+@outbox_bp.route('/outbox/checkpoints/<string:consumer>', methods=['PUT'])
+@jwt_required()
+def put_outbox_checkpoint(consumer):
+    denied = require_admin()
+    if denied:
+        return denied
+
+    data = request.get_json(silent=True) or {}
+    try:
+        position = parse_cursor(str(data.get('cursor', '')))
+    except ValueError:
+        return jsonify({"error": "cursor must be a 'seq-id' cursor returned by GET /outbox"}), 400
+    if len(consumer) > 50:
+        return jsonify({"error": "consumer names are at most 50 characters"}), 400
+
+    checkpoint = save_checkpoint(consumer, *position)
+    return jsonify(checkpoint.to_dict()), 200
@@ -0,0 +1,216 @@
+from flask import request, jsonify, Blueprint
+from models import db, RecurringRule, Transaction, Hustle
+from flask_jwt_extended import jwt_required
+from datetime import datetime
+from sqlalchemy import update
+from authz import get_current_user, owned_query, get_owned
+from sync import next_seq
+from outbox import capture
+import recurring
+
+recurring_bp = Blueprint('recurring', __name__)
+
+def apply_schedule(rule, data):
+    """Set the schedule fields from either an 'rrule' string or discrete fields"""
+    if data.get("rrule"):
+        fields = recurring.parse_rrule(data["rrule"])
+        rule.frequency = fields["frequency"]
+        rule.interval = fields.get("interval", 1)
+        rule.count = fields.get("count")
+        rule.until = fields.get("until")
+    else:
+        if "frequency" in data:
+            frequency = data["frequency"].lower()
+            if frequency not in recurring.FREQUENCIES:
+                raise ValueError(f"frequency must be one of {', '.join(recurring.FREQUENCIES)}")
+            rule.frequency = frequency
+        if "interval" in data:
+            rule.interval = int(data["interval"])
+        if "count" in data:
+            rule.count = int(data["count"]) if data["count"] is not None else None
+        if "until" in data:
+            rule.until = datetime.strptime(data["until"], "%Y-%m-%d") if data["until"] else None
+    if not rule.interval or rule.interval < 1:
+        raise ValueError("interval must be at least 1")
+    if rule.count is not None and rule.count < 1:
+        raise ValueError("count must be at least 1")
+
+# CREATE RECURRING RULE
+@recurring_bp.route("/recurring", methods=["POST"])
+@jwt_required()
+def create_recurring_rule():
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    data = request.get_json()
+
+    # Validate required fields
+    required_fields = ["amount", "type", "description", "start_date"]
+    missing_fields = [field for field in required_fields if field not in data]
+    if "rrule" not in data and "frequency" not in data:
+        missing_fields.append("frequency")
+    if missing_fields:
+        return jsonify({
+            "error": "Missing required fields",
+            "missing": missing_fields
+        }), 400
+
+    if data["type"] not in ["income", "expense"]:
+        return jsonify({"error": "Type must be either 'income' or 'expense'"}), 400
+
+    try:
+        hustle_id = data.get("hustle_id")
+        if hustle_id and not get_owned(Hustle, hustle_id):
+            return jsonify({"error": "Hustle not found"}), 404
+
+        rule = RecurringRule(
+            amount=float(data["amount"]),
+            type=data["type"],
+            description=data["description"],
+            category=data.get("category"),
+            start_date=datetime.strptime(data["start_date"], "%Y-%m-%d"),
+            interval=1,
+            occurrences=0,
+            skipped=0,
+            is_active=True,
+            user_id=current_user.id,
+            hustle_id=hustle_id
+        )
+        apply_schedule(rule, data)
+        recurring.schedule(rule)
+
+        db.session.add(rule)
+        db.session.commit()
+
+        return jsonify({
+            "success": "Recurring rule created successfully",
+            "rule": rule.to_dict()
+        }), 201
+
+    except ValueError as e:
+        return jsonify({
+            "error": "Invalid data format",
+            "message": str(e),
+            "expected": {
+                "amount": "number",
+                "start_date": "YYYY-MM-DD",
+                "until": "YYYY-MM-DD",
+                "rrule": "FREQ=MONTHLY;INTERVAL=1;COUNT=12"
+            }
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "Failed to create recurring rule",
+            "message": str(e)
+        }), 500
+
+# GET ALL RECURRING RULES
+@recurring_bp.route("/recurring", methods=["GET"])
+@jwt_required()
+def get_recurring_rules():
+    current_user = get_current_user()
+    if not current_user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    query = owned_query(RecurringRule)
+
+    hustle_id = request.args.get('hustle_id')
+    if hustle_id:
+        query = query.filter_by(hustle_id=hustle_id)
+
+    rules = query.order_by(RecurringRule.created_at.desc()).all()
+
+    return jsonify({
+        "rules": [rule.to_dict() for rule in rules],
+        "count": len(rules)
+    }), 200
+
+# GET RECURRING RULE BY ID
+@recurring_bp.route("/recurring/<int:rule_id>", methods=["GET"])
+@jwt_required()
+def get_recurring_rule(rule_id):
+    rule = get_owned(RecurringRule, rule_id)
+    if not rule:
+        return jsonify({"error": "Recurring rule not found"}), 404
+
+    return jsonify(rule.to_dict()), 200
+
+# UPDATE RECURRING RULE
+@recurring_bp.route("/recurring/<int:rule_id>", methods=["PUT"])
+@jwt_required()
+def update_recurring_rule(rule_id):
+    rule = get_owned(RecurringRule, rule_id)
+    if not rule:
+        return jsonify({"error": "Recurring rule not found"}), 404
+
+    data = request.get_json()
+
+    try:
+        if 'amount' in data:
+            rule.amount = float(data['amount'])
+        if 'type' in data:
+            if data['type'] not in ["income", "expense"]:
+                return jsonify({"error": "Type must be either 'income' or 'expense'"}), 400
+            rule.type = data['type']
+        if 'description' in data:
+            rule.description = data['description']
+        if 'category' in data:
+            rule.category = data['category']
+        resumed = 'is_active' in data and bool(data['is_active']) and not rule.is_active
+        if 'is_active' in data:
+            rule.is_active = bool(data['is_active'])
+        grid = (rule.frequency, rule.interval)
+        apply_schedule(rule, data)
+        # Already materialized occurrences are kept; what was missed while the
+        # rule was paused, or falls on the new grid before today, is not back-filled
+        if resumed or (rule.frequency, rule.interval) != grid:
+            recurring.skip_missed(rule)
+        recurring.schedule(rule)
+
+        db.session.commit()
+
+        return jsonify({
+            "success": "Recurring rule updated successfully",
+            "rule": rule.to_dict()
+        }), 200
+
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "Invalid data format",
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "Failed to update recurring rule",
+            "message": str(e)
+        }), 500
+
+# DELETE RECURRING RULE
+@recurring_bp.route("/recurring/<int:rule_id>", methods=["DELETE"])
+@jwt_required()
+def delete_recurring_rule(rule_id):
+    rule = get_owned(RecurringRule, rule_id)
+    if not rule:
+        return jsonify({"error": "Recurring rule not found"}), 404
+
+    try:
+        # Materialized transactions stay as history, detached from the rule
+        capture(
+            update(Transaction).where(Transaction.recurring_rule_id == rule.id).values(
+                recurring_rule_id=None, change_seq=next_seq()
+            ).execution_options(synchronize_session=False),
+            Transaction
+        )
+        db.session.delete(rule)
+        db.session.commit()
+        return jsonify({"success": "Recurring rule deleted successfully"}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            "error": "Failed to delete recurring rule",
+            "message": str(e)
+        }), 500
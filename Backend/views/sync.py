@@ -0,0 +1,95 @@
+import logging
+from urllib.parse import urlsplit
+
+from flask import Blueprint, jsonify, request, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import db
+from profiler import query_budget
+from authz import get_current_user
+from sync import SYNC_TABLES, CursorExpired, changes_since
+from views.batch import sub_request_environ, dispatch_shared
+
+sync_bp = Blueprint('sync', __name__)
+
+# Methods an offline client may queue
+SYNC_WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+# DELTA SYNC: ROWS CHANGED SINCE THE CLIENT'S CURSOR
+@sync_bp.route('/sync', methods=['GET'])
+# Counter + 4 tables + tombstones, and a refetch per table when one write overflows a page
+@query_budget(12)
+@jwt_required()
+def get_changes():
+    try:
+        since = request.args.get('since')
+        since = int(since) if since not in (None, '') else None
+        limit = min(int(request.args.get('limit', 500)), 1000)
+    except ValueError:
+        return jsonify({"error": "since and limit must be numbers"}), 400
+    if (since is not None and since < 0) or limit < 1:
+        return jsonify({"error": "since must be >= 0 and limit >= 1"}), 400
+
+    try:
+        return jsonify(changes_since(get_jwt_identity(), since, limit)), 200
+    except CursorExpired:
+        return jsonify({
+            "error": "since is older than the retained deletions; sync again without since"
+        }), 410
+
+
+# REPLAY QUEUED OFFLINE WRITES
+@sync_bp.route('/sync', methods=['POST'])
+@jwt_required()
+def push_changes():
+    data = request.get_json(silent=True) or {}
+    items = data.get('changes')
+    max_changes = current_app.config.get('SYNC_MAX_CHANGES', 100)
+
+    if not isinstance(items, list) or not items:
+        return jsonify({
+            "error": "changes must be a non-empty list",
+            "expected": {
+                "changes": [{"id": "local-1", "method": "POST", "path": "/transactions", "body": {"amount": 100}}],
+                "stop_on_error": False
+            }
+        }), 400
+    if len(items) > max_changes:
+        return jsonify({"error": f"At most {max_changes} changes per request"}), 400
+
+    environs = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            return jsonify({"error": f"Change {index} must be an object"}), 400
+        path = item.get('path')
+        method = (item.get('method') or '').upper()
+        if not isinstance(path, str) or urlsplit(path).path.strip('/').split('/')[0] not in SYNC_TABLES:
+            return jsonify({"error": f"Change {index}: path must be under /{', /'.join(SYNC_TABLES)}"}), 400
+        if method not in SYNC_WRITE_METHODS:
+            return jsonify({"error": f"Change {index}: method must be one of {', '.join(SYNC_WRITE_METHODS)}"}), 400
+        body = item.get('body')
+        if body is not None and not isinstance(body, dict):
+            return jsonify({"error": f"Change {index}: body must be an object"}), 400
+        environs.append(sub_request_environ(path, method, body))
+
+    if not get_current_user():
+        return jsonify({"error": "User not found"}), 404
+
+    # Applied one by one, in queue order; each write commits on its own
+    app = current_app._get_current_object()
+    results = []
+    for index, (item, environ) in enumerate(zip(items, environs)):
+        status, body = dispatch_shared(app, environ)
+        if status >= 500:
+            db.session.rollback()
+            logging.error(f"Sync change {index} ({item['method']} {item['path']}) failed with {status}")
+        results.append({"id": item.get('id', index), "status": status, "body": body})
+        if status >= 400 and data.get('stop_on_error'):
+            break
+
+    # The client then pulls GET /sync?since=<its cursor> to pick up the stored rows
+    return jsonify({
+        "results": results,
+        "applied": sum(1 for result in results if result["status"] < 400),
+        "complete": len(results) == len(items)
+    }), 200
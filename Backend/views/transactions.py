@@ -1,20 +1,52 @@
 from flask import Flask, request, jsonify, Blueprint
-from models import db, Transaction, User, Hustle
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import db, Transaction, Hustle, Goal, Notification
+from flask_jwt_extended import jwt_required
 from datetime import datetime
+from profiler import query_budget
+from goal_progress import apply_contribution, contribution, move_contribution
+from serializers import TRANSACTION_FIELDS, TRANSACTION_LIST_FIELDS, parse_fields, serialize_query
+from authz import get_current_user, owned_query, get_owned
+import anomaly
+import events
 
 transaction_bp = Blueprint('transaction', __name__)
 
-def get_current_user():
-    """Helper function to get current user from JWT"""
-    try:
-        current_user_id = get_jwt_identity()
-        if current_user_id:
-            return User.query.get(current_user_id)
-        return None
-    except Exception as e:
-        print(f"Error getting current user: {e}")
-        return None
+def dictionary_encode(values):
+    """Encode repeated strings as a lookup list plus integer codes"""
+    dictionary = []
+    positions = {}
+    codes = []
+    for value in values:
+        code = positions.get(value)
+        if code is None:
+            code = positions[value] = len(dictionary)
+            dictionary.append(value)
+        codes.append(code)
+    return {"dictionary": dictionary, "codes": codes}
+
+def build_columnar_transactions(query):
+    """Build parallel arrays per field straight from row tuples (no ORM objects)"""
+    rows = query.with_entities(
+        Transaction.id,
+        Transaction.amount,
+        Transaction.type,
+        Transaction.category,
+        Transaction.created_at,
+        Transaction.hustle_id
+    ).all()
+
+    return {
+        "format": "columnar",
+        "count": len(rows),
+        "columns": {
+            "id": [row[0] for row in rows],
+            "amount": [row[1] for row in rows],
+            "type": dictionary_encode(row[2] for row in rows),
+            "category": dictionary_encode(row[3] for row in rows),
+            "date": [row[4].strftime('%Y-%m-%d') if row[4] else None for row in rows],
+            "hustle_id": [row[5] for row in rows]
+        }
+    }
 
 # CREATE TRANSACTION (Income or Expense)
 @transaction_bp.route("/transactions", methods=["POST"])
@@ -37,6 +69,7 @@ def create_transaction():
         category = data.get("category")
         notes = data.get("notes")
         tags = data.get("tags")
+        goal_id = data.get("goal_id")
 
         # Validate required fields
         if not amount or not t_type or not description:
@@ -56,14 +89,14 @@ def create_transaction():
             created_at = datetime.utcnow()
 
         # Validate hustle_id if provided
-        if hustle_id:
-            hustle = Hustle.query.get(hustle_id)
-            if not hustle:
-                return jsonify({"error": "Hustle not found"}), 404
-            
-            # Check if hustle belongs to user (unless admin)
-            if not current_user.is_admin and hustle.user_id != current_user.id:
-                return jsonify({"error": "Hustle does not belong to you"}), 403
+        if hustle_id and not get_owned(Hustle, hustle_id):
+            return jsonify({"error": "Hustle not found"}), 404
+
+        # Validate goal_id if provided; the goal must be the transaction owner's
+        if goal_id and not get_owned(Goal, goal_id, owner_id=current_user.id):
+            return jsonify({"error": "Goal not found"}), 404
+        if goal_id and t_type.lower() != 'income':
+            return jsonify({"error": "Only income can be allocated to a goal"}), 400
 
         # Create transaction
         new_transaction = Transaction(
@@ -75,15 +108,21 @@ def create_transaction():
             hustle_id=hustle_id if hustle_id else None,
             category=category,
             notes=notes,
-            tags=tags
+            tags=tags,
+            goal_id=goal_id if goal_id else None
         )
 
         db.session.add(new_transaction)
+        apply_contribution(new_transaction.goal_id, contribution(new_transaction.type, new_transaction.amount))
+        anomaly.record_expense(new_transaction)
         db.session.commit()
 
+        result = new_transaction.to_dict()
+        events.publish_transaction("transaction.created", new_transaction.user_id, transaction=result)
+
         return jsonify({
             "success": "Transaction created successfully",
-            "transaction": new_transaction.to_dict()
+            "transaction": result
         }), 201
 
     except Exception as e:
@@ -93,21 +132,14 @@ def create_transaction():
 
 # GET TRANSACTION BY ID
 @transaction_bp.route("/transactions/<int:transaction_id>", methods=["GET"])
+@query_budget(4)
 @jwt_required()
 def get_transaction(transaction_id):
     try:
-        current_user = get_current_user()
-        if not current_user:
-            return jsonify({"error": "Invalid token or user not found"}), 401
-
-        transaction = Transaction.query.get(transaction_id)
+        transaction = get_owned(Transaction, transaction_id)
         if not transaction:
             return jsonify({"error": "Transaction not found"}), 404
 
-        # Check if user owns the transaction or is admin
-        if not current_user.is_admin and transaction.user_id != current_user.id:
-            return jsonify({"error": "Access denied"}), 403
-
         return jsonify({"transaction": transaction.to_dict()}), 200
 
     except Exception as e:
@@ -116,6 +148,7 @@ def get_transaction(transaction_id):
 
 # GET ALL TRANSACTIONS (with filters)
 @transaction_bp.route("/transactions", methods=["GET"])
+@query_budget(4)
 @jwt_required()
 def get_all_transactions():
     try:
@@ -128,21 +161,21 @@ def get_all_transactions():
         t_type = request.args.get('type')  # 'income' or 'expense'
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
+        fields = request.args.get('fields')
+        if fields:
+            try:
+                fields = parse_fields(fields, TRANSACTION_FIELDS)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
 
         # Base query - admin sees all, users see only their own
-        if current_user.is_admin:
-            query = Transaction.query
-        else:
-            query = Transaction.query.filter_by(user_id=current_user.id)
+        query = owned_query(Transaction)
 
         # Apply filters
         if hustle_id:
             # Validate hustle exists and belongs to user (if not admin)
-            hustle = Hustle.query.get(hustle_id)
-            if not hustle:
+            if not get_owned(Hustle, hustle_id):
                 return jsonify({"error": "Hustle not found"}), 404
-            if not current_user.is_admin and hustle.user_id != current_user.id:
-                return jsonify({"error": "Hustle does not belong to you"}), 403
             query = query.filter_by(hustle_id=hustle_id)
         
         if t_type:
@@ -164,8 +197,14 @@ def get_all_transactions():
             except ValueError:
                 return jsonify({"error": "Invalid end date format. Use YYYY-MM-DD"}), 400
 
-        transactions = query.order_by(Transaction.created_at.desc()).all()
-        result = [transaction.to_dict() for transaction in transactions]
+        query = query.order_by(Transaction.created_at.desc())
+
+        # Compact parallel-array payload for charts
+        if request.args.get('format') == 'columnar':
+            return jsonify(build_columnar_transactions(query)), 200
+
+        # Serialized from row tuples; a sparse fieldset selects only the requested columns
+        result = serialize_query(query, TRANSACTION_FIELDS, fields or TRANSACTION_LIST_FIELDS)
 
         return jsonify({
             "transactions": result,
@@ -178,25 +217,18 @@ def get_all_transactions():
 
 # GET TRANSACTIONS BY HUSTLE
 @transaction_bp.route("/hustles/<int:hustle_id>/transactions", methods=["GET"])
+@query_budget(4)
 @jwt_required()
 def get_transactions_by_hustle(hustle_id):
     try:
-        current_user = get_current_user()
-        if not current_user:
-            return jsonify({"error": "Unauthorized"}), 401
-
-        # Validate hustle exists
-        hustle = Hustle.query.get(hustle_id)
+        # Validate hustle exists and belongs to user (unless admin)
+        hustle = get_owned(Hustle, hustle_id)
         if not hustle:
             return jsonify({"error": "Hustle not found"}), 404
 
-        # Check if hustle belongs to user (unless admin)
-        if not current_user.is_admin and hustle.user_id != current_user.id:
-            return jsonify({"error": "Hustle does not belong to you"}), 403
-
         # Get transactions for this hustle
-        transactions = Transaction.query.filter_by(hustle_id=hustle_id).order_by(Transaction.created_at.desc()).all()
-        result = [transaction.to_dict() for transaction in transactions]
+        query = Transaction.query.filter_by(hustle_id=hustle_id).order_by(Transaction.created_at.desc())
+        result = serialize_query(query, TRANSACTION_FIELDS, TRANSACTION_LIST_FIELDS)
 
         return jsonify({
             "hustle_id": hustle_id,
@@ -214,22 +246,17 @@ def get_transactions_by_hustle(hustle_id):
 @jwt_required()
 def update_transaction(transaction_id):
     try:
-        current_user = get_current_user()
-        if not current_user:
-            return jsonify({"error": "Unauthorized"}), 401
-
-        transaction = Transaction.query.get(transaction_id)
+        transaction = get_owned(Transaction, transaction_id)
         if not transaction:
             return jsonify({"error": "Transaction not found"}), 404
 
-        # Check if user owns the transaction or is admin
-        if not current_user.is_admin and transaction.user_id != current_user.id:
-            return jsonify({"error": "Access denied"}), 403
-
         data = request.get_json()
         if not data:
             return jsonify({"error": "No data provided"}), 400
 
+        old_goal_id, old_amount = transaction.goal_id, transaction.amount
+        old_type, old_category, old_created_at = transaction.type, transaction.category, transaction.created_at
+
         # Update fields if they exist in the request
         if 'amount' in data:
             transaction.amount = float(data['amount'])
@@ -246,25 +273,42 @@ def update_transaction(transaction_id):
         if 'tags' in data:
             transaction.tags = data['tags']
         if 'hustle_id' in data:
-            if data['hustle_id']:
-                hustle = Hustle.query.get(data['hustle_id'])
-                if not hustle:
-                    return jsonify({"error": "Hustle not found"}), 404
-                if not current_user.is_admin and hustle.user_id != current_user.id:
-                    return jsonify({"error": "Hustle does not belong to you"}), 403
+            if data['hustle_id'] and not get_owned(Hustle, data['hustle_id']):
+                return jsonify({"error": "Hustle not found"}), 404
             transaction.hustle_id = data['hustle_id']
+        if 'goal_id' in data:
+            if data['goal_id'] and not get_owned(Goal, data['goal_id'], owner_id=transaction.user_id):
+                return jsonify({"error": "Goal not found"}), 404
+            transaction.goal_id = data['goal_id'] or None
         if 'date' in data:
             try:
                 transaction.created_at = datetime.strptime(data['date'], "%Y-%m-%d")
             except ValueError:
                 return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
 
+        if transaction.goal_id and transaction.type != 'income':
+            db.session.rollback()
+            return jsonify({"error": "Only income can be allocated to a goal"}), 400
+
         transaction.updated_at = datetime.utcnow()
+        # A type change moves the contribution too
+        move_contribution(
+            old_goal_id, contribution(old_type, old_amount),
+            transaction.goal_id, contribution(transaction.type, transaction.amount)
+        )
+        if (old_type, old_category, old_amount, old_created_at) != (
+                transaction.type, transaction.category, transaction.amount, transaction.created_at):
+            anomaly.forget_expense(transaction.user_id, old_category, old_type, old_amount, old_created_at)
+            # Already checked when it was created
+            anomaly.record_expense(transaction, notify=False)
         db.session.commit()
 
+        result = transaction.to_dict()
+        events.publish_transaction("transaction.updated", transaction.user_id, transaction=result)
+
         return jsonify({
             "success": "Transaction updated successfully",
-            "transaction": transaction.to_dict()
+            "transaction": result
         }), 200
 
     except Exception as e:
@@ -277,21 +321,23 @@ def update_transaction(transaction_id):
 @jwt_required()
 def delete_transaction(transaction_id):
     try:
-        current_user = get_current_user()
-        if not current_user:
-            return jsonify({"error": "Unauthorized"}), 401
-
-        transaction = Transaction.query.get(transaction_id)
+        transaction = get_owned(Transaction, transaction_id)
         if not transaction:
             return jsonify({"error": "Transaction not found"}), 404
 
-        # Check if user owns the transaction or is admin
-        if not current_user.is_admin and transaction.user_id != current_user.id:
-            return jsonify({"error": "Access denied"}), 403
-
+        apply_contribution(transaction.goal_id, -contribution(transaction.type, transaction.amount))
+        anomaly.forget_expense(
+            transaction.user_id, transaction.category, transaction.type, transaction.amount, transaction.created_at
+        )
+        Notification.query.filter_by(transaction_id=transaction.id).update(
+            {"transaction_id": None}, synchronize_session=False
+        )
+        user_id = transaction.user_id
         db.session.delete(transaction)
         db.session.commit()
 
+        events.publish_transaction("transaction.deleted", user_id, transaction_id=transaction_id)
+
         return jsonify({"success": "Transaction deleted successfully"}), 200
 
     except Exception as e:
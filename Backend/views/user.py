@@ -1,6 +1,10 @@
-from flask import Flask, request, jsonify, Blueprint, current_app
+from flask import Flask, request, jsonify, Blueprint, current_app, Response, stream_with_context
 from werkzeug.security import generate_password_hash, check_password_hash
 from models import db, User, Hustle, Transaction, Debt, Goal
+from profiler import query_budget
+from authz import get_current_user
+import deletion
+import export
 import secrets
 from datetime import datetime, timedelta
 from flask_mail import Message, Mail
@@ -20,14 +24,6 @@ def get_mail():
     """Helper function to get mail instance from current app"""
     return current_app.extensions['mail']
 
-def get_current_user():
-    """Helper function to get current user from JWT"""
-    try:
-        current_user_id = get_jwt_identity()
-        return User.query.get(current_user_id) if current_user_id else None
-    except:
-        return None
-
 # REGISTER USER
 @user_bp.route("/users", methods=["POST"])
 def create_user():
@@ -334,6 +330,7 @@ def confirm_password_reset():
 
 # GET CURRENT USER PROFILE
 @user_bp.route("/users/me", methods=["GET"])
+@query_budget(2)
 @jwt_required()
 def get_current_user_profile():
     """Get the current authenticated user's profile"""
@@ -389,6 +386,8 @@ def update_user(user_id):
 
 # DELETE USER ACCOUNT
 @user_bp.route("/users/<int:user_id>", methods=["DELETE"])
+# A few statements per batch of every child table
+@query_budget(None)
 @jwt_required()
 def delete_user(user_id):
     current_user = get_current_user()
@@ -399,10 +398,14 @@ def delete_user(user_id):
     if not user:
         return jsonify({"error": "User not found"}), 404
 
+    # Hustles, transactions, debts and goals go with the user, in bounded batches
+    if deletion.background_requested():
+        job = deletion.start_job("user", user_id, current_user.id, deletion.delete_user, user_id)
+        return jsonify({"success": "User account deletion started", "job": job}), 202
+
     try:
-        db.session.delete(user)
-        db.session.commit()
-        return jsonify({"success": "User account deleted successfully"}), 200
+        deleted = deletion.delete_user(user_id)
+        return jsonify({"success": "User account deleted successfully", "deleted": deleted}), 200
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Delete user error: {str(e)}")
@@ -410,25 +413,68 @@ def delete_user(user_id):
 
 # ADMIN: VIEW ALL USERS
 @user_bp.route("/admin/users", methods=["GET"])
+# Blocklist, admin, then every user with their counts in one query
+@query_budget(3)
 @jwt_required()
 def admin_view_users():
     current_user = get_current_user()
     if not current_user or not current_user.is_admin:
         return jsonify({"error": "Unauthorized"}), 403
 
-    users = User.query.all()
-    users_list = []
-    for user in users:
-        if hasattr(user, 'to_dict_with_relations'):
-            users_list.append(user.to_dict_with_relations())
-        elif hasattr(user, 'to_dict'):
-            users_list.append(user.to_dict())
-        else:
-            users_list.append({
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "is_admin": user.is_admin
-            })
-    
-    return jsonify(users_list), 200
\ No newline at end of file
+    # Related rows are counted in correlated subqueries instead of loading
+    # four collections per user
+    counts = [
+        db.select(db.func.count(model.id)).where(model.user_id == User.id).correlate(User).scalar_subquery()
+        for model in (Hustle, Transaction, Debt, Goal)
+    ]
+    rows = db.session.query(User, *counts).order_by(User.id).all()
+    users_list = [user.to_dict_with_relations(counts=tuple(row_counts)) for user, *row_counts in rows]
+
+    return jsonify(users_list), 200
+
+# EXPORT ALL USER DATA (streamed zip archive)
+@user_bp.route("/users/<int:user_id>/export", methods=["GET"])
+@jwt_required()
+def export_user_data(user_id):
+    current_user = get_current_user()
+    if not current_user or (not current_user.is_admin and current_user.id != user_id):
+        return jsonify({"error": "Unauthorized access"}), 403
+
+    if not db.session.get(User, user_id):
+        return jsonify({"error": "User not found"}), 404
+
+    fmt = request.args.get("format", "csv").lower()
+    if fmt not in ("csv", "json"):
+        return jsonify({"error": "Format must be either 'csv' or 'json'"}), 400
+
+    etag = export.export_fingerprint(user_id)
+    headers = {
+        "Content-Disposition": f"attachment; filename=user-{user_id}-export.zip",
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{etag}"'
+    }
+
+    # Resume an interrupted download, unless the data changed since (If-Range)
+    byte_range = export.parse_range(request.headers.get("Range"))
+    if_range = request.headers.get("If-Range")
+    if byte_range and (not if_range or if_range.strip('"') == etag):
+        total = export.archive_size(user_id, fmt, etag)
+        start, end = byte_range
+        end = total - 1 if end is None else min(end, total - 1)
+        if start > end:
+            return Response(status=416, headers={"Content-Range": f"bytes */{total}"})
+
+        headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+        headers["Content-Length"] = str(end - start + 1)
+        return Response(
+            stream_with_context(export.generate_range(user_id, fmt, start, end, etag)),
+            status=206,
+            mimetype="application/zip",
+            headers=headers
+        )
+
+    return Response(
+        stream_with_context(export.generate_archive(user_id, fmt, etag)),
+        mimetype="application/zip",
+        headers=headers
+    )